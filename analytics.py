@@ -0,0 +1,120 @@
+"""
+Reminder history analytics computed over NumPy column arrays
+"""
+
+from datetime import date, datetime
+from config import AGING_BUCKETS, TREND_MONTHS
+from instrumentation import instrumented
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+EPOCH_DAY = date(1970, 1, 1).toordinal()
+
+
+@instrumented("analytics", methods=("load_columns", "compute", "summary"))
+class ReminderAnalytics:
+    """Completion, aging, load and trend statistics; results are kept until the database changes"""
+
+    def __init__(self, db):
+        self.db = db
+        self.cache_key = None
+        self.cached = None
+
+    @staticmethod
+    def available():
+        """True when NumPy is installed"""
+        return np is not None
+
+    def load_columns(self):
+        """Fetch every reminder as column arrays in one query; strings become small integer codes"""
+        rows = self.db.fetch_analytics_rows()
+        if not rows:
+            empty = np.zeros(0, dtype=np.int32)
+            return {"day": empty, "category": empty, "priority": empty,
+                    "completed": np.zeros(0, dtype=bool), "categories": [], "priorities": []}
+
+        days, categories, priorities, completed = zip(*rows)
+        columns = {
+            "day": np.fromiter(days, dtype=np.int32, count=len(rows)),
+            "completed": np.fromiter(completed, dtype=bool, count=len(rows)),
+        }
+        # Dictionary-encode the text columns; there are only a handful of distinct values
+        for name, values, label_key in (("category", categories, "categories"), ("priority", priorities, "priorities")):
+            labels = sorted(set(values), key=lambda value: (value is None, value or ""))
+            codes = {label: code for code, label in enumerate(labels)}
+            columns[name] = np.fromiter(map(codes.__getitem__, values), dtype=np.int16, count=len(rows))
+            columns[label_key] = labels
+        return columns
+
+    def compute(self, columns, today=None):
+        """All statistics for a set of columns as plain Python values"""
+        today_day = (today or date.today()).toordinal() - EPOCH_DAY
+        day, completed = columns["day"], columns["completed"]
+        pending = ~completed
+
+        def rates(codes, labels):
+            totals = np.bincount(codes, minlength=len(labels))
+            done = np.bincount(codes, weights=completed, minlength=len(labels))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rate = np.where(totals > 0, done / totals, 0.0)
+            return {label: {"total": int(totals[i]), "completed": int(done[i]), "rate": float(rate[i])}
+                    for i, label in enumerate(labels)}
+
+        # Overdue aging: days past due for pending reminders, bucketed by AGING_BUCKETS edges
+        overdue_age = today_day - day[pending & (day < today_day)]
+        edges = np.array(list(AGING_BUCKETS) + [np.iinfo(np.int32).max])
+        aging_counts, _ = np.histogram(overdue_age, bins=edges)
+        aging = {}
+        for i, count in enumerate(aging_counts):
+            low, high = edges[i], edges[i + 1]
+            label = f"{low}+ days" if i == len(aging_counts) - 1 else f"{low}-{high - 1} days"
+            aging[label] = int(count)
+
+        # 1970-01-01 was a Thursday, so Monday-based weekday = (day + 3) % 7
+        weekday = (day + 3) % 7
+        load = np.bincount(weekday, minlength=7)
+        pending_load = np.bincount(weekday[pending], minlength=7)
+
+        # Monthly due and completed counts for the last TREND_MONTHS months
+        months = day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+        this_month = np.datetime64(date.fromordinal(today_day + EPOCH_DAY), "M").astype(np.int32)
+        offsets = months - (this_month - TREND_MONTHS + 1)
+        window = (offsets >= 0) & (offsets < TREND_MONTHS)
+        due_trend = np.bincount(offsets[window], minlength=TREND_MONTHS)
+        done_trend = np.bincount(offsets[window & completed], minlength=TREND_MONTHS)
+        trend = []
+        for i in range(TREND_MONTHS):
+            label = str(np.datetime64(int(this_month - TREND_MONTHS + 1 + i), "M"))
+            trend.append({"month": label, "due": int(due_trend[i]), "completed": int(done_trend[i])})
+
+        return {
+            "total": int(day.size),
+            "completed": int(completed.sum()),
+            "completion_rate": float(completed.mean()) if day.size else 0.0,
+            "by_category": rates(columns["category"], columns["categories"]),
+            "by_priority": rates(columns["priority"], columns["priorities"]),
+            "overdue_aging": aging,
+            "weekday_load": {WEEKDAYS[i]: {"total": int(load[i]), "pending": int(pending_load[i])}
+                             for i in range(7)},
+            "monthly_trend": trend,
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def summary(self, today=None):
+        """Cached statistics, recomputed only after a reminder change or on a new day"""
+        if np is None:
+            raise RuntimeError("Analytics needs NumPy: pip install numpy")
+        key = (self.db.get_change_seq(), today or date.today())
+        if key != self.cache_key:
+            self.cached = self.compute(self.load_columns(), today)
+            self.cache_key = key
+        return self.cached
+
+    def invalidate(self):
+        """Forget the cached statistics"""
+        self.cache_key = None
+        self.cached = None
@@ -0,0 +1,200 @@
+"""
+Scheduled online backups of the reminder database using the SQLite backup API
+
+Year partition files (see partition.py) listed in the database are copied into a
+<snapshot>.parts directory beside each snapshot and restored together with it.
+"""
+
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from config import (BACKUP_DIR, BACKUP_INTERVAL, BACKUP_KEEP, BACKUP_MAX_RESTARTS, BACKUP_PAGES_PER_STEP,
+                    BACKUP_STEP_SLEEP, DATABASE_PATH)
+
+
+class BackupRestarted(Exception):
+    """Raised from the progress callback when writers keep forcing the copy to start over"""
+
+
+class BackupManager:
+    def __init__(self, db_path=None, backup_dir=None, keep=BACKUP_KEEP,
+                 pages_per_step=BACKUP_PAGES_PER_STEP, step_sleep=BACKUP_STEP_SLEEP):
+        self.db_path = Path(db_path or DATABASE_PATH)
+        self.backup_dir = Path(backup_dir or BACKUP_DIR)
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_result = None
+
+    def list_backups(self):
+        """Return existing snapshots, newest first"""
+        if not self.backup_dir.exists():
+            return []
+        return sorted(self.backup_dir.glob(f"{self.db_path.stem}-*.db"), reverse=True)
+
+    def backup_now(self):
+        """Copy the database in small page steps, verify the copy and rotate old snapshots
+
+        Returns a dict with the snapshot path, total duration and the longest single step,
+        which is the longest time the source database was locked against writers.
+        """
+        with self.lock:
+            self.backup_dir.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            final_path = self.backup_dir / f"{self.db_path.stem}-{stamp}.db"
+            partial_path = final_path.with_suffix(".partial")
+
+            steps = []
+            last = [time.perf_counter(), None]
+            restarts = [0]
+
+            def progress(status, remaining, total):
+                # Called after each step; the gap minus our own sleep is time spent holding the lock
+                now = time.perf_counter()
+                steps.append(max(now - last[0] - (self.step_sleep if steps else 0), 0.0))
+                last[0] = now
+                # A write from another connection makes SQLite restart the copy from page one
+                if last[1] is not None and remaining > last[1]:
+                    restarts[0] += 1
+                    if restarts[0] > BACKUP_MAX_RESTARTS:
+                        raise BackupRestarted()
+                last[1] = remaining
+
+            start = time.perf_counter()
+            source = sqlite3.connect(self.db_path)
+            target = sqlite3.connect(partial_path)
+            single_step = False
+            try:
+                try:
+                    source.backup(target, pages=self.pages_per_step, progress=progress, sleep=self.step_sleep)
+                except BackupRestarted:
+                    # Busy writers: copy in one step instead, which in WAL mode only holds a read snapshot
+                    single_step = True
+                    last[0] = time.perf_counter()
+                    source.backup(target, pages=-1)
+                    steps.append(time.perf_counter() - last[0])
+                integrity = target.execute("PRAGMA integrity_check").fetchone()[0]
+                parts = self._partition_files(target)
+            finally:
+                target.close()
+                source.close()
+
+            if integrity != "ok":
+                partial_path.unlink(missing_ok=True)
+                raise sqlite3.DatabaseError(f"Backup failed integrity check: {integrity}")
+
+            # Year files before the main copy: a finished snapshot always has its year files beside it
+            if parts:
+                parts_path = final_path.with_suffix(".parts")
+                partial_parts = parts_path.with_name(parts_path.name + ".partial")
+                shutil.rmtree(partial_parts, ignore_errors=True)
+                partial_parts.mkdir()
+                try:
+                    for name in parts:
+                        self._copy(self.db_path.parent / name, partial_parts / name)
+                except Exception:
+                    shutil.rmtree(partial_parts, ignore_errors=True)
+                    partial_path.unlink(missing_ok=True)
+                    raise
+                partial_parts.replace(parts_path)
+            partial_path.replace(final_path)
+            result = {
+                "path": str(final_path),
+                "duration_ms": (time.perf_counter() - start) * 1000,
+                "steps": len(steps),
+                "restarts": restarts[0],
+                "single_step": single_step,
+                "max_step_ms": max(steps, default=0.0) * 1000,
+                "size_bytes": final_path.stat().st_size,
+                "integrity": integrity,
+                "partitions": len(parts),
+            }
+            self.rotate()
+            self.last_result = result
+            return result
+
+    def rotate(self):
+        """Delete snapshots beyond the newest keep"""
+        for old in self.list_backups()[self.keep:]:
+            old.unlink(missing_ok=True)
+            shutil.rmtree(old.with_suffix(".parts"), ignore_errors=True)
+
+    def seconds_until_due(self, interval=BACKUP_INTERVAL):
+        """Seconds until the next scheduled backup based on the newest snapshot"""
+        backups = self.list_backups()
+        if not backups:
+            return 0
+        age = time.time() - backups[0].stat().st_mtime
+        return max(interval - age, 0)
+
+    def start(self, interval=BACKUP_INTERVAL):
+        """Run backups every interval seconds on a background thread"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, args=(interval,), name="backup", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=30):
+        """Stop the background thread, letting a running backup finish"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+
+    def _run(self, interval):
+        delay = self.seconds_until_due(interval)
+        while not self.stop_event.wait(delay):
+            try:
+                result = self.backup_now()
+                print(f"Backup written to {result['path']} in {result['duration_ms']:.0f} ms")
+            except Exception as e:
+                print(f"Backup error: {e}")
+            delay = interval
+
+    def restore(self, backup_path):
+        """Replace the live database contents, and its year partition files, with a snapshot
+
+        Reopen the database afterwards so connections attach the restored year files.
+        """
+        backup_path = Path(backup_path)
+        parts_path = backup_path.with_suffix(".parts")
+        with self.lock:
+            source = sqlite3.connect(backup_path)
+            try:
+                parts = self._partition_files(source)
+                missing = [name for name in parts if not (parts_path / name).exists()]
+                if missing:
+                    raise FileNotFoundError(f"Backup is missing year files: {', '.join(missing)}")
+                # Year files first, so the restored registry never points at files from another point in time
+                for name in parts:
+                    self._copy(parts_path / name, self.db_path.parent / name)
+                target = sqlite3.connect(self.db_path)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+            finally:
+                source.close()
+
+    def _partition_files(self, conn):
+        """Year partition file names (relative to the database directory) in a database's registry"""
+        try:
+            return [row[0] for row in conn.execute("SELECT path FROM partitions")]
+        except sqlite3.OperationalError:
+            return []  # written before year partitions existed
+
+    def _copy(self, source_path, target_path):
+        # Year files only change while partition.py runs, so one step holds no lock worth splitting
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,841 @@
+"""
+Performance benchmarks - run: python benchmark.py [name ...] (or --list)
+"""
+
+import argparse
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BENCHMARKS = {}
+
+CATEGORIES = ["Work", "Personal", "Health", "Shopping", "General"]
+PRIORITIES = ["Low", "Normal", "High", "Urgent"]
+
+
+def benchmark(name):
+    """Register a benchmark function under name"""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+@contextmanager
+def timer(label, results):
+    """Time the enclosed block and store elapsed milliseconds in results[label]"""
+    start = time.perf_counter()
+    yield
+    results[label] = (time.perf_counter() - start) * 1000
+
+
+@contextmanager
+def temp_database():
+    """Yield a ReminderDatabase backed by a throwaway file"""
+    from database import ReminderDatabase
+
+    directory = Path(tempfile.mkdtemp(prefix="reminder-bench-"))
+    db = ReminderDatabase(directory / "reminders.db")
+    try:
+        yield db
+    finally:
+        db.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def generate_rows(count, start=None, days=365, seed=42):
+    """Generate reminder column tuples spread over a date range"""
+    rng = random.Random(seed)
+    start = start or datetime(2024, 1, 1)
+    for i in range(count):
+        due = start + timedelta(days=rng.randrange(days), minutes=rng.randrange(0, 24 * 60, 15))
+        yield (f"Reminder {i}", "", due.strftime("%Y-%m-%d"), due.strftime("%H:%M"),
+               rng.choice(CATEGORIES), rng.choice(PRIORITIES), int(rng.random() < 0.3))
+
+
+def seed_reminders(db, count, **kwargs):
+    """Bulk insert count generated reminders"""
+    with sqlite3.connect(db.db_path) as conn:
+        conn.executemany('''
+            INSERT INTO reminders (title, description, date, time, category, priority, is_completed)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', generate_rows(count, **kwargs))
+    with sqlite3.connect(db.db_path) as conn:
+        return [row[0] for row in conn.execute('SELECT id FROM reminders ORDER BY id')]
+
+
+def report(title, results):
+    """Print one benchmark's results"""
+    print(f"\n{title}")
+    print("-" * len(title))
+    for label, value in results.items():
+        if isinstance(value, float):
+            print(f"  {label:<44}{value:>12.2f}")
+        else:
+            print(f"  {label:<44}{value!s:>12}")
+
+
+@benchmark("batch")
+def bench_batch_operations(rows=10000):
+    """Per-row manager calls versus batch APIs on rows selected reminders"""
+    from reminders import ReminderManager
+
+    results = {}
+    for mode in ("per-row", "batch"):
+        with temp_database() as db:
+            manager = ReminderManager(db=db)
+            ids = seed_reminders(db, rows)
+
+            if mode == "per-row":
+                with timer("per-row complete_reminder (ms)", results):
+                    for reminder_id in ids:
+                        manager.complete_reminder(reminder_id)
+                with timer("per-row delete_reminder (ms)", results):
+                    for reminder_id in ids:
+                        manager.delete_reminder(reminder_id)
+            else:
+                with timer("complete_many (ms)", results):
+                    manager.complete_many(ids)
+                with timer("reschedule_many +1d (ms)", results):
+                    manager.reschedule_many(ids, timedelta(days=1))
+                with timer("delete_many (ms)", results):
+                    manager.delete_many(ids)
+    report(f"Batch operations on {rows} selected reminders", results)
+    return results
+
+
+@benchmark("free-slots")
+def bench_free_slots(rows=20000, series=20):
+    """Year-long find_free_slots over one-off reminders plus daily/weekly series"""
+    from reminders import ReminderManager
+
+    results = {}
+    with temp_database() as db:
+        manager = ReminderManager(db=db)
+        seed_reminders(db, rows)
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute("UPDATE reminders SET duration_minutes = 30")
+        for i in range(series):
+            db.add_reminder(f"Series {i}", "", "2024-01-01", f"{8 + i % 10:02d}:15", "Work", "Normal",
+                            1, "Daily" if i % 2 else "Weekly", 15)
+
+        for label, days in (("1 week", 7), ("1 month", 30), ("1 year", 365)):
+            start = datetime(2024, 1, 1)
+            with timer(f"find_free_slots {label} (ms)", results):
+                slots = manager.find_free_slots(start, start + timedelta(days=days), 30)
+            results[f"slots found ({label})"] = len(slots)
+    report(f"Free-slot search over {rows} reminders and {series} series", results)
+    return results
+
+
+@benchmark("backup")
+def bench_backup(rows=1000000):
+    """Online backup duration and writer pause time at rows reminders"""
+    import threading
+    from backup import BackupManager
+
+    results = {}
+    with temp_database() as db:
+        with timer(f"seed {rows} rows (ms)", results):
+            seed_reminders(db, rows)
+        backup_dir = Path(db.db_path).parent / "backups"
+
+        for pages in (64, 256, 1024, -1):
+            manager = BackupManager(db.db_path, backup_dir, keep=1, pages_per_step=pages)
+            # A concurrent writer stands in for the GUI thread; its worst insert latency is the stall users feel
+            latencies = []
+            done = threading.Event()
+
+            def writer():
+                conn = sqlite3.connect(db.db_path, timeout=30)
+                while not done.is_set():
+                    start = time.perf_counter()
+                    with conn:
+                        conn.execute("INSERT INTO reminders (title, date, time) VALUES ('w', '2024-01-01', '09:00')")
+                    latencies.append(time.perf_counter() - start)
+                    time.sleep(0.01)
+                conn.close()
+
+            thread = threading.Thread(target=writer)
+            thread.start()
+            try:
+                result = manager.backup_now()
+            finally:
+                done.set()
+                thread.join()
+
+            label = "all pages" if pages < 0 else f"{pages} pages/step"
+            results[f"{label}: duration (ms)"] = result["duration_ms"]
+            results[f"{label}: max step lock (ms)"] = result["max_step_ms"]
+            results[f"{label}: max writer stall (ms)"] = max(latencies, default=0.0) * 1000
+            results[f"{label}: restarts"] = "single step" if result["single_step"] else result["restarts"]
+        results["snapshot size (MB)"] = result["size_bytes"] / 1e6
+    report(f"Online backup of {rows} reminders", results)
+    return results
+
+
+@benchmark("sync")
+def bench_sync(sizes=(10000, 100000), changes=(10, 100, 1000)):
+    """Delta sync time by table size and number of changed rows"""
+    from sync import FilePeer, SyncEngine
+
+    results = {}
+    for rows in sizes:
+        with temp_database() as local, temp_database() as remote:
+            ids = seed_reminders(local, rows)
+            peer = FilePeer(remote.db_path)
+            engine = SyncEngine(local)
+            with timer(f"{rows} rows: initial full sync (ms)", results):
+                engine.sync(peer)
+            for count in changes:
+                local.reschedule_many(ids[:count], 60)
+                result = engine.sync(peer)
+                results[f"{rows} rows: sync {count} changes (ms)"] = result["duration_ms"]
+            result = engine.sync(peer)
+            results[f"{rows} rows: sync with no changes (ms)"] = result["duration_ms"]
+            peer.close()
+    report("Delta sync against a database file", results)
+    return results
+
+
+@benchmark("timezones")
+def bench_timezones(rows=100000):
+    """UTC due-time backfill and display conversion via cached zone tables versus per-row tz resolution"""
+    from datetime import timezone
+    from config import COMMON_TIMEZONES
+    from timezones import load_zone, utc_to_local
+
+    results = {}
+    with temp_database() as db:
+        seed_reminders(db, rows)
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute("UPDATE reminders SET timezone = ?, due_utc = NULL", (COMMON_TIMEZONES[1],))
+            conn.execute("UPDATE reminders SET timezone = ? WHERE id % 3 = 0", (COMMON_TIMEZONES[7],))
+        with timer(f"fill_due_utc {rows} rows (ms)", results):
+            db.fill_due_utc()
+        reminders = db.query().fetch_columns("due_utc", "timezone")
+
+    with timer("display conversion, zone tables (ms)", results):
+        for due_utc, zone in reminders:
+            utc_to_local(due_utc, zone)
+    with timer("display conversion, tzinfo per row (ms)", results):
+        zones = {}
+        for due_utc, zone in reminders:
+            tz = zones.get(zone) or zones.setdefault(zone, load_zone(zone))
+            datetime.strptime(due_utc, "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc).astimezone(tz)
+    report(f"Timezone conversion of {rows} reminders", results)
+    return results
+
+
+@benchmark("month-nav")
+def bench_month_navigation(rows=100000, clicks=36, pause=0.05):
+    """Month-to-month navigation latency with and without the month view cache"""
+    from calendar import monthcalendar
+    from month_cache import MonthViewCache, shift_month
+
+    results = {}
+    with temp_database() as db:
+        seed_reminders(db, rows, days=3 * 365)
+        for mode in ("uncached", "cached"):
+            cache = MonthViewCache(db)
+            latencies = []
+            year, month = 2024, 1
+            for _ in range(clicks):
+                start = time.perf_counter()
+                if mode == "uncached":
+                    monthcalendar(year, month)
+                    cache.build(year, month)
+                else:
+                    cache.get(year, month)
+                latencies.append((time.perf_counter() - start) * 1000)
+                year, month = shift_month(year, month, 1)
+                time.sleep(pause)  # a user clicking "Next" every 50 ms
+            cache.stop()
+            results[f"{mode}: mean per click (ms)"] = sum(latencies) / len(latencies)
+            results[f"{mode}: max per click (ms)"] = max(latencies)
+            if mode == "cached":
+                results["cached: hits / misses"] = f"{cache.hits} / {cache.misses}"
+    report(f"Month navigation over {rows} reminders ({clicks} clicks)", results)
+    return results
+
+
+@benchmark("calendar-redraw")
+def bench_calendar_redraw(repeats=200):
+    """Calendar cell layout, damage size and Canvas redraw time per view (Tk part needs a display)"""
+    from datetime import date
+    from calendar_canvas import damaged_keys, month_cells, week_cells, year_cells
+
+    results = {}
+    today = date(2024, 6, 12)
+    summaries = {day: {"total": day % 5, "pending": day % 3, "top_priority": "High"} for day in range(1, 31)}
+    year_summaries = {date(2024, 1, 1) + timedelta(days=i): {"total": i % 9} for i in range(366)}
+    layouts = {
+        "month": lambda selected: month_cells(2024, 6, summaries, today, selected, 420, 320),
+        "week": lambda selected: week_cells(date(2024, 6, 10), {}, today, selected, 420, 320),
+        "year": lambda selected: year_cells(2024, year_summaries, today, selected, 900, 200),
+    }
+    for name, layout in layouts.items():
+        with timer(f"{name}: layout x{repeats} (ms)", results):
+            for _ in range(repeats):
+                layout(date(2024, 6, 14))
+        before, after = layout(date(2024, 6, 14)), layout(date(2024, 6, 13))
+        results[f"{name}: cells / redrawn on select"] = f"{len(after)} / {len(damaged_keys(before, after))}"
+
+    try:
+        import tkinter as tk
+        from calendar_canvas import CalendarCanvas
+        root = tk.Tk()
+    except Exception as e:
+        results["Tk redraw"] = f"skipped ({type(e).__name__})"
+        report("Calendar rendering", results)
+        return results
+
+    calendar = CalendarCanvas(root, width=420, height=320)
+    calendar.canvas.pack()
+    root.update()
+    for name, layout in layouts.items():
+        calendar.clear()
+        with timer(f"{name}: first draw (ms)", results):
+            calendar.render(layout(date(2024, 6, 14)))
+            root.update_idletasks()
+        start = time.perf_counter()
+        for i in range(repeats):
+            calendar.render(layout(date(2024, 6, 13 + i % 2)))
+            root.update_idletasks()
+        results[f"{name}: select redraw (ms)"] = (time.perf_counter() - start) * 1000 / repeats
+
+    # The old 42-Button grid, reconfigured cell by cell the way update_calendar used to
+    buttons = [tk.Button(root, text="") for _ in range(42)]
+    for i, button in enumerate(buttons):
+        button.grid(row=i // 7, column=i % 7)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for i, button in enumerate(buttons):
+            button.config(text="", state=tk.DISABLED, bg="#FFFFFF")
+            button.config(text=str(i), state=tk.NORMAL)
+            button.config(bg="#F3F4F6", fg="#111827")
+            button.config(command=lambda d=i: d)
+        root.update_idletasks()
+    results["button grid: month redraw (ms)"] = (time.perf_counter() - start) * 1000 / repeats
+    root.destroy()
+    report("Calendar rendering", results)
+    return results
+
+
+@benchmark("analytics")
+def bench_analytics(rows=1000000):
+    """Analytics summary with NumPy columns versus a per-row Python loop over reminder dicts"""
+    from datetime import date
+    from analytics import ReminderAnalytics
+
+    results = {}
+    if not ReminderAnalytics.available():
+        results["analytics"] = "skipped (numpy not installed)"
+        report("Analytics", results)
+        return results
+
+    today = date(2025, 1, 1)
+    with temp_database() as db:
+        seed_reminders(db, rows)
+        analytics = ReminderAnalytics(db)
+        with timer("numpy: load columns (ms)", results):
+            columns = analytics.load_columns()
+        with timer("numpy: compute (ms)", results):
+            analytics.compute(columns, today)
+        with timer("numpy: first summary (ms)", results):
+            analytics.summary(today)
+        with timer("numpy: cached summary (ms)", results):
+            analytics.summary(today)
+
+        # Baseline: the same statistics from get_all_reminders() dicts
+        with timer("python: load + compute (ms)", results):
+            by_category, by_weekday, aging = {}, [0] * 7, 0
+            for reminder in db.get_all_reminders():
+                day = date.fromisoformat(reminder["date"])
+                totals = by_category.setdefault(reminder["category"], [0, 0])
+                totals[0] += 1
+                totals[1] += reminder["is_completed"]
+                by_weekday[day.weekday()] += 1
+                if not reminder["is_completed"] and day < today:
+                    aging += 1
+    report(f"Analytics over {rows} reminders", results)
+    return results
+
+
+@benchmark("completion-report")
+def bench_completion_report(rows=1000000):
+    """Productivity reports over the completed_at index versus scanning every reminder"""
+    results = {}
+    with temp_database() as db:
+        seed_reminders(db, rows)
+        db.fill_due_utc()
+        with sqlite3.connect(db.db_path) as conn:
+            # Completed somewhere between two days early and three days late
+            conn.execute('''
+                UPDATE reminders
+                SET completed_at = strftime('%Y-%m-%d %H:%M:%S', due_utc, (abs(random()) % 7200 - 2880) || ' minutes')
+                WHERE is_completed = 1
+            ''')
+        for label, (start, end) in (("week", ("2024-06-03", "2024-06-09")), ("quarter", ("2024-04-01", "2024-06-30"))):
+            with timer(f"index: per day, {label} (ms)", results):
+                per_day = db.get_completions_per_day(start, end)
+            with timer(f"index: per week, {label} (ms)", results):
+                db.get_completions_per_week(start, end)
+            with timer(f"index: lateness, {label} (ms)", results):
+                lateness = db.get_completion_lateness(start, end)
+            results[f"{label}: completed / mean late (min)"] = \
+                f"{sum(per_day.values())} / {lateness['mean_lateness_minutes'] or 0:.0f}"
+
+            # Baseline: load every reminder and filter and bucket in Python
+            with timer(f"scan: per day + lateness, {label} (ms)", results):
+                counts, lateness_total = {}, 0.0
+                for reminder in db.get_all_reminders():
+                    completed_at = reminder["completed_at"]
+                    if completed_at and start <= completed_at[:10] <= end:
+                        counts[completed_at[:10]] = counts.get(completed_at[:10], 0) + 1
+                        done = datetime.strptime(completed_at, "%Y-%m-%d %H:%M:%S")
+                        lateness_total += (done - datetime.strptime(reminder["due_utc"], "%Y-%m-%d %H:%M")).total_seconds()
+    report(f"Completion reports over {rows} reminders", results)
+    return results
+
+
+@benchmark("alert-burst")
+def bench_alert_burst(counts=(100, 1000, 5000), notify_ms=1.0, popup_ms=2.0):
+    """Soak the alert path with reminders all due in the same minute, using stub notification backends"""
+    import contextlib
+    import io
+    from notifications import NotificationAggregator, NotificationManager
+    from reminders import ReminderManager
+    from scheduler import ReminderScheduler
+    from sounds import NullBackend, SoundPlayer
+    from timezones import utc_now
+
+    class StubNotificationManager(NotificationManager):
+        """Records notifications instead of showing them; each costs notify_ms like a real OS call"""
+
+        def __init__(self, aggregator):
+            super().__init__(SoundPlayer(NullBackend()), aggregator)
+            self.shown = 0
+
+        def show_notification(self, title, message):
+            time.sleep(notify_ms / 1000)
+            self.shown += 1
+
+    modes = {
+        "digest": NotificationAggregator,
+        # Every reminder alerted on its own, as before digests and rate limits
+        "per-alert": lambda: NotificationAggregator(threshold=float("inf"), limits={}),
+    }
+    results = {}
+    for count in counts:
+        for mode, make_aggregator in modes.items():
+            with temp_database() as db:
+                due = (utc_now() + timedelta(minutes=1)).replace(second=0, microsecond=0)
+                with sqlite3.connect(db.db_path) as conn:
+                    # The due minute is given in UTC so every reminder lands in one scheduler window
+                    conn.executemany('''
+                        INSERT INTO reminders (title, description, date, time, category, priority, timezone)
+                        VALUES (?, '', ?, ?, ?, ?, 'UTC')
+                    ''', [(f"Burst {i}", due.strftime("%Y-%m-%d"), due.strftime("%H:%M"),
+                           CATEGORIES[i % len(CATEGORIES)], PRIORITIES[i % len(PRIORITIES)]) for i in range(count)])
+                manager = ReminderManager(db.db_path)
+                notifier = StubNotificationManager(make_aggregator())
+                fired_at = []
+                ui_work = [0.0]
+
+                def show_popup(reminders):
+                    # Stands in for building an alert popup on the Tk thread
+                    start = time.perf_counter()
+                    time.sleep(popup_ms / 1000)
+                    ui_work[0] += time.perf_counter() - start
+                    fired_at.extend([time.perf_counter()] * len(reminders))
+
+                scheduler = ReminderScheduler(manager, notifier, on_fire=lambda reminder: show_popup([reminder]),
+                                              on_digest=show_popup)
+                scheduler.last_check = due - timedelta(minutes=1)
+                # The tick runs on the UI thread via root.after, so its whole duration is a UI stall
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    fired = scheduler.tick(due)
+                    stall = time.perf_counter() - start
+                    repeat = scheduler.tick(due + timedelta(seconds=30))
+                notifier.sound_player.wait()
+                notifier.sound_player.close()
+
+                latencies = sorted((moment - start) * 1000 for moment in fired_at)
+                prefix = f"{count} {mode}"
+                results[f"{prefix}: UI stall (ms)"] = stall * 1000
+                results[f"{prefix}: of which popups (ms)"] = ui_work[0] * 1000
+                if latencies:
+                    results[f"{prefix}: p95 alert after (ms)"] = latencies[int(len(latencies) * 0.95) - 1]
+                    results[f"{prefix}: last alert after (ms)"] = latencies[-1]
+                results[f"{prefix}: fired / dropped / repeated"] = \
+                    f"{len(fired)} / {count - len(fired) + db.get_undelivered_count()} / {len(repeat)}"
+                results[f"{prefix}: notifications / sounds"] = \
+                    f"{notifier.shown} / {len(notifier.sound_player.backend.played)}"
+                manager.db.close()
+    report(f"Alert burst (notification {notify_ms} ms, popup {popup_ms} ms)", results)
+    return results
+
+
+@benchmark("cli-startup")
+def bench_cli_startup(rows=200000, runs=15):
+    """Cold start of cli.py commands on a large database, against a bare interpreter start"""
+    import subprocess
+    import sys
+    from database import ReminderDatabase
+
+    cli = str(Path(__file__).with_name("cli.py"))
+    results = {}
+    with temp_database() as db:
+        seed_reminders(db, rows, start=datetime.now() - timedelta(days=180))
+        db.close()
+        # The first open fills derived columns; later commands open an up-to-date database
+        ReminderDatabase(db.db_path, replica=False).close()
+        db_path = str(db.db_path)
+        commands = {
+            "python -c pass": [sys.executable, "-c", "pass"],
+            "import cli": [sys.executable, "-c", f"import sys; sys.path.insert(0, {str(Path(cli).parent)!r}); import cli"],
+            "list --today --json": [sys.executable, cli, "--db", db_path, "--json", "list", "--today"],
+            "list --overdue --limit 20": [sys.executable, cli, "--db", db_path, "list", "--overdue", "--limit", "20"],
+            "add": [sys.executable, cli, "--db", db_path, "add", "Dentist", "--date", "2030-03-14", "--time", "15:30"],
+        }
+        for label, command in commands.items():
+            # Best of several runs: the floor is the start-up cost, the rest is scheduler noise
+            best = None
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            results[f"{label} (ms)"] = best
+        bare = results["python -c pass (ms)"]
+        for label in list(commands)[1:]:
+            results[f"{label} over bare start (ms)"] = results[f"{label} (ms)"] - bare
+    report(f"CLI cold start on {rows} reminders (best of {runs})", results)
+    return results
+
+
+@benchmark("snapshot")
+def bench_snapshot(rows=1000000):
+    """Columnar snapshot export, memory-mapped open and analysis versus reading SQLite row dicts"""
+    from analytics import ReminderAnalytics
+    from snapshot import available, export_snapshot, load_snapshot
+
+    results = {}
+    if not available():
+        results["snapshot"] = "skipped (numpy not installed)"
+        report("Columnar snapshot", results)
+        return results
+
+    with temp_database() as db:
+        seed_reminders(db, rows)
+        directory = Path(db.db_path).parent / "snapshot"
+        with timer("export snapshot (ms)", results):
+            export_snapshot(db, directory)
+        results["snapshot size (MB)"] = sum(f.stat().st_size for f in directory.iterdir()) / 2 ** 20
+        with timer("open snapshot, memory-mapped (ms)", results):
+            snapshot = load_snapshot(directory)
+        analytics = ReminderAnalytics(db)
+        with timer("analytics over snapshot (ms)", results):
+            analytics.compute(snapshot.analytics_columns())
+        with timer("analytics loading from SQLite (ms)", results):
+            analytics.compute(analytics.load_columns())
+        with timer("get_all_reminders() dicts (ms)", results):
+            db.get_all_reminders()
+    report(f"Columnar snapshot of {rows} reminders", results)
+    return results
+
+@benchmark("subtasks")
+def bench_subtasks(rows=100000, depth=2000, fanout=100):
+    """Recursive CTE subtree fetch, rollup, cascade complete and delete on deep and wide trees"""
+    results = {}
+    with temp_database() as db:
+        seed_reminders(db, rows)
+        shapes = {
+            # A chain depth levels deep
+            "deep": [(level, level - 1 if level else None) for level in range(depth + 1)],
+            # A root with fanout children, each with fanout children
+            "wide": [(0, None)] + [(i, 0) for i in range(1, fanout + 1)] +
+                    [(fanout + 1 + i, 1 + i // fanout) for i in range(fanout * fanout)],
+        }
+        for shape, nodes in shapes.items():
+            # Nodes are (index, parent index); ids are offset by the next free id
+            with sqlite3.connect(db.db_path) as conn:
+                base = conn.execute("SELECT MAX(id) FROM reminders").fetchone()[0] + 1
+                conn.executemany('''
+                    INSERT INTO reminders (id, title, description, date, time, parent_id, is_completed)
+                    VALUES (?, ?, '', '2024-06-01', '09:00', ?, ?)
+                ''', [(base + index, f"{shape} {index}", None if parent is None else base + parent, index % 2)
+                      for index, parent in nodes])
+            prefix = f"{shape} ({len(nodes)} nodes)"
+            with timer(f"{prefix}: get_subtree (ms)", results):
+                subtree = db.get_subtree(base)
+            with timer(f"{prefix}: rollup of root (ms)", results):
+                rollup = db.get_completion_rollup([base])
+            results[f"{prefix}: fetched / root percent"] = f"{len(subtree)} / {rollup[base]['percent']:.0f}%"
+            children = [reminder["id"] for reminder in db.get_children(base)]
+            with timer(f"{prefix}: rollup of {len(children)} children (ms)", results):
+                db.get_completion_rollup(children)
+            with timer(f"{prefix}: complete_subtree (ms)", results):
+                results[f"{prefix}: rows completed"] = db.complete_subtree(base)
+            with timer(f"{prefix}: delete_subtree (ms)", results):
+                results[f"{prefix}: rows deleted"] = db.delete_subtree(base)
+    report(f"Subtask trees among {rows} reminders", results)
+    return results
+
+@benchmark("tags")
+def bench_tags(rows=200000, vocabulary=500, lookups=1000):
+    """Tag intersection via the inverted index, maintained counts and trie autocomplete versus scans"""
+    import json
+    from tags import TagTrie
+
+    rng = random.Random(7)
+    # Zipf-like popularity: a few tags are everywhere, most are rare
+    names = [f"tag-{i:03d}" for i in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    results = {}
+    with temp_database() as db:
+        tagged = [(*row, json.dumps(sorted(set(rng.choices(names, weights, k=rng.randrange(4))))))
+                  for row in generate_rows(rows)]
+        with timer(f"insert {rows} tagged rows, index maintained (ms)", results):
+            with sqlite3.connect(db.db_path) as conn:
+                conn.executemany('''
+                    INSERT INTO reminders (title, description, date, time, category, priority, is_completed, tags)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', tagged)
+
+        counts = db.get_tag_counts()
+        ranked = [name for name, _ in counts if name.startswith("tag-")]
+        common, rare = ranked[0], ranked[len(ranked) // 2]
+        for expression in (f"{common} AND {ranked[1]}", f"{common} AND {rare}", f"{rare} OR {ranked[-1]}",
+                           f"Work AND {common} NOT {ranked[2]}"):
+            with timer(f"'{expression}' indexed (ms)", results):
+                matches = db.query().tags(expression).fetch_columns("id")
+            results[f"'{expression}' matches"] = len(matches)
+        # Without the index: substring tests on every row's JSON array
+        with sqlite3.connect(db.db_path) as conn:
+            postings = "SELECT reminder_id FROM reminder_tags WHERE tag_id = (SELECT id FROM tags WHERE name = ?)"
+            with timer(f"'{common} AND {rare}' INTERSECT (ms)", results):
+                conn.execute(f"{postings} INTERSECT {postings}", (common, rare)).fetchall()
+            with timer(f"'{common} AND {rare}' JSON scan (ms)", results):
+                conn.execute("SELECT id FROM reminders WHERE tags LIKE ? AND tags LIKE ?",
+                             (f'%"{common}"%', f'%"{rare}"%')).fetchall()
+            with timer("tag counts by GROUP BY over json_each (ms)", results):
+                conn.execute('''
+                    SELECT j.value, COUNT(*) FROM reminders, json_each(reminders.tags) j GROUP BY j.value
+                ''').fetchall()
+        with timer("tag counts, maintained (ms)", results):
+            db.get_tag_counts()
+
+        prefixes = [name[:rng.randrange(1, len(name))] for name in rng.choices(names, k=lookups)]
+        with timer("build trie (ms)", results):
+            trie = TagTrie(counts)
+        with timer(f"{lookups} autocompletes from trie (ms)", results):
+            for prefix in prefixes:
+                trie.complete(prefix)
+        with sqlite3.connect(db.db_path) as conn:
+            with timer(f"{lookups} autocompletes by SQL prefix query (ms)", results):
+                for prefix in prefixes:
+                    conn.execute("SELECT name FROM tags WHERE name LIKE ? ORDER BY reminder_count DESC LIMIT 8",
+                                 (prefix + "%",)).fetchall()
+
+        ids = rng.sample(range(1, rows + 1), 1000)
+        with timer("re-tag 1000 reminders (ms)", results):
+            with db.transaction():
+                for reminder_id in ids:
+                    db.set_tags(reminder_id, rng.choices(names, weights, k=2))
+    report(f"Tags over {rows} reminders, {vocabulary}-tag vocabulary", results)
+    return results
+
+
+@benchmark("occurrences")
+def bench_occurrences(rows=100000, series=2000, years=3, per_series=100):
+    """What's next from maintained next_due_at versus expanding series from their start; exception merge cost"""
+    from recurrence import iter_occurrences, iter_series, series_start
+    from timezones import utc_now
+
+    rng = random.Random(11)
+    now = utc_now().replace(second=0, microsecond=0)
+    now_text = now.strftime("%Y-%m-%d %H:%M")
+    first_day = now - timedelta(days=365 * years)
+    results = {}
+    with temp_database() as db:
+        seed_reminders(db, rows, start=now - timedelta(days=180))
+        with sqlite3.connect(db.db_path) as conn:
+            base = conn.execute("SELECT MAX(id) FROM reminders").fetchone()[0] + 1
+            starts = [first_day + timedelta(days=rng.randrange(365), minutes=rng.randrange(0, 24 * 60, 15))
+                      for _ in range(series)]
+            types = [rng.choice(("Daily", "Daily", "Weekly", "Monthly")) for _ in range(series)]
+            conn.executemany('''
+                INSERT INTO reminders (id, title, description, date, time, is_recurring, recurrence_type)
+                VALUES (?, ?, '', ?, ?, 1, ?)
+            ''', [(base + i, f"Series {i}", f"{start:%Y-%m-%d}", f"{start:%H:%M}", types[i])
+                  for i, start in enumerate(starts)])
+            # Past occurrences completed or skipped, a few recent ones moved a day later
+            exceptions = []
+            for i in range(series):
+                reminder = {"date": f"{starts[i]:%Y-%m-%d}", "time": f"{starts[i]:%H:%M}", "is_recurring": 1,
+                            "recurrence_type": types[i]}
+                past = list(iter_occurrences(reminder, now - timedelta(days=365), now + timedelta(days=7)))
+                for occurrence in past[-per_series:]:
+                    state, moved_to = rng.choice((("completed", None), ("completed", None), ("skipped", None),
+                                                  ("moved", f"{occurrence + timedelta(days=1):%Y-%m-%d %H:%M}")))
+                    exceptions.append((base + i, f"{occurrence:%Y-%m-%d}", state, moved_to))
+            conn.executemany('''
+                INSERT INTO occurrence_exceptions (reminder_id, occurrence_date, state, moved_to, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', exceptions)
+        results["series / exceptions"] = f"{series} / {len(exceptions)}"
+        with timer(f"fill next_due_at for {series} series (ms)", results):
+            db.fill_next_due(now_text)
+
+        with timer("what's next, 20 via index (ms)", results):
+            upcoming = db.get_next_due(20, now_text)
+        results["what's next first"] = upcoming[0].get("occurrence") or upcoming[0]["date"]
+
+        # Without next_due_at: walk every series from its start date, checking each occurrence's exception
+        with timer("what's next, expanding every series (ms)", results):
+            with sqlite3.connect(db.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                found = []
+                for reminder in conn.execute("SELECT * FROM reminders WHERE is_recurring = 1 AND is_completed = 0"):
+                    done = {row[0]: row[1] for row in conn.execute(
+                        "SELECT occurrence_date, moved_to FROM occurrence_exceptions WHERE reminder_id = ?",
+                        (reminder["id"],))}
+                    for occurrence in iter_occurrences(dict(reminder), series_start(reminder), datetime.max):
+                        if occurrence > now and f"{occurrence:%Y-%m-%d}" not in done:
+                            found.append(occurrence)
+                            break
+                found.sort()
+
+        # One daily series with years of exceptions: sorted merge versus a lookup per occurrence
+        reminder = db.get_reminders_by_ids([base])[0]
+        reminder.update(recurrence_type="Daily", date=f"{first_day:%Y-%m-%d}")
+        window_start, window_end = now - timedelta(days=365), now + timedelta(days=30)
+        history = [(f"{day:%Y-%m-%d}", "completed", None)
+                   for day in iter_occurrences(reminder, first_day, now)]
+        with timer(f"merge {len(history)} exceptions into 395 days (ms)", results):
+            merged = list(iter_series(reminder, window_start, window_end, history))
+        with timer("same, one SQL lookup per occurrence (ms)", results):
+            with sqlite3.connect(":memory:") as conn:
+                conn.execute("CREATE TABLE e (d TEXT PRIMARY KEY, state TEXT) WITHOUT ROWID")
+                conn.executemany("INSERT INTO e VALUES (?, ?)", [(day, state) for day, state, _ in history])
+                for occurrence in iter_occurrences(reminder, window_start, window_end):
+                    conn.execute("SELECT state FROM e WHERE d = ?", (f"{occurrence:%Y-%m-%d}",)).fetchone()
+        results["occurrences merged"] = len(merged)
+    report(f"Recurring occurrences: {series} series among {rows} reminders", results)
+    return results
+
+
+@benchmark("replica")
+def bench_replica(rows=200000, repeats=200, writes=500):
+    """Read latency and startup cost with the in-memory replica versus reading the database file"""
+    from database import ReminderDatabase
+
+    rng = random.Random(5)
+    results = {}
+    with temp_database() as db:
+        seed_reminders(db, rows)
+        db.close()
+        # First open fills derived columns for the seeded rows; time later opens only
+        ReminderDatabase(db.db_path, replica=False).close()
+        dates = [f"2024-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}" for _ in range(repeats)]
+        for mode in ("disk", "replica"):
+            with timer(f"{mode}: open (ms)", results):
+                reader = ReminderDatabase(db.db_path, replica=mode == "replica")
+            if reader.replica is not None:
+                results["replica: backup copy (ms)"] = reader.replica.load_ms
+            # The reads behind a GUI refresh: a day list, a month of summaries, a filter tab, a search
+            with timer(f"{mode}: {repeats} day lists (ms)", results):
+                for date in dates:
+                    reader.get_reminders_by_date(date)
+            with timer(f"{mode}: {repeats // 10} month summaries (ms)", results):
+                for date in dates[:repeats // 10]:
+                    reader.get_day_summaries(date[:8] + "01", date[:8] + "28")
+            with timer(f"{mode}: {repeats // 10} category tabs (ms)", results):
+                for date in dates[:repeats // 10]:
+                    reader.query().category(rng.choice(CATEGORIES)).completed(False).limit(200).fetch()
+            with timer(f"{mode}: {repeats // 40} searches (ms)", results):
+                for _ in range(repeats // 40):
+                    reader.query().text(f"Reminder {rng.randrange(rows)}").fetch()
+            ids = rng.sample(range(1, rows + 1), writes)
+            with timer(f"{mode}: {writes} single writes (ms)", results):
+                for reminder_id in ids:
+                    reader.mark_completed(reminder_id, True)
+            reader.close()
+            if reader.replica is not None:
+                reader.replica.close()
+    report(f"In-memory replica over {rows} reminders", results)
+    return results
+
+
+@benchmark("partitions")
+def bench_partitions(rows=300000, years=10, repeats=200):
+    """Date-bounded reads before and after moving completed past years into attached year files"""
+    import partition
+    from database import ReminderDatabase
+
+    rng = random.Random(6)
+    results = {}
+    this_year = datetime.now().year
+    first_year = this_year - years + 1
+    with temp_database() as db:
+        seed_reminders(db, rows, start=datetime(first_year, 1, 1), days=365 * years)
+        db.close()
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute("UPDATE reminders SET is_completed = 1 WHERE date < ?", (f"{this_year - 1}-01-01",))
+        ReminderDatabase(db.db_path, replica=False).close()
+        recent = [f"{this_year}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}" for _ in range(repeats)]
+        old = [f"{rng.randrange(first_year, this_year - 1)}-{rng.randrange(1, 13):02d}-01" for _ in range(repeats // 10)]
+        for mode in ("single file", "partitioned"):
+            if mode == "partitioned":
+                with timer("archive past years (ms)", results):
+                    moved = partition.archive(Path(db.db_path))
+                results["rows archived"] = sum(moved.values())
+            with timer(f"{mode}: open (ms)", results):
+                reader = ReminderDatabase(db.db_path, replica=False)
+            with timer(f"{mode}: {repeats} current-year day lists (ms)", results):
+                for date in recent:
+                    reader.get_reminders_by_date(date)
+            with timer(f"{mode}: {repeats // 10} current-year months (ms)", results):
+                for date in recent[:repeats // 10]:
+                    reader.get_day_summaries(date[:8] + "01", date[:8] + "28")
+            with timer(f"{mode}: {repeats // 10} past-year months (ms)", results):
+                for date in old:
+                    reader.get_day_summaries(date, date[:8] + "28")
+            with timer(f"{mode}: {repeats // 10} pending tabs (ms)", results):
+                for _ in range(repeats // 10):
+                    reader.query().category(rng.choice(CATEGORIES)).completed(False).limit(200).fetch()
+            with timer(f"{mode}: all-years search (ms)", results):
+                reader.query().text(f"Reminder {rng.randrange(rows)}").fetch()
+            reader.close()
+        results["main file (MB)"] = Path(db.db_path).stat().st_size / 1e6
+    report(f"Year partitions over {rows} reminders in {years} years", results)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run performance benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--list", action="store_true", help="list available benchmarks")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, func in BENCHMARKS.items():
+            print(f"{name:<16}{func.__doc__}")
+        return
+
+    for name in args.names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
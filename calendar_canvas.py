@@ -0,0 +1,200 @@
+"""
+Single-Canvas calendar renderer with month, week and year heatmap views and damage-region redraws
+"""
+
+import tkinter as tk
+from calendar import day_abbr, month_abbr, monthcalendar
+from collections import namedtuple
+from datetime import date, timedelta
+from config import COLORS, FONT_LABEL, FONT_SMALL, HEATMAP_COLORS, HEATMAP_STEPS, PRIORITY_COLORS, WEEK_VIEW_LINES
+
+CALENDAR_VIEWS = ("Month", "Week", "Year")
+
+HEADER_HEIGHT = 28
+
+# Everything drawn for one cell; cells whose Cell compares equal are left untouched on redraw
+Cell = namedtuple("Cell", "box fill outline text text_color anchor font marker marker_color")
+
+
+def damaged_keys(old, new):
+    """Keys of cells that must be redrawn going from one cell map to another"""
+    return [key for key, cell in new.items() if old.get(key) != cell]
+
+
+def _day_colors(day, weekday, today, selected):
+    """Cell background and text colour for a day, in the same precedence the button grid used"""
+    if day == today:
+        return COLORS["today"], COLORS["text_primary"]
+    if day == selected:
+        return COLORS["selected"], COLORS["text_inverse"]
+    if weekday >= 5:
+        return COLORS["weekend"], COLORS["text_secondary"]
+    return COLORS["background"], COLORS["text_primary"]
+
+
+def _day_headers(cells, cell_width):
+    for weekday in range(7):
+        x = weekday * cell_width
+        cells[("header", weekday)] = Cell(
+            (x, 0, x + cell_width, HEADER_HEIGHT),
+            COLORS["weekend"] if weekday >= 5 else COLORS["surface"], COLORS["surface"],
+            day_abbr[weekday], COLORS["text_primary"], tk.CENTER, FONT_LABEL, "", "",
+        )
+
+
+def month_cells(year, month, summaries, today, selected, width, height):
+    """Cells for a month grid; summaries maps day of month to get_day_summaries() rows"""
+    cell_width = width / 7
+    cell_height = (height - HEADER_HEIGHT) / 6
+    cells = {}
+    _day_headers(cells, cell_width)
+    for week_index, week in enumerate(monthcalendar(year, month)):
+        for weekday, day_number in enumerate(week):
+            if not day_number:
+                continue
+            day = date(year, month, day_number)
+            fill, text_color = _day_colors(day, weekday, today, selected)
+            summary = summaries.get(day_number)
+            marker = marker_color = ""
+            if summary and summary["pending"]:
+                marker = "•" * min(summary["pending"], 3)
+                marker_color = PRIORITY_COLORS.get(summary["top_priority"], COLORS["primary"])
+            x = weekday * cell_width
+            y = HEADER_HEIGHT + week_index * cell_height
+            cells[("day", day)] = Cell(
+                (x, y, x + cell_width, y + cell_height), fill, COLORS["border"],
+                str(day_number), text_color, tk.CENTER, FONT_LABEL, marker, marker_color,
+            )
+    return cells
+
+
+def week_cells(week_start, reminders, today, selected, width, height):
+    """Cells for the seven days from week_start; reminders maps date to (time, title, is_completed) rows"""
+    cell_width = width / 7
+    cells = {}
+    _day_headers(cells, cell_width)
+    for weekday in range(7):
+        day = week_start + timedelta(days=weekday)
+        fill, text_color = _day_colors(day, weekday, today, selected)
+        rows = reminders.get(day, [])
+        lines = [f"{day.day} {month_abbr[day.month]}"]
+        lines.extend(f"{'✓' if done else '•'} {time} {title[:14]}" for time, title, done in rows[:WEEK_VIEW_LINES])
+        if len(rows) > WEEK_VIEW_LINES:
+            lines.append(f"+{len(rows) - WEEK_VIEW_LINES} more")
+        x = weekday * cell_width
+        cells[("day", day)] = Cell(
+            (x, HEADER_HEIGHT, x + cell_width, height), fill, COLORS["border"],
+            "\n".join(lines), text_color, tk.NW, FONT_SMALL, "", "",
+        )
+    return cells
+
+
+def heat_color(count):
+    """Heatmap shade for a number of reminders on one day"""
+    level = sum(1 for step in HEATMAP_STEPS if count >= step)
+    return HEATMAP_COLORS[level]
+
+
+def year_cells(year, summaries, today, selected, width, height):
+    """Cells for a year heatmap, one column per week; summaries maps date to get_day_summaries() rows"""
+    first = date(year, 1, 1)
+    columns = (date(year, 12, 31) - first).days // 7 + 2
+    size = max(min(width / columns, (height - HEADER_HEIGHT) / 7), 2)
+    cells = {}
+    day = first
+    while day.year == year:
+        column = (day - first + timedelta(days=first.weekday())).days // 7
+        x = column * size
+        y = HEADER_HEIGHT + day.weekday() * size
+        if day.day == 1:
+            cells[("header", day.month)] = Cell(
+                (x, 0, x + 3 * size, HEADER_HEIGHT), COLORS["surface"], COLORS["surface"],
+                month_abbr[day.month], COLORS["text_secondary"], tk.CENTER, FONT_SMALL, "", "",
+            )
+        summary = summaries.get(day)
+        outline = COLORS["selected"] if day == selected else COLORS["text_primary"] if day == today else COLORS["surface"]
+        cells[("day", day)] = Cell(
+            (x, y, x + size, y + size), heat_color(summary["total"] if summary else 0), outline,
+            "", "", tk.CENTER, FONT_SMALL, "", "",
+        )
+        day += timedelta(days=1)
+    return cells
+
+
+class CalendarCanvas:
+    """Draws cell maps on one Canvas, updating only the items of cells that changed"""
+
+    def __init__(self, parent, on_select=None, on_resize=None, **options):
+        self.canvas = tk.Canvas(parent, bg=COLORS["surface"], highlightthickness=0, **options)
+        self.on_select = on_select
+        self.on_resize = on_resize
+        self.cells = {}
+        self.items = {}
+        self.last_damage = 0
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Configure>", self._on_configure)
+
+    def size(self):
+        """Current drawable size, falling back to the requested size before the first layout"""
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            width, height = self.canvas.winfo_reqwidth(), self.canvas.winfo_reqheight()
+        return width, height
+
+    def render(self, cells):
+        """Draw a cell map; returns how many cells were redrawn"""
+        for key in self.cells.keys() - cells.keys():
+            for item in self.items.pop(key):
+                self.canvas.delete(item)
+
+        damaged = damaged_keys(self.cells, cells)
+        for key in damaged:
+            cell = cells[key]
+            old = self.cells.get(key)
+            x0, y0, x1, y1 = cell.box
+            if old is None:
+                rect = self.canvas.create_rectangle(*cell.box, fill=cell.fill, outline=cell.outline)
+                text = self.canvas.create_text(0, 0, text=cell.text, fill=cell.text_color, anchor=cell.anchor,
+                                               font=cell.font)
+                marker = self.canvas.create_text(0, 0, text=cell.marker, fill=cell.marker_color, font=FONT_SMALL)
+                self.items[key] = (rect, text, marker)
+            else:
+                rect, text, marker = self.items[key]
+                if old.box != cell.box:
+                    self.canvas.coords(rect, *cell.box)
+                if (old.fill, old.outline) != (cell.fill, cell.outline):
+                    self.canvas.itemconfigure(rect, fill=cell.fill, outline=cell.outline)
+                if (old.text, old.text_color, old.anchor, old.font) != (cell.text, cell.text_color, cell.anchor, cell.font):
+                    self.canvas.itemconfigure(text, text=cell.text, fill=cell.text_color, anchor=cell.anchor,
+                                              font=cell.font)
+                if (old.marker, old.marker_color) != (cell.marker, cell.marker_color):
+                    self.canvas.itemconfigure(marker, text=cell.marker, fill=cell.marker_color)
+            if old is None or (old.box, old.anchor, bool(old.marker)) != (cell.box, cell.anchor, bool(cell.marker)):
+                if cell.anchor == tk.NW:
+                    self.canvas.coords(text, x0 + 4, y0 + 4)
+                    self.canvas.itemconfigure(text, width=max(x1 - x0 - 8, 1))
+                else:
+                    self.canvas.coords(text, (x0 + x1) / 2, (y0 + y1) / 2 - (6 if cell.marker else 0))
+                self.canvas.coords(marker, (x0 + x1) / 2, y1 - 9)
+        self.cells = cells
+        self.last_damage = len(damaged)
+        return self.last_damage
+
+    def clear(self):
+        """Remove every item, forcing a full redraw next time"""
+        self.canvas.delete("all")
+        self.cells = {}
+        self.items = {}
+
+    def _on_click(self, event):
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        for key, cell in self.cells.items():
+            x0, y0, x1, y1 = cell.box
+            if key[0] == "day" and x0 <= x < x1 and y0 <= y < y1:
+                if self.on_select:
+                    self.on_select(key[1])
+                return
+
+    def _on_configure(self, event):
+        if self.on_resize:
+            self.on_resize()
@@ -0,0 +1,340 @@
+"""
+Command-line interface for scripting and quick adds, without loading Tk
+
+    python cli.py add "Dentist" --date 2025-03-14 --time 15:30 --priority High
+    python cli.py list --overdue --json
+    python cli.py list --tags "work AND urgent-client"; python cli.py tags urg
+    python cli.py done 12 13
+    python cli.py add "Book venue" --parent 12; python cli.py tree 12
+    python cli.py occurrence skip 7 2025-03-17; python cli.py occurrences 7; python cli.py next
+    python cli.py export backup.json
+    python cli.py export --format columns history/   (NumPy column files for offline analysis)
+    python cli.py batch < commands.txt   (one command per line, all in one transaction)
+"""
+
+import argparse
+import json
+import os
+import shlex
+import sys
+from datetime import datetime, timedelta
+from functools import partial
+from reminders import ReminderManager
+from tags import parse_tags
+
+# Fields read from each object by "import"; everything else (id, uuid, timestamps) is regenerated
+IMPORT_FIELDS = ("title", "description", "date", "time", "category", "priority", "is_recurring",
+                 "recurrence_type", "duration_minutes", "timezone", "tags")
+
+
+class CommandError(Exception):
+    """A command that could not be carried out; aborts a batch"""
+
+
+class HelpFormatter(argparse.HelpFormatter):
+    """argparse's formatter, sized without importing shutil (every parser builds formatters at start-up)"""
+
+    def __init__(self, prog, **kwargs):
+        try:
+            width = int(os.environ.get("COLUMNS", 0)) or os.get_terminal_size().columns
+        except (ValueError, OSError):
+            width = 80
+        super().__init__(prog, width=width - 2, **kwargs)
+
+
+class BatchParser(argparse.ArgumentParser):
+    """Parser for batch lines: reports bad lines as CommandError instead of exiting"""
+
+    def error(self, message):
+        raise CommandError(message)
+
+
+def build_parser(parser_class=argparse.ArgumentParser):
+    parser_class = partial(parser_class, formatter_class=HelpFormatter)
+    parser = parser_class(prog="cli.py", description="Manage reminders from the command line")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--db", help="database file (default: this app's database)")
+    commands = parser.add_subparsers(dest="command", required=True, parser_class=parser_class)
+
+    add = commands.add_parser("add", help="add a reminder")
+    add.add_argument("title")
+    add.add_argument("--date", default=None, help="YYYY-MM-DD (default: today)")
+    add.add_argument("--time", default="09:00", help="HH:MM (default: 09:00)")
+    add.add_argument("--description", default="")
+    add.add_argument("--category", default="General")
+    add.add_argument("--priority", default="Normal")
+    add.add_argument("--duration", type=int, default=0, help="minutes")
+    add.add_argument("--timezone", default=None, help="IANA zone name (default: local zone)")
+    add.add_argument("--repeat", choices=("Daily", "Weekly", "Monthly"), help="make it recurring")
+    add.add_argument("--parent", type=int, default=None, help="id of the reminder this is a subtask of")
+    add.add_argument("--tags", default="", help="comma-separated tags")
+
+    listing = commands.add_parser("list", help="list reminders (default: pending)")
+    when = listing.add_mutually_exclusive_group()
+    when.add_argument("--today", action="store_true")
+    when.add_argument("--overdue", action="store_true")
+    when.add_argument("--upcoming", type=int, nargs="?", const=7, metavar="DAYS")
+    when.add_argument("--date", help="YYYY-MM-DD")
+    listing.add_argument("--all", action="store_true", help="include completed reminders")
+    listing.add_argument("--limit", type=int, default=None)
+    listing.add_argument("--tags", metavar="EXPR", help='tag expression, e.g. "work AND urgent-client", "a OR b", "a NOT b"')
+
+    done = commands.add_parser("done", help="mark reminders completed")
+    done.add_argument("ids", type=int, nargs="+")
+    done.add_argument("--subtasks", action="store_true", help="also complete every subtask")
+
+    tree = commands.add_parser("tree", help="show a reminder with all its subtasks and progress")
+    tree.add_argument("id", type=int)
+
+    occurrence = commands.add_parser("occurrence", help="complete, skip, move or reopen one occurrence of a series")
+    occurrence.add_argument("action", choices=("done", "skip", "move", "reopen"))
+    occurrence.add_argument("id", type=int)
+    occurrence.add_argument("date", help="the occurrence's original date, YYYY-MM-DD")
+    occurrence.add_argument("--to", nargs=2, metavar=("DATE", "TIME"), help="new date and time for move")
+
+    occurrences = commands.add_parser("occurrences", help="list a series' occurrences with their state")
+    occurrences.add_argument("id", type=int)
+    occurrences.add_argument("--days", type=int, default=14, help="days ahead from today (default: 14)")
+
+    upcoming = commands.add_parser("next", help="the soonest pending reminders, series at their next occurrence")
+    upcoming.add_argument("--limit", type=int, default=10)
+
+    search = commands.add_parser("search", help="find reminders by title or description")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=None)
+
+    tags = commands.add_parser("tags", help="list tags by use, or complete a tag prefix")
+    tags.add_argument("prefix", nargs="?", default="")
+
+    importing = commands.add_parser("import", help="add reminders from a JSON array or JSON lines file")
+    importing.add_argument("file", help="path, or - for stdin")
+
+    export = commands.add_parser("export", help="write reminders as a JSON array or a columnar snapshot")
+    export.add_argument("file", nargs="?", default="-", help="path, or - for stdout (default)")
+    export.add_argument("--format", choices=("json", "columns"), default="json",
+                        help="columns: a directory of memory-mappable .npy arrays (needs NumPy)")
+    export.add_argument("--from", dest="start", help="first date, YYYY-MM-DD")
+    export.add_argument("--to", dest="end", help="last date, YYYY-MM-DD")
+
+    commands.add_parser("batch", help="run commands read from stdin, one per line, in one transaction")
+    return parser
+
+
+def cmd_add(manager, args):
+    date = args.date or datetime.now().strftime("%Y-%m-%d")
+    reminder_id = manager.create_reminder(args.title, args.description, date, args.time, args.category,
+                                          args.priority, int(bool(args.repeat)), args.repeat, args.duration,
+                                          args.timezone, args.parent, parse_tags(args.tags))
+    if reminder_id is None:
+        raise CommandError(f"invalid reminder: {args.title!r} on {date} {args.time}")
+    return {"id": reminder_id}
+
+
+def cmd_list(manager, args):
+    if args.today:
+        reminders = manager.get_today_reminders()
+    elif args.overdue:
+        reminders = manager.get_overdue_reminders(args.limit)
+    elif args.upcoming is not None:
+        reminders = manager.get_upcoming_reminders(args.upcoming, args.limit)
+    else:
+        query = manager.db.query().date_range(args.date, args.date).tags(args.tags)
+        reminders = query.completed(None if args.all else False).limit(args.limit).fetch()
+    if args.tags and (args.today or args.overdue or args.upcoming is not None):
+        tagged = {row[0] for row in manager.db.query().tags(args.tags).fetch_columns("id")}
+        reminders = [r for r in reminders if r["id"] in tagged]
+    if not args.all:
+        reminders = [r for r in reminders if not r["is_completed"]]
+    return reminders[:args.limit] if args.limit is not None else reminders
+
+
+def cmd_done(manager, args):
+    if args.subtasks:
+        found = {reminder["id"] for reminder in manager.db.get_reminders_by_ids(args.ids)}
+        missing = [reminder_id for reminder_id in args.ids if reminder_id not in found]
+        if missing:
+            raise CommandError(f"{len(missing)} of {len(args.ids)} ids not found")
+        with manager.db.transaction():
+            completed = sum(manager.complete_with_subtasks(reminder_id) for reminder_id in args.ids)
+        return {"completed": completed}
+    # Raising inside the transaction rolls back the ids that were found too
+    with manager.db.transaction():
+        completed = manager.complete_many(args.ids)
+        if completed < len(args.ids):
+            raise CommandError(f"{len(args.ids) - completed} of {len(args.ids)} ids not found")
+    return {"completed": completed}
+
+
+def cmd_tree(manager, args):
+    subtree = manager.get_subtree(args.id)
+    if not subtree:
+        raise CommandError(f"id {args.id} not found")
+    progress = manager.get_progress([r["id"] for r in subtree])
+    for reminder in subtree:
+        reminder["progress"] = progress.get(reminder["id"])
+    return subtree
+
+
+def cmd_occurrence(manager, args):
+    if args.action == "move":
+        if not args.to:
+            raise CommandError("move needs --to DATE TIME")
+        changed = manager.move_occurrence(args.id, args.date, *args.to)
+    elif args.action == "reopen":
+        changed = manager.reopen_occurrence(args.id, args.date)
+    else:
+        action = manager.complete_occurrence if args.action == "done" else manager.skip_occurrence
+        changed = action(args.id, args.date)
+    if not changed:
+        raise CommandError(f"id {args.id} has no occurrence to {args.action} on {args.date}")
+    return {"id": args.id, "occurrence": args.date, "action": args.action}
+
+
+def cmd_occurrences(manager, args):
+    start = datetime.combine(datetime.now().date(), datetime.min.time())
+    return [{"occurrence": f"{original:%Y-%m-%d %H:%M}", "at": f"{actual:%Y-%m-%d %H:%M}", "state": state or "pending"}
+            for original, actual, state in manager.get_occurrences(args.id, start, start + timedelta(days=args.days))]
+
+
+def cmd_next(manager, args):
+    return manager.get_next_due(args.limit)
+
+
+def cmd_search(manager, args):
+    return manager.db.query().text(args.query).limit(args.limit).fetch()
+
+
+def cmd_tags(manager, args):
+    if args.prefix:
+        return [{"tag": name} for name in manager.suggest_tags(args.prefix)]
+    return [{"tag": name, "reminders": count} for name, count in manager.get_tag_counts()]
+
+
+def read_import(path):
+    """Reminder objects from a JSON array or JSON lines file"""
+    text = sys.stdin.read() if path == "-" else open(path, encoding="utf-8").read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _import_tags(tags):
+    """Tags from an import item: a list, an exported JSON array string, or a comma-separated string"""
+    if isinstance(tags, str):
+        tags = json.loads(tags) if tags.lstrip().startswith("[") else parse_tags(tags)
+    return tags or None
+
+
+def cmd_import(manager, args):
+    items = read_import(args.file)
+    with manager.db.transaction():
+        for number, item in enumerate(items, 1):
+            fields = {name: item.get(name) for name in IMPORT_FIELDS}
+            reminder_id = manager.create_reminder(
+                fields["title"], fields["description"] or "", fields["date"], fields["time"],
+                fields["category"] or "General", fields["priority"] or "Normal", fields["is_recurring"] or 0,
+                fields["recurrence_type"], fields["duration_minutes"] or 0, fields["timezone"],
+                tags=_import_tags(fields["tags"]),
+            )
+            if reminder_id is None:
+                raise CommandError(f"item {number}: invalid reminder {fields['title']!r}")
+            if item.get("is_completed"):
+                manager.complete_reminder(reminder_id)
+    return {"imported": len(items)}
+
+
+def cmd_export(manager, args):
+    if args.format == "columns":
+        if args.file == "-" or args.start or args.end:
+            raise CommandError("columnar export needs a directory and always covers every reminder")
+        # Imported here so plain commands never pay for loading NumPy
+        from snapshot import export_snapshot
+        meta = export_snapshot(manager.db, args.file)
+        return {"exported": meta["rows"], "directory": args.file}
+    reminders = manager.db.query().date_range(args.start, args.end).order_by("date_asc").fetch()
+    if args.file == "-":
+        return reminders
+    with open(args.file, "w", encoding="utf-8") as f:
+        json.dump(reminders, f, indent=2)
+    return {"exported": len(reminders), "file": args.file}
+
+
+def cmd_batch(manager, args):
+    parser = build_parser(BatchParser)
+    results = []
+    # The whole batch commits once at the end; any failing line rolls every line back
+    with manager.db.transaction():
+        for number, line in enumerate(sys.stdin, 1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            try:
+                line_args = parser.parse_args(shlex.split(line))
+                if line_args.command == "batch" or (line_args.command == "import" and line_args.file == "-"):
+                    raise CommandError(f"{line_args.command} reading stdin is not allowed inside a batch")
+                results.append(COMMANDS[line_args.command](manager, line_args))
+            except (CommandError, ValueError) as e:
+                raise CommandError(f"line {number}: {e}") from None
+    return results
+
+
+COMMANDS = {
+    "add": cmd_add,
+    "list": cmd_list,
+    "done": cmd_done,
+    "tree": cmd_tree,
+    "occurrence": cmd_occurrence,
+    "occurrences": cmd_occurrences,
+    "next": cmd_next,
+    "search": cmd_search,
+    "tags": cmd_tags,
+    "import": cmd_import,
+    "export": cmd_export,
+    "batch": cmd_batch,
+}
+
+
+def format_reminder(reminder):
+    status = "✓" if reminder["is_completed"] else " "
+    due = reminder.get("occurrence") or f"{reminder['date']} {reminder['time']}"
+    line = (f"[{status}] #{reminder['id']:<6} {due}  "
+            f"{reminder['priority']:<7} {reminder['category']:<9} {'  ' * reminder.get('depth', 0)}{reminder['title']}")
+    if reminder.get("tags"):
+        line += "  " + " ".join(f"#{tag}" for tag in json.loads(reminder["tags"]))
+    progress = reminder.get("progress")
+    if progress and progress["subtasks"]:
+        line += f"  ({progress['completed']}/{progress['subtasks']}, {progress['percent']:.0f}%)"
+    return line
+
+
+def print_result(result, as_json):
+    if as_json:
+        # dumps() encodes in one C pass; dump() to a stream goes through the pure-Python encoder chunk by chunk
+        sys.stdout.write(json.dumps(result, indent=None if isinstance(result, list) else 2) + "\n")
+    elif isinstance(result, list):
+        for item in result:
+            if isinstance(item, dict) and "title" in item:
+                print(format_reminder(item))
+            else:
+                print_result(item, as_json)  # batch results, one per line
+    else:
+        print(", ".join(f"{key}: {value}" for key, value in result.items()))
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # A one-shot command would spend longer copying the database into memory than it saves
+    manager = ReminderManager(args.db, replica=False)
+    try:
+        result = COMMANDS[args.command](manager, args)
+    except (CommandError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        manager.db.close()
+    # Exports to stdout are JSON regardless of --json
+    print_result(result, args.json or (args.command == "export" and args.file == "-"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,10 +16,32 @@ WINDOW_TITLE = f"{APP_NAME} v{APP_VERSION}"
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 DATABASE_PATH = DATA_DIR / "reminders.db"
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+DATABASE_WAL = True  # write-ahead logging lets background readers (backups, prefetch) run beside writers
+DATABASE_REPLICA = False  # copy the database into memory at startup and serve reads from the copy
+REPLICA_CHECK_INTERVAL = 2.0  # seconds between checks for writes made by other processes
+PARTITION_KEEP_YEARS = 1  # past years kept in the main file by partition.py, besides the current one
+PARTITION_MAX_FILES = 9  # year files attached at most (SQLite attaches 10); the oldest absorbs older years
 
 # Create data directory if it doesn't exist
 DATA_DIR.mkdir(exist_ok=True)
 
+# Backups
+BACKUP_ENABLED = True
+BACKUP_DIR = DATA_DIR / "backups"
+BACKUP_INTERVAL = 6 * 60 * 60  # seconds between snapshots
+BACKUP_KEEP = 7  # snapshots retained
+BACKUP_PAGES_PER_STEP = 256  # pages copied per lock acquisition
+BACKUP_STEP_SLEEP = 0.005  # seconds between steps so writers can get in
+BACKUP_MAX_RESTARTS = 3  # restarts caused by concurrent writes before copying in one step
+
+# Sync (REMINDER_SYNC_PEER is another database file or a sync server URL such as http://127.0.0.1:8765)
+SYNC_PEER = os.environ.get("REMINDER_SYNC_PEER", "")
+SYNC_SERVER_HOST = "127.0.0.1"
+SYNC_SERVER_PORT = 8765
+SYNC_TIMEOUT = 30  # seconds to wait for a sync server reply
+SYNC_POLL_INTERVAL = 100  # milliseconds between checks for a finished background sync
+
 # Professional Color Palette (Modern Light Theme)
 COLORS = {
     # Primary colors
@@ -93,6 +115,95 @@ REMINDER_SOUND_ENABLED = True
 REMINDER_NOTIFICATION_ENABLED = True
 REMINDER_CHECK_INTERVAL = 60000  # milliseconds (check every minute)
 
+# Alert Sounds
+SOUND_BACKEND = os.environ.get("REMINDER_SOUND_BACKEND", "auto")  # auto, winsound, afplay, stream, wav, null
+SOUND_SAMPLE_RATE = 22050
+SOUND_OUTPUT_DIR = DATA_DIR / "sounds"  # used by the "wav" backend
+
+# Per-priority alert sounds: a list of (frequency Hz, duration ms) beeps or a path to a 16-bit WAV file
+PRIORITY_SOUNDS = {
+    "Low": [(660, 150)],
+    "Normal": [(880, 200)],
+    "High": [(1500, 300), (1000, 300)],
+    "Urgent": [(1500, 250), (1000, 250), (1500, 250), (1000, 250)],
+}
+
+# Snooze & Escalation
+# Minutes between re-alerts of an unacknowledged reminder (None = alert once)
+REALERT_INTERVALS = {
+    "Low": None,
+    "Normal": 30,
+    "High": 15,
+    "Urgent": 5,
+}
+ESCALATE_AFTER = 2  # unacknowledged High re-alerts before switching to the Urgent cadence
+MAX_REALERTS = 12
+SNOOZE_OPTIONS = [5, 15, 60]  # minutes offered on the alert popup
+TIMER_WHEEL_SLOTS = 24 * 60  # one slot per minute of the day
+
+# Notification delivery log
+NOTIFICATION_CATCHUP_MINUTES = 12 * 60  # missed reminders this recent are fired at startup
+NOTIFICATION_CLAIM_LEASE = 120  # seconds before an undelivered claim may be taken over
+
+# Notification storms
+DIGEST_THRESHOLD = 3  # reminders due in one check at or above this count go out as a single digest
+DIGEST_MAX_TITLES = 5  # titles listed in a digest notification before "and N more"
+# Per-priority token buckets as (notifications per minute, burst); alerts over the limit join the digest
+NOTIFICATION_RATE_LIMITS = {
+    "Low": (2, 2),
+    "Normal": (4, 4),
+    "High": (10, 5),
+    "Urgent": (30, 10),
+}
+
+# Profiling (opt-in: REMINDER_PROFILE=1 times hot paths, REMINDER_CPROFILE=1 also runs cProfile)
+PROFILING_ENABLED = os.environ.get("REMINDER_PROFILE", "") == "1"
+CPROFILE_SESSION = os.environ.get("REMINDER_CPROFILE", "") == "1"
+PROFILE_WINDOW = 500  # recent samples kept per metric
+PROFILE_OUTPUT_DIR = DATA_DIR / "profiles"
+PROFILE_REFRESH_INTERVAL = 5000  # milliseconds between dashboard summary updates
+
+# Event-loop watchdog (header shows scheduling lag; clicking it lists recorded UI stalls)
+WATCHDOG_ENABLED = True
+WATCHDOG_INTERVAL = 100  # milliseconds between heartbeats on the Tk thread
+STALL_THRESHOLD = 250  # milliseconds without a heartbeat before the main thread's stack is captured
+STALL_LOG_SIZE = 50  # stalls kept for the stall log
+LAG_WARN_MS = 50  # lag shown in amber from here, red from STALL_THRESHOLD
+LAG_REFRESH_INTERVAL = 1000  # milliseconds between header lag indicator updates
+
+# Timezones (reminders without a zone use REMINDER_TIMEZONE, or the system zone when unset)
+DEFAULT_TIMEZONE = os.environ.get("REMINDER_TIMEZONE") or None
+TIMEZONE_TABLE_YEARS = 10  # years of offset transitions computed per zone at a time
+COMMON_TIMEZONES = [
+    "UTC", "Europe/London", "Europe/Berlin", "Asia/Kolkata", "Asia/Singapore", "Asia/Tokyo",
+    "Australia/Sydney", "America/New_York", "America/Chicago", "America/Denver", "America/Los_Angeles",
+]
+
+# Planning
+WORKING_HOURS = ("09:00", "17:00")  # default window searched by find_free_slots
+WORKING_DAYS = (0, 1, 2, 3, 4)  # Monday=0 ... Sunday=6
+
+# Calendar views
+HEATMAP_COLORS = ["#EBEDF0", "#C6E0FF", "#7DB6FF", "#3D8BFF", "#0052CC"]  # year view, none -> busiest
+HEATMAP_STEPS = (1, 2, 4, 8)  # reminders per day needed for each darker shade
+WEEK_VIEW_LINES = 6  # reminders listed per day in the week view
+
+# Calendar navigation
+MONTH_CACHE_SIZE = 24  # month views kept in memory
+MONTH_PREFETCH_RADIUS = 2  # months on each side built in the background after navigating
+
+# Analytics
+AGING_BUCKETS = (1, 3, 7, 30, 90)  # lower bounds (days overdue) of the aging histogram buckets
+TREND_MONTHS = 12  # months shown in the due/completed trend
+SNAPSHOT_CHUNK_ROWS = 100000  # rows fetched from SQLite per step when writing a columnar snapshot
+
+# Filters
+FILTER_RESULT_LIMIT = 500  # rows shown in the Smart Filters results list
+
+# Tags (a reminder's category is also one of its tags; categories offered are the tags in use)
+DEFAULT_CATEGORIES = ["Work", "Personal", "Health", "Shopping", "General"]  # offered until used as tags
+TAG_SUGGESTION_LIMIT = 8  # autocomplete suggestions kept per prefix
+
 # Category Colors
 CATEGORY_COLORS = {
     "Work": "#0066FF",
@@ -2,21 +2,384 @@
 Database management for reminders
 """
 
+import heapq
+import itertools
+import json
 import sqlite3
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from config import DATABASE_PATH
+from instrumentation import instrumented
+from recurrence import next_occurrence
+from tags import parse_tag_expression, unique_tags
+from timezones import format_minute, get_zone_table, local_to_utc, utc_now, utc_to_local
+from config import DATABASE_PATH, DATABASE_REPLICA, DATABASE_WAL, STATEMENT_CACHE_SIZE, NOTIFICATION_CLAIM_LEASE
 
+# Max ids bound per "IN (...)" statement, well under SQLite's variable limit
+ID_CHUNK_SIZE = 500
+
+REMINDER_COLUMNS = {
+    "id", "title", "description", "date", "time", "category", "priority", "is_completed",
+    "is_recurring", "recurrence_type", "duration_minutes", "created_at", "updated_at", "uuid", "version",
+    "timezone", "due_utc", "completed_at", "parent_id", "tags", "next_due_at",
+}
+
+# Columns added after the original schema, applied to older databases on startup
+COLUMN_MIGRATIONS = [
+    ("is_recurring", "INTEGER DEFAULT 0"),
+    ("recurrence_type", "TEXT"),
+    ("duration_minutes", "INTEGER DEFAULT 0"),
+    ("uuid", "TEXT"),
+    ("version", "INTEGER DEFAULT 1"),
+    ("timezone", "TEXT"),
+    ("due_utc", "TEXT"),
+    ("completed_at", "TEXT"),
+    ("parent_id", "INTEGER"),
+    ("tags", "TEXT"),
+    ("next_due_at", "TEXT"),
+]
+
+# User-editable columns exchanged by delta sync; editing any of them bumps the row version
+SYNC_COLUMNS = (
+    "title", "description", "date", "time", "category", "priority", "is_completed",
+    "is_recurring", "recurrence_type", "duration_minutes", "timezone", "tags",
+)
+
+# Highest pending priority of a day as ranked in get_day_summaries (0 = nothing pending)
+PRIORITY_RANKS = [None, "Low", "Normal", "High", "Urgent"]
+
+SYNC_TIMESTAMP_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+# next_due_at of a series with no occurrence left to do; sorts after every real UTC minute
+NO_NEXT_DUE = "9999-12-31 23:59"
+
+# UTC completion time, comparable as text with due_utc
+COMPLETED_AT_SQL = "strftime('%Y-%m-%d %H:%M:%S', 'now')"
+
+# Tag names of a reminder row: its JSON tags array plus its category, which doubles as its primary tag
+ROW_TAGS_SQL = (
+    "SELECT value FROM json_each(COALESCE({row}.tags, '[]')) "
+    "UNION SELECT {row}.category WHERE {row}.category IS NOT NULL AND {row}.category != ''"
+)
+
+# Id of the tag named by ? (case-insensitive through the column's NOCASE collation)
+TAG_ID_SQL = "(SELECT id FROM tags WHERE name = ?)"
+
+# Ids of the reminder bound to ? and all of its subtasks, for use as "id IN (...)"
+# (kept inside a subquery so statements still start with UPDATE/DELETE and report their rowcount)
+SUBTREE_IDS_SQL = '''
+    WITH RECURSIVE subtree(id) AS (
+        SELECT id FROM reminders WHERE id = ?
+        UNION ALL
+        SELECT r.id FROM reminders r JOIN subtree s ON r.parent_id = s.id
+    )
+    SELECT id FROM subtree
+'''
+
+# Inclusive [start, end] UTC minute span of a reminder, used as its R*Tree box; the wall time stands in
+# only until _fill_due_utc() sets due_utc, whose update refreshes the box
+SLOT_START_SQL = "CAST(strftime('%s', COALESCE({row}.due_utc, {row}.date || ' ' || {row}.time)) AS INTEGER) / 60"
+SLOT_END_SQL = SLOT_START_SQL + " + MAX(COALESCE({row}.duration_minutes, 0), 1) - 1"
+
+# Whitelisted ORDER BY clauses for ReminderQuery (never interpolate user input)
+QUERY_ORDERINGS = {
+    "date_desc": "date DESC, time ASC",
+    "date_asc": "date ASC, time ASC",
+}
+
+
+def _encode_tags(tags):
+    """Store a tag list as a JSON array (None stays None)"""
+    return None if tags is None else json.dumps(unique_tags(tags))
+
+
+def sync_precedence(change):
+    """Ordering key deciding which copy of a row wins: higher version, then later edit, then content"""
+    return (change["version"] or 0, change["updated_at"] or "", change["deleted"],
+            tuple(str(change.get(column)) for column in SYNC_COLUMNS))
+
+
+@lru_cache(maxsize=128)
+def _compile_query(shape, ordering, select, source="reminders"):
+    """Build the SQL text for a query shape; cached so equal shapes reuse one statement
+
+    source is the FROM clause: the reminders table, or it unioned with year partitions (see
+    ReminderDatabase.partition_source).
+    """
+    clauses = []
+    for name, arity in shape:
+        if name in ("category", "priority"):
+            if arity == 1:
+                clauses.append(f"{name} = ?")
+            else:
+                clauses.append(f"{name} IN ({', '.join('?' * arity)})")
+        elif name == "start_date":
+            clauses.append("date >= ?")
+        elif name == "end_date":
+            clauses.append("date <= ?")
+        elif name == "is_completed":
+            clauses.append("is_completed = ?")
+        elif name == "is_recurring":
+            clauses.append("is_recurring = ?")
+        elif name == "text":
+            clauses.append("(title LIKE ? OR description LIKE ?)")
+        elif name == "tags":
+            clauses.append(f"id IN ({_compile_tag_expression(arity)})")
+
+    sql = f"SELECT {select} FROM {source}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    if select != "COUNT(*)":
+        sql += f" ORDER BY {QUERY_ORDERINGS[ordering]} LIMIT ?"
+    return sql
+
+
+def _compile_tag_expression(groups):
+    """Reminder ids matching OR-ed groups of AND-ed tag terms, given as tuples of negated flags
+
+    Each group walks the posting list of its first tag (the rarest, see ReminderQuery.tags) and
+    probes the (tag_id, reminder_id) key for every other term, so an intersection costs the size
+    of its smallest list rather than the sum of all of them. Groups are combined with UNION.
+    """
+    selects = []
+    for group in groups:
+        if group[0]:
+            # Only negated terms ("NOT done"): start from every reminder
+            select, candidate, probes = "SELECT p.id FROM reminders p WHERE 1", "p.id", group
+        else:
+            select = f"SELECT p.reminder_id FROM reminder_tags p WHERE p.tag_id = {TAG_ID_SQL}"
+            candidate, probes = "p.reminder_id", group[1:]
+        for negated in probes:
+            select += (f" AND {'NOT ' if negated else ''}EXISTS (SELECT 1 FROM reminder_tags"
+                       f" WHERE tag_id = {TAG_ID_SQL} AND reminder_id = {candidate})")
+        selects.append(select)
+    return " UNION ".join(selects)
+
+
+@instrumented("query", methods=("fetch", "fetch_columns", "count"))
+class ReminderQuery:
+    """Composable multi-criteria filter compiled to a single parameterized statement"""
+
+    def __init__(self, db):
+        self.db = db
+        self.criteria = {}
+        self.ordering = "date_desc"
+        self.max_rows = -1
+
+    def category(self, *categories):
+        """Restrict to one or more categories"""
+        if categories:
+            self.criteria["category"] = tuple(categories)
+        return self
+
+    def priority(self, *priorities):
+        """Restrict to one or more priorities"""
+        if priorities:
+            self.criteria["priority"] = tuple(priorities)
+        return self
+
+    def date_range(self, start_date=None, end_date=None):
+        """Restrict to dates between start_date and end_date (inclusive, YYYY-MM-DD)"""
+        if start_date:
+            self.criteria["start_date"] = (start_date,)
+        if end_date:
+            self.criteria["end_date"] = (end_date,)
+        return self
+
+    def completed(self, is_completed):
+        """Restrict to completed (True) or pending (False) reminders"""
+        if is_completed is not None:
+            self.criteria["is_completed"] = (int(is_completed),)
+        return self
+
+    def recurring(self, is_recurring):
+        """Restrict to recurring (True) or one-off (False) reminders"""
+        if is_recurring is not None:
+            self.criteria["is_recurring"] = (int(is_recurring),)
+        return self
+
+    def text(self, query):
+        """Restrict to reminders whose title or description contains query"""
+        if query:
+            self.criteria["text"] = (f"%{query}%", f"%{query}%")
+        return self
+
+    def tags(self, expression):
+        """Restrict to reminders matching a tag expression such as "work AND urgent-client" (see parse_tag_expression)"""
+        if not expression or not expression.strip():
+            return self
+        groups = parse_tag_expression(expression)
+        counts = dict(self.db.get_tag_counts([name for group in groups for _, name in group]))
+        counts = {name.casefold(): count for name, count in counts.items()}
+        # Rarest positive term first (an unknown tag empties its group at once), negated terms last
+        groups = tuple(sorted(group, key=lambda term: (term[0], counts.get(term[1].casefold(), 0)))
+                       for group in groups)
+        shape = tuple(tuple(negated for negated, _ in group) for group in groups)
+        self.criteria["tags"] = (shape, tuple(name for group in groups for _, name in group))
+        return self
+
+    def order_by(self, ordering):
+        """Set result ordering, one of QUERY_ORDERINGS"""
+        if ordering not in QUERY_ORDERINGS:
+            raise ValueError(f"Unknown ordering: {ordering}")
+        self.ordering = ordering
+        return self
+
+    def limit(self, max_rows):
+        """Cap the number of rows returned by fetch()"""
+        self.max_rows = max_rows if max_rows is not None else -1
+        return self
+
+    def _shape_and_params(self):
+        """Return the cache key describing this query's clauses plus its bound parameters"""
+        shape = []
+        params = []
+        # Fixed clause order keeps the SQL text stable for equal shapes
+        for name in ("category", "priority", "start_date", "end_date", "is_completed", "is_recurring", "text", "tags"):
+            values = self.criteria.get(name)
+            if values is None:
+                continue
+            if name == "tags":
+                # The group structure is part of the shape; only the tag names are bound
+                groups, values = values
+                shape.append((name, groups))
+            else:
+                shape.append((name, len(values) if name in ("category", "priority") else 1))
+            params.extend(values)
+        return tuple(shape), params
+
+    def to_sql(self, select="*"):
+        """Return (sql, params) for this query"""
+        shape, params = self._shape_and_params()
+        # Only partitions overlapping the date range are read, and none at all for pending reminders
+        partitions = self.db.partitions_for(self.criteria.get("start_date", (None,))[0],
+                                            self.criteria.get("end_date", (None,))[0],
+                                            self.criteria.get("is_completed", (None,))[0])
+        sql = _compile_query(shape, self.ordering, select, self.db.partition_source(partitions))
+        if select != "COUNT(*)":
+            params.append(self.max_rows)
+        return sql, params
+
+    def fetch(self):
+        """Run the query and return matching reminders"""
+        sql, params = self.to_sql()
+        try:
+            with self.db._connect() as conn:
+                return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        except Exception as e:
+            print(f"Error querying reminders: {e}")
+            return []
+
+    def fetch_columns(self, *columns):
+        """Run the query returning plain tuples of the named columns (no per-row dicts)"""
+        unknown = set(columns) - REMINDER_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        sql, params = self.to_sql(select=", ".join(columns))
+        try:
+            with self.db._connect() as conn:
+                return [tuple(row) for row in conn.execute(sql, params).fetchall()]
+        except Exception as e:
+            print(f"Error querying reminders: {e}")
+            return []
+
+    def count(self):
+        """Count matching reminders without fetching them"""
+        sql, params = self.to_sql(select="COUNT(*)")
+        try:
+            with self.db._connect() as conn:
+                return conn.execute(sql, params).fetchone()[0]
+        except Exception as e:
+            print(f"Error counting reminders: {e}")
+            return 0
+
+
+@instrumented("db")
 class ReminderDatabase:
-    def __init__(self):
-        self.db_path = DATABASE_PATH
+    def __init__(self, db_path=None, replica=None):
+        """replica=True serves reads from an in-memory copy of the file (default: DATABASE_REPLICA)"""
+        self.db_path = db_path or DATABASE_PATH
+        self._local = threading.local()
+        self.has_interval_index = False
+        self.replica = None
+        self.partitions = []
+        self._partition_selects = {}
         self.init_database()
-    
+        if self.partitions:
+            # Reopen so the connection attaches the partitions (ATTACH cannot run inside init's transaction)
+            self.close()
+        if DATABASE_REPLICA if replica is None else replica:
+            # Imported here so the default on-disk mode never loads it
+            from replica import ReadReplica
+            self.close()
+            self.replica = ReadReplica(self.db_path)
+
+    def _get_connection(self):
+        """Return the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # A long-lived connection keeps sqlite3's prepared statement cache warm
+            conn = sqlite3.connect(self.db_path, cached_statements=STATEMENT_CACHE_SIZE)
+            if self.replica is not None:
+                conn = self.replica.connect(conn)
+            conn.row_factory = sqlite3.Row
+            if self.partitions:
+                self._attach_partitions(conn)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _connect(self):
+        """Yield the thread's connection, committing on success and rolling back on error"""
+        conn = self._get_connection()
+        if getattr(self._local, "depth", 0):
+            # Inside transaction(): the outermost block commits or rolls back
+            yield conn
+            return
+        with conn:
+            yield conn
+
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @contextmanager
+    def transaction(self):
+        """Yield the thread's connection inside one write transaction, locking out other writers up front
+
+        Nested transaction() blocks and every method called inside join the outermost transaction.
+        """
+        conn = self._get_connection()
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            try:
+                yield conn
+            finally:
+                self._local.depth = depth
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.depth = 0
+        conn.commit()
+
     def init_database(self):
         """Initialize database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
+        if DATABASE_WAL:
+            self._get_connection().execute("PRAGMA journal_mode=WAL")
+        with self._connect() as conn:
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS reminders (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     title TEXT NOT NULL,
@@ -28,149 +391,1341 @@ class ReminderDatabase:
                     is_completed INTEGER DEFAULT 0,
                     is_recurring INTEGER DEFAULT 0,
                     recurrence_type TEXT,
+                    duration_minutes INTEGER DEFAULT 0,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    uuid TEXT,
+                    version INTEGER DEFAULT 1,
+                    timezone TEXT,
+                    due_utc TEXT,
+                    completed_at TEXT,
+                    parent_id INTEGER,
+                    tags TEXT,
+                    next_due_at TEXT
                 )
             ''')
-            conn.commit()
-    
-    def add_reminder(self, title, description, date, time, category, priority, is_recurring=0, recurrence_type=None):
-        """Add a new reminder"""
+            added = self._migrate_columns(conn)
+            # Indexes backing the date lookups and the ReminderQuery filters
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_date_time ON reminders(date, time)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_category ON reminders(category, date)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_priority ON reminders(priority, date)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_completed ON reminders(is_completed, date)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_due_utc ON reminders(due_utc)')
+            # due_utc is derived in Python; clearing it on edits lets fill_due_utc() find stale rows by index
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS reminders_due_utc_reset
+                AFTER UPDATE OF date, time, timezone ON reminders
+                BEGIN
+                    UPDATE reminders SET due_utc = NULL WHERE id = NEW.id;
+                END
+            ''')
+            # One row per delivered occurrence; the UNIQUE pair is what makes delivery exactly-once
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS notification_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    reminder_id INTEGER NOT NULL,
+                    occurrence_time TEXT NOT NULL,
+                    claimed_at TEXT NOT NULL,
+                    delivered_at TEXT,
+                    backend TEXT,
+                    latency_ms REAL,
+                    UNIQUE (reminder_id, occurrence_time)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_notification_log_delivered ON notification_log(delivered_at)')
+            self._init_interval_index(conn)
+            self._init_sync(conn)
+            self._init_completion_tracking(conn, backfill="completed_at" in added)
+            self._init_hierarchy(conn)
+            self._init_tags(conn)
+            self._init_occurrences(conn)
+            self._init_partitions(conn)
+            self._fill_due_utc(conn)
+            self._fill_next_due(conn)
+
+    def _migrate_columns(self, conn):
+        """Add columns missing from databases created by older versions"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(reminders)")}
+        added = []
+        for name, definition in COLUMN_MIGRATIONS:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE reminders ADD COLUMN {name} {definition}")
+                added.append(name)
+        return added
+
+    def _init_interval_index(self, conn):
+        """Maintain an R*Tree of reminder time spans so overlap lookups are logarithmic"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'reminder_slots'"
+        ).fetchone()
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO reminders 
-                    (title, description, date, time, category, priority, is_recurring, recurrence_type)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (title, description, date, time, category, priority, is_recurring, recurrence_type))
-                conn.commit()
+            conn.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS reminder_slots USING rtree_i32(id, start_minute, end_minute)'
+            )
+        except sqlite3.OperationalError:
+            # SQLite built without the R*Tree module; find_overlapping falls back to the date index
+            self.has_interval_index = False
+            return
+
+        # Boxes used to be built from the naive wall time; those databases are rebuilt once in UTC
+        update_sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'reminder_slots_update'").fetchone()
+        stale = exists and (update_sql is None or "due_utc" not in update_sql[0])
+        for name in ("reminder_slots_insert", "reminder_slots_update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        start_new = SLOT_START_SQL.format(row="NEW")
+        end_new = SLOT_END_SQL.format(row="NEW")
+        conn.execute(f'''
+            CREATE TRIGGER reminder_slots_insert AFTER INSERT ON reminders
+            BEGIN
+                INSERT OR REPLACE INTO reminder_slots VALUES (NEW.id, {start_new}, {end_new});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER reminder_slots_update
+            AFTER UPDATE OF date, time, duration_minutes, due_utc ON reminders
+            BEGIN
+                INSERT OR REPLACE INTO reminder_slots VALUES (NEW.id, {start_new}, {end_new});
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS reminder_slots_delete AFTER DELETE ON reminders
+            BEGIN
+                DELETE FROM reminder_slots WHERE id = OLD.id;
+            END
+        ''')
+        if stale:
+            conn.execute("DELETE FROM reminder_slots")
+        if stale or not exists:
+            conn.execute(f'''
+                INSERT INTO reminder_slots
+                SELECT id, {SLOT_START_SQL.format(row="reminders")}, {SLOT_END_SQL.format(row="reminders")}
+                FROM reminders
+            ''')
+        self.has_interval_index = True
+
+    def _init_sync(self, conn):
+        """Journal every row change (and delete tombstones) in sync_changes for delta sync"""
+        conn.execute('CREATE TABLE IF NOT EXISTS sync_meta (key TEXT PRIMARY KEY, value TEXT)')
+        conn.execute(
+            "INSERT OR IGNORE INTO sync_meta VALUES ('device_id', lower(hex(randomblob(8))))"
+        )
+        # Watermarks per peer: our last pushed change seq and the peer's last pulled change seq
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_peers (
+                peer TEXT PRIMARY KEY,
+                pushed_seq INTEGER DEFAULT 0,
+                pulled_seq INTEGER DEFAULT 0,
+                last_sync TEXT
+            )
+        ''')
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sync_changes'").fetchone()
+        # One row per reminder uuid, re-sequenced on every change; deleted rows keep their final version
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                uuid TEXT NOT NULL UNIQUE,
+                deleted INTEGER DEFAULT 0,
+                version INTEGER,
+                updated_at TEXT
+            )
+        ''')
+        conn.execute("UPDATE reminders SET uuid = lower(hex(randomblob(16))) WHERE uuid IS NULL")
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_reminders_uuid ON reminders(uuid)')
+        if not exists:
+            conn.execute("INSERT INTO sync_changes (uuid) SELECT uuid FROM reminders ORDER BY id")
+
+        # Recreated on every start so the trigger column list follows SYNC_COLUMNS
+        for name in ("reminders_sync_insert", "reminders_sync_update", "reminders_sync_version",
+                     "reminders_sync_delete"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        columns = ", ".join(SYNC_COLUMNS)
+        # While applying a peer's rows the 'applying' flag keeps their version and tombstones as sent
+        applying = "EXISTS (SELECT 1 FROM sync_meta WHERE key = 'applying')"
+        conn.execute('''
+            CREATE TRIGGER reminders_sync_insert AFTER INSERT ON reminders
+            BEGIN
+                UPDATE reminders SET uuid = lower(hex(randomblob(16))) WHERE id = NEW.id AND NEW.uuid IS NULL;
+                INSERT OR REPLACE INTO sync_changes (uuid) SELECT uuid FROM reminders WHERE id = NEW.id;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER reminders_sync_update AFTER UPDATE OF {columns}, version ON reminders
+            BEGIN
+                INSERT OR REPLACE INTO sync_changes (uuid) VALUES (NEW.uuid);
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER reminders_sync_version AFTER UPDATE OF {columns} ON reminders
+            WHEN NEW.version IS OLD.version AND NOT {applying}
+            BEGIN
+                UPDATE reminders SET version = COALESCE(OLD.version, 1) + 1, updated_at = {SYNC_TIMESTAMP_SQL}
+                WHERE id = NEW.id;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER reminders_sync_delete AFTER DELETE ON reminders
+            WHEN NOT {applying}
+            BEGIN
+                INSERT OR REPLACE INTO sync_changes (uuid, deleted, version, updated_at)
+                VALUES (OLD.uuid, 1, COALESCE(OLD.version, 1) + 1, {SYNC_TIMESTAMP_SQL});
+            END
+        ''')
+
+    def _init_completion_tracking(self, conn, backfill=False):
+        """Stamp completed_at whenever is_completed flips, however the row is changed"""
+        # (completed_at, due_utc) lets the productivity reports run as index-only range scans
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_completed_at ON reminders(completed_at, due_utc)')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS reminders_completed_at_insert AFTER INSERT ON reminders
+            WHEN NEW.is_completed AND NEW.completed_at IS NULL
+            BEGIN
+                UPDATE reminders SET completed_at = {COMPLETED_AT_SQL} WHERE id = NEW.id;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS reminders_completed_at_update AFTER UPDATE OF is_completed ON reminders
+            WHEN NEW.is_completed IS NOT OLD.is_completed
+            BEGIN
+                UPDATE reminders SET completed_at = CASE WHEN NEW.is_completed THEN {COMPLETED_AT_SQL} END
+                WHERE id = NEW.id;
+            END
+        ''')
+        if not backfill:
+            return
+        # Rows completed before the column existed: updated_at is the best record of when that happened
+        conn.execute(f'''
+            UPDATE reminders
+            SET completed_at = COALESCE(strftime('%Y-%m-%d %H:%M:%S', updated_at), {COMPLETED_AT_SQL})
+            WHERE is_completed = 1 AND completed_at IS NULL
+        ''')
+
+    def _init_hierarchy(self, conn):
+        """Index subtasks by parent and keep the tree connected when a reminder is deleted"""
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_parent ON reminders(parent_id)')
+        # Deleting one step hands its subtasks to its own parent; delete_subtree() removes whole branches
+        # and sets 'deleting_subtree' so rows about to go are not re-parented first
+        conn.execute("DROP TRIGGER IF EXISTS reminders_parent_delete")
+        conn.execute('''
+            CREATE TRIGGER reminders_parent_delete AFTER DELETE ON reminders
+            WHEN NOT EXISTS (SELECT 1 FROM sync_meta WHERE key = 'deleting_subtree')
+            BEGIN
+                UPDATE reminders SET parent_id = OLD.parent_id WHERE parent_id = OLD.id;
+            END
+        ''')
+
+    def _init_tags(self, conn):
+        """Maintain the tag inverted index and per-tag counts from each row's tags and category"""
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'reminder_tags'").fetchone()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                reminder_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        # Clustered on (tag_id, reminder_id): each tag's posting list is one sorted range of the key
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS reminder_tags (
+                tag_id INTEGER NOT NULL,
+                reminder_id INTEGER NOT NULL,
+                PRIMARY KEY (tag_id, reminder_id)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_reminder_tags_reminder ON reminder_tags(reminder_id)')
+        if not exists:
+            # Existing rows are indexed in bulk and counted once, before the per-row count triggers exist
+            conn.execute('''
+                INSERT OR IGNORE INTO tags (name)
+                SELECT j.value FROM reminders r, json_each(COALESCE(r.tags, '[]')) j
+                UNION SELECT category FROM reminders WHERE category IS NOT NULL AND category != ''
+            ''')
+            conn.execute('''
+                INSERT OR IGNORE INTO reminder_tags (tag_id, reminder_id)
+                SELECT t.id, r.id FROM reminders r, json_each(COALESCE(r.tags, '[]')) j JOIN tags t ON t.name = j.value
+                UNION ALL SELECT t.id, r.id FROM reminders r JOIN tags t ON t.name = r.category
+            ''')
+            conn.execute('''
+                UPDATE tags SET reminder_count = (SELECT COUNT(*) FROM reminder_tags WHERE tag_id = tags.id)
+            ''')
+
+        # Recreated on every start so existing databases pick up changes to the trigger bodies
+        for name in ("reminders_tags_category", "reminders_tags_insert", "reminders_tags_update",
+                     "reminders_tags_delete"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        # Inserts link the category and the JSON tags separately: two plain statements each cost far
+        # less per row than one compound SELECT over both, and untagged rows skip json_each entirely
+        conn.execute('''
+            CREATE TRIGGER reminders_tags_category AFTER INSERT ON reminders
+            WHEN NEW.category IS NOT NULL AND NEW.category != ''
+            BEGIN
+                INSERT OR IGNORE INTO tags (name) VALUES (NEW.category);
+                INSERT OR IGNORE INTO reminder_tags (tag_id, reminder_id)
+                SELECT id, NEW.id FROM tags WHERE name = NEW.category;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER reminders_tags_insert AFTER INSERT ON reminders
+            WHEN NEW.tags IS NOT NULL AND NEW.tags != '[]'
+            BEGIN
+                INSERT OR IGNORE INTO tags (name) SELECT value FROM json_each(NEW.tags);
+                INSERT OR IGNORE INTO reminder_tags (tag_id, reminder_id)
+                SELECT t.id, NEW.id FROM json_each(NEW.tags) j JOIN tags t ON t.name = j.value;
+            END
+        ''')
+        new_tags = ROW_TAGS_SQL.format(row="NEW")
+        conn.execute(f'''
+            CREATE TRIGGER reminders_tags_update AFTER UPDATE OF tags, category ON reminders
+            BEGIN
+                DELETE FROM reminder_tags
+                WHERE reminder_id = NEW.id AND tag_id NOT IN (SELECT id FROM tags WHERE name IN ({new_tags}));
+                INSERT OR IGNORE INTO tags (name) {new_tags};
+                INSERT OR IGNORE INTO reminder_tags (tag_id, reminder_id)
+                SELECT id, NEW.id FROM tags WHERE name IN ({new_tags});
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER reminders_tags_delete AFTER DELETE ON reminders
+            BEGIN
+                DELETE FROM reminder_tags WHERE reminder_id = OLD.id;
+            END
+        ''')
+        # Counts move with the links; a tag no reminder uses any more leaves the vocabulary
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS reminder_tags_count_insert AFTER INSERT ON reminder_tags
+            BEGIN
+                UPDATE tags SET reminder_count = reminder_count + 1 WHERE id = NEW.tag_id;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS reminder_tags_count_delete AFTER DELETE ON reminder_tags
+            BEGIN
+                UPDATE tags SET reminder_count = reminder_count - 1 WHERE id = OLD.tag_id;
+                DELETE FROM tags WHERE id = OLD.tag_id AND reminder_count <= 0;
+            END
+        ''')
+
+    def _init_occurrences(self, conn):
+        """Per-occurrence exceptions of recurring series and the maintained next_due_at of each series"""
+        # One row per occurrence that differs from the generated schedule, keyed by its original local date
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS occurrence_exceptions (
+                reminder_id INTEGER NOT NULL,
+                occurrence_date TEXT NOT NULL,
+                state TEXT NOT NULL CHECK (state IN ('completed', 'skipped', 'moved')),
+                moved_to TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (reminder_id, occurrence_date)
+            ) WITHOUT ROWID
+        ''')
+        # Leading with the series flags keeps one-off rows (next_due_at always NULL) out of every lookup
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_reminders_next_due ON reminders(is_recurring, is_completed, next_due_at)
+        ''')
+        # Like due_utc, next_due_at is computed in Python; anything that can change it clears it for _fill_next_due()
+        for name in ("reminders_next_due_reset", "occurrence_exceptions_delete", "occurrence_exceptions_insert",
+                     "occurrence_exceptions_update", "occurrence_exceptions_remove"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        conn.execute('''
+            CREATE TRIGGER reminders_next_due_reset
+            AFTER UPDATE OF date, time, timezone, is_recurring, recurrence_type, is_completed ON reminders
+            BEGIN
+                UPDATE reminders SET next_due_at = NULL WHERE id = NEW.id;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER occurrence_exceptions_delete AFTER DELETE ON reminders
+            BEGIN
+                DELETE FROM occurrence_exceptions WHERE reminder_id = OLD.id;
+            END
+        ''')
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            name = "remove" if event == "DELETE" else event.lower()
+            conn.execute(f'''
+                CREATE TRIGGER occurrence_exceptions_{name} AFTER {event} ON occurrence_exceptions
+                BEGIN
+                    UPDATE reminders SET next_due_at = NULL WHERE id = {row}.reminder_id;
+                END
+            ''')
+
+    def _init_partitions(self, conn):
+        """Read the registry of year partitions: completed reminders of past years moved to their own files
+
+        partition.py moves rows in and out; every connection attaches the files listed here.
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS partitions (
+                name TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                first_date TEXT NOT NULL,
+                last_date TEXT NOT NULL,
+                last_completed TEXT,
+                rows INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        directory = Path(self.db_path).parent
+        self.partitions = []
+        self._partition_selects = {}
+        for row in conn.execute('SELECT * FROM partitions ORDER BY first_date'):
+            partition = dict(row)
+            partition["path"] = str(directory / partition["path"])
+            if Path(partition["path"]).exists():
+                self.partitions.append(partition)
+            else:
+                print(f"Error: partition file {partition['path']} is missing; its reminders are not shown")
+
+    def _attach_partitions(self, conn):
+        """Attach every partition file and create the TEMP view reminders_all spanning them and the main table"""
+        for partition in self.partitions:
+            conn.execute(f"ATTACH DATABASE ? AS {partition['name']}", (partition["path"],))
+        if not self._partition_selects:
+            columns = [row[1] for row in conn.execute("PRAGMA main.table_info(reminders)")]
+            # archived marks rows read from a partition: history that edits, deletes and completions cannot reach
+            selects = {"main": f"SELECT {', '.join(columns)}, 0 AS archived FROM main.reminders"}
+            for partition in self.partitions:
+                name = partition["name"]
+                present = {row[1] for row in conn.execute(f"PRAGMA {name}.table_info(reminders)")}
+                # Columns added to the main table after the partition was written read as NULL
+                select = ", ".join(column if column in present else f"NULL AS {column}" for column in columns)
+                selects[name] = f"SELECT {select}, 1 AS archived FROM {name}.reminders"
+            self._partition_selects = selects
+        conn.execute(f"CREATE TEMP VIEW reminders_all AS {' UNION ALL '.join(self._partition_selects.values())}")
+
+    def partitions_for(self, start_date=None, end_date=None, is_completed=None):
+        """Partitions that can hold reminders dated in [start_date, end_date] (they only hold completed ones)"""
+        if is_completed == 0:
+            return []
+        return [partition for partition in self.partitions
+                if (not start_date or partition["last_date"] >= start_date)
+                and (not end_date or partition["first_date"] <= end_date)]
+
+    def _partitions_completed_since(self, start_utc):
+        return [partition for partition in self.partitions
+                if partition["last_completed"] and partition["last_completed"] >= start_utc]
+
+    def partition_source(self, partitions):
+        """FROM clause reading the main table plus the given partitions, aliased as reminders"""
+        if not partitions:
+            return "reminders"
+        if len(partitions) == len(self.partitions):
+            return "reminders_all AS reminders"
+        selects = [self._partition_selects["main"]]
+        selects.extend(self._partition_selects[partition["name"]] for partition in partitions)
+        return f"({' UNION ALL '.join(selects)}) AS reminders"
+
+    def _fill_next_due(self, conn, now=None, advance=False):
+        """Compute next_due_at for pending series that lack it; advance=True also moves on series due by now
+
+        now is a UTC 'YYYY-MM-DD HH:MM' string (default: the current minute). The next occurrence is
+        the first one after now that is not completed or skipped, at its moved time if it was moved.
+        """
+        now = now or utc_now().strftime("%Y-%m-%d %H:%M")
+        stale = "next_due_at IS NULL OR next_due_at <= ?" if advance else "next_due_at IS NULL"
+        rows = conn.execute(f'''
+            SELECT id, date, time, timezone, is_recurring, recurrence_type FROM reminders
+            WHERE is_recurring = 1 AND is_completed = 0 AND ({stale})
+        ''', (now,) if advance else ()).fetchall()
+        updates = []
+        for row in rows:
+            zone = row["timezone"]
+            try:
+                local_now = utc_to_local(now, zone)
+            except ValueError:
+                zone = None
+                local_now = utc_to_local(now)
+            # Exceptions before today can only matter if they were moved to a later time
+            exceptions = conn.execute('''
+                SELECT occurrence_date, state, moved_to FROM occurrence_exceptions
+                WHERE reminder_id = ? AND (occurrence_date >= ? OR moved_to > ?)
+                ORDER BY occurrence_date
+            ''', (row["id"], f"{local_now:%Y-%m-%d}", f"{local_now:%Y-%m-%d %H:%M}")).fetchall()
+            found = next_occurrence(dict(row), local_now + timedelta(minutes=1), exceptions)
+            if found is None:
+                updates.append((NO_NEXT_DUE, row["id"]))
+            else:
+                actual = found[1]
+                updates.append((local_to_utc(f"{actual:%Y-%m-%d}", f"{actual:%H:%M}", zone), row["id"]))
+        conn.executemany('UPDATE reminders SET next_due_at = ? WHERE id = ?', updates)
+        return len(updates)
+
+    def fill_next_due(self, now=None, advance=False):
+        """Bring next_due_at of recurring series up to date; returns the number of series updated"""
+        try:
+            with self._connect() as conn:
+                return self._fill_next_due(conn, now, advance)
+        except Exception as e:
+            print(f"Error computing next occurrences: {e}")
+            return 0
+
+    def _fill_due_utc(self, conn):
+        """Compute due_utc for rows that lack it (new, edited or written by another process)"""
+        rows = conn.execute(
+            'SELECT id, date, time, timezone FROM reminders WHERE due_utc IS NULL'
+        ).fetchall()
+        updates = []
+        for row in rows:
+            try:
+                due_utc = local_to_utc(row["date"], row["time"], row["timezone"])
+            except ValueError:
+                # Unknown zone (e.g. synced from a machine with a newer tz database): use the default zone
+                due_utc = local_to_utc(row["date"], row["time"])
+            updates.append((due_utc, row["id"]))
+        conn.executemany('UPDATE reminders SET due_utc = ? WHERE id = ?', updates)
+        return len(updates)
+
+    def fill_due_utc(self):
+        """Bring due_utc up to date; returns the number of rows filled"""
+        try:
+            with self._connect() as conn:
+                return self._fill_due_utc(conn)
+        except Exception as e:
+            print(f"Error computing UTC due times: {e}")
+            return 0
+
+    def add_reminder(self, title, description, date, time, category, priority, is_recurring=0, recurrence_type=None,
+                     duration_minutes=0, timezone=None, parent_id=None, tags=None):
+        """Add a new reminder (a subtask when parent_id is given; tags is a list of names)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute('''
+                    INSERT INTO reminders
+                    (title, description, date, time, category, priority, is_recurring, recurrence_type, duration_minutes,
+                     timezone, due_utc, parent_id, tags)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (title, description, date, time, category, priority, is_recurring, recurrence_type,
+                      duration_minutes, timezone, local_to_utc(date, time, timezone), parent_id, _encode_tags(tags)))
+                if is_recurring:
+                    self._fill_next_due(conn)
                 return cursor.lastrowid
         except Exception as e:
             print(f"Error adding reminder: {e}")
             return None
-    
+
     def get_reminders_by_date(self, date):
         """Get all reminders for a specific date"""
+        source = self.partition_source(self.partitions_for(date, date))
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM reminders 
-                    WHERE date = ? 
+            with self._connect() as conn:
+                cursor = conn.execute(f'''
+                    SELECT * FROM {source}
+                    WHERE date = ?
                     ORDER BY time ASC
                 ''', (date,))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             print(f"Error fetching reminders: {e}")
             return []
-    
+
     def get_all_reminders(self):
-        """Get all reminders"""
+        """Get all reminders, including those moved to year partitions"""
+        source = self.partition_source(self.partitions)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM reminders 
+            with self._connect() as conn:
+                cursor = conn.execute(f'''
+                    SELECT * FROM {source}
                     ORDER BY date DESC, time ASC
                 ''')
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             print(f"Error fetching reminders: {e}")
             return []
-    
-    def update_reminder(self, reminder_id, title, description, date, time, category, priority, is_recurring=0, recurrence_type=None):
-        """Update an existing reminder"""
+
+    def get_day_summaries(self, start_date, end_date):
+        """Get per-day counts and the top pending priority for dates in [start_date, end_date]"""
+        source = self.partition_source(self.partitions_for(start_date, end_date))
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(f'''
+                    SELECT date, COUNT(*) AS total, SUM(is_completed) AS completed,
+                           MAX(CASE WHEN is_completed THEN 0
+                                    WHEN priority = 'Urgent' THEN 4 WHEN priority = 'High' THEN 3
+                                    WHEN priority = 'Normal' THEN 2 ELSE 1 END) AS top_priority
+                    FROM {source}
+                    WHERE date >= ? AND date <= ?
+                    GROUP BY date
+                ''', (start_date, end_date))
+                summaries = []
+                for row in cursor.fetchall():
+                    summary = dict(row)
+                    summary["pending"] = summary["total"] - summary["completed"]
+                    summary["top_priority"] = PRIORITY_RANKS[summary["top_priority"]]
+                    summaries.append(summary)
+                return summaries
+        except Exception as e:
+            print(f"Error summarizing reminders: {e}")
+            return []
+
+    def fetch_analytics_rows(self):
+        """Get (epoch day, category, priority, is_completed) tuples for every reminder, without row objects"""
+        source = self.partition_source(self.partitions)
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                cursor.execute(f'''
+                    SELECT COALESCE(CAST(julianday(date) - 2440587.5 AS INTEGER), 0), category, priority,
+                           COALESCE(is_completed, 0)
+                    FROM {source}
+                ''')
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"Error fetching analytics columns: {e}")
+            return []
+
+    def get_completions_per_day(self, start_date, end_date, zone=None):
+        """Get {local 'YYYY-MM-DD': completed count} for local dates in [start_date, end_date]"""
+        start_utc = local_to_utc(start_date, "00:00", zone)
+        end_day = (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        end_utc = local_to_utc(end_day, "00:00", zone)
+        source = self.partition_source(self._partitions_completed_since(start_utc))
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
+                # Grouped per UTC minute so zones with half-hour offsets still land on the right local day
                 cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE reminders 
-                    SET title = ?, description = ?, date = ?, time = ?, 
+                cursor.row_factory = None
+                cursor.execute(f'''
+                    SELECT CAST(strftime('%s', completed_at) AS INTEGER) / 60 AS minute, COUNT(*)
+                    FROM {source}
+                    WHERE completed_at >= ? AND completed_at < ?
+                    GROUP BY minute
+                ''', (start_utc, end_utc))
+                table = get_zone_table(zone)
+                days = {}
+                for minute, count in cursor.fetchall():
+                    day = table.to_local_minute(minute) // (24 * 60)
+                    days[day] = days.get(day, 0) + count
+                return {format_minute(day * 24 * 60)[:10]: count for day, count in sorted(days.items())}
+        except Exception as e:
+            print(f"Error counting completions: {e}")
+            return {}
+
+    def get_completions_per_week(self, start_date, end_date, zone=None):
+        """Get {Monday 'YYYY-MM-DD': completed count} for local dates in [start_date, end_date]"""
+        weeks = {}
+        for day, count in self.get_completions_per_day(start_date, end_date, zone).items():
+            day = datetime.strptime(day, "%Y-%m-%d")
+            monday = (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+            weeks[monday] = weeks.get(monday, 0) + count
+        return weeks
+
+    def get_completion_lateness(self, start_date, end_date, zone=None):
+        """Get completed count and lateness vs due time (minutes) for completions in [start_date, end_date]"""
+        start_utc = local_to_utc(start_date, "00:00", zone)
+        end_day = (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        end_utc = local_to_utc(end_day, "00:00", zone)
+        source = self.partition_source(self._partitions_completed_since(start_utc))
+        try:
+            with self._connect() as conn:
+                row = conn.execute(f'''
+                    SELECT COUNT(*) AS completed,
+                           AVG(lateness) AS mean_lateness_minutes,
+                           MAX(lateness) AS max_lateness_minutes,
+                           SUM(lateness > 0) AS late
+                    FROM (
+                        SELECT (julianday(completed_at) - julianday(due_utc)) * 1440 AS lateness
+                        FROM {source}
+                        WHERE completed_at >= ? AND completed_at < ? AND due_utc IS NOT NULL
+                    )
+                ''', (start_utc, end_utc)).fetchone()
+                report = dict(row)
+                report["late"] = report["late"] or 0
+                report["on_time"] = report["completed"] - report["late"]
+                return report
+        except Exception as e:
+            print(f"Error computing lateness: {e}")
+            return {}
+
+    def get_reminders_by_ids(self, reminder_ids):
+        """Get reminders for a collection of ids, including archived ones"""
+        reminder_ids = list(reminder_ids)
+        source = self.partition_source(self.partitions)
+        reminders = []
+        try:
+            with self._connect() as conn:
+                for start in range(0, len(reminder_ids), ID_CHUNK_SIZE):
+                    chunk = reminder_ids[start:start + ID_CHUNK_SIZE]
+                    cursor = conn.execute(
+                        f"SELECT * FROM {source} WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                    )
+                    reminders.extend(dict(row) for row in cursor.fetchall())
+            return reminders
+        except Exception as e:
+            print(f"Error fetching reminders: {e}")
+            return []
+
+    def update_reminder(self, reminder_id, title, description, date, time, category, priority, is_recurring=0, recurrence_type=None,
+                        duration_minutes=0, timezone=None, tags=None):
+        """Update an existing reminder (tags=None leaves its tags unchanged); False if it is missing or archived"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute('''
+                    UPDATE reminders
+                    SET title = ?, description = ?, date = ?, time = ?,
                         category = ?, priority = ?, is_recurring = ?, recurrence_type = ?,
-                        updated_at = CURRENT_TIMESTAMP
+                        duration_minutes = ?, timezone = ?, tags = COALESCE(?, tags), updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
-                ''', (title, description, date, time, category, priority, is_recurring, recurrence_type, reminder_id))
-                conn.commit()
+                ''', (title, description, date, time, category, priority, is_recurring, recurrence_type,
+                      duration_minutes, timezone, _encode_tags(tags), reminder_id))
+                if not cursor.rowcount:
+                    return False
+                self._fill_due_utc(conn)
+                self._fill_next_due(conn)
                 return True
         except Exception as e:
             print(f"Error updating reminder: {e}")
             return False
-    
+
     def delete_reminder(self, reminder_id):
-        """Delete a reminder"""
+        """Delete a reminder; False if it is missing or archived"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM reminders WHERE id = ?', (reminder_id,))
-                conn.commit()
-                return True
+            with self._connect() as conn:
+                return conn.execute('DELETE FROM reminders WHERE id = ?', (reminder_id,)).rowcount > 0
         except Exception as e:
             print(f"Error deleting reminder: {e}")
             return False
-    
+
     def mark_completed(self, reminder_id, is_completed):
-        """Mark reminder as completed"""
+        """Mark reminder as completed; False if it is missing or archived"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE reminders 
+            with self._connect() as conn:
+                cursor = conn.execute('''
+                    UPDATE reminders
                     SET is_completed = ?, updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
                 ''', (int(is_completed), reminder_id))
-                conn.commit()
-                return True
+                return cursor.rowcount > 0
         except Exception as e:
             print(f"Error marking reminder: {e}")
             return False
-    
-    def get_reminders_by_category(self, category):
-        """Get reminders by category"""
+
+    def _execute_for_ids(self, sql, reminder_ids, params=()):
+        """Run an "... WHERE id IN ({ids})" statement over id chunks in one transaction"""
+        with self._connect() as conn:
+            return self._run_for_ids(conn, sql, reminder_ids, params)
+
+    def _run_for_ids(self, conn, sql, reminder_ids, params=()):
+        """Run an "... WHERE id IN ({ids})" statement over id chunks on conn; returns the rows changed"""
+        reminder_ids = list(reminder_ids)
+        changed = 0
+        for start in range(0, len(reminder_ids), ID_CHUNK_SIZE):
+            chunk = reminder_ids[start:start + ID_CHUNK_SIZE]
+            cursor = conn.execute(sql.format(ids=", ".join("?" * len(chunk))), (*params, *chunk))
+            changed += cursor.rowcount
+        return changed
+
+    def mark_completed_many(self, reminder_ids, is_completed=True):
+        """Mark many reminders completed in one transaction; returns the number changed"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM reminders 
-                    WHERE category = ? 
-                    ORDER BY date DESC, time ASC
-                ''', (category,))
+            return self._execute_for_ids('''
+                UPDATE reminders
+                SET is_completed = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id IN ({ids})
+            ''', reminder_ids, (int(is_completed),))
+        except Exception as e:
+            print(f"Error marking reminders: {e}")
+            return 0
+
+    def delete_many(self, reminder_ids):
+        """Delete many reminders in one transaction; returns the number deleted"""
+        try:
+            return self._execute_for_ids('DELETE FROM reminders WHERE id IN ({ids})', reminder_ids)
+        except Exception as e:
+            print(f"Error deleting reminders: {e}")
+            return 0
+
+    def reschedule_many(self, reminder_ids, delta_minutes):
+        """Shift many reminders by delta_minutes in one transaction; returns the number moved"""
+        modifier = f"{int(delta_minutes):+d} minutes"
+        try:
+            with self._connect() as conn:
+                # SQLite evaluates every SET expression against the old row, so date and time stay in step
+                moved = self._run_for_ids(conn, '''
+                    UPDATE reminders
+                    SET date = strftime('%Y-%m-%d', date || ' ' || time, ?),
+                        time = strftime('%H:%M', date || ' ' || time, ?),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN ({ids})
+                ''', reminder_ids, (modifier, modifier))
+                # Same transaction: the scheduler never sees the new times with the old due_utc/next_due_at
+                self._fill_due_utc(conn)
+                self._fill_next_due(conn)
+                return moved
+        except Exception as e:
+            print(f"Error rescheduling reminders: {e}")
+            return 0
+
+    def set_tags(self, reminder_id, tags):
+        """Replace a reminder's tags (its category stays tagged regardless)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute('UPDATE reminders SET tags = ? WHERE id = ?', (_encode_tags(tags) or "[]", reminder_id))
+                return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error setting tags: {e}")
+            return False
+
+    def get_tag_counts(self, names=None):
+        """(tag name, reminder count) pairs, most used first (only the given names, if any)"""
+        try:
+            with self._connect() as conn:
+                where = f"AND name IN ({', '.join('?' * len(names))})" if names else ""
+                cursor = conn.execute(f'''
+                    SELECT name, reminder_count FROM tags
+                    WHERE reminder_count > 0 {where}
+                    ORDER BY reminder_count DESC, name ASC
+                ''', list(names or ()))
+                return [tuple(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error fetching tags: {e}")
+            return []
+
+    def get_children(self, parent_id):
+        """Get the direct subtasks of a reminder (top-level reminders for None)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute('''
+                    SELECT * FROM reminders WHERE parent_id IS ?
+                    ORDER BY date ASC, time ASC
+                ''', (parent_id,))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
-            print(f"Error fetching reminders by category: {e}")
+            print(f"Error fetching subtasks: {e}")
             return []
-    
-    def get_reminders_by_priority(self, priority):
-        """Get reminders by priority"""
+
+    def get_subtree(self, root_id):
+        """Get a reminder and all of its subtasks depth-first, each with its depth below root_id"""
+        try:
+            with self._connect() as conn:
+                # Taking the deepest queued row first makes the recursion a pre-order walk, siblings by due time
+                cursor = conn.execute('''
+                    WITH RECURSIVE subtree AS (
+                        SELECT reminders.*, 0 AS depth FROM reminders WHERE id = ?
+                        UNION ALL
+                        SELECT r.*, s.depth + 1 FROM reminders r JOIN subtree s ON r.parent_id = s.id
+                        ORDER BY depth DESC, date, time, id
+                    )
+                    SELECT * FROM subtree
+                ''', (root_id,))
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error fetching subtree: {e}")
+            return []
+
+    def get_completion_rollup(self, reminder_ids):
+        """Map each id to its subtask count, completed subtasks and percent done (all levels below it)
+
+        A reminder without subtasks counts as 0 or 100 percent by its own state.
+        """
+        reminder_ids = list(reminder_ids)
+        rollup = {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._connect() as conn:
+                for start in range(0, len(reminder_ids), ID_CHUNK_SIZE):
+                    chunk = reminder_ids[start:start + ID_CHUNK_SIZE]
+                    # Closure pairs (ancestor, descendant) for every requested id, aggregated in the same statement
+                    cursor = conn.execute(f'''
+                        WITH RECURSIVE closure(ancestor, id) AS (
+                            SELECT id, id FROM reminders WHERE id IN ({', '.join('?' * len(chunk))})
+                            UNION ALL
+                            SELECT c.ancestor, r.id FROM reminders r JOIN closure c ON r.parent_id = c.id
+                        )
+                        SELECT c.ancestor,
+                               SUM(c.id != c.ancestor) AS subtasks,
+                               SUM(c.id != c.ancestor AND r.is_completed) AS completed,
+                               MAX(CASE WHEN c.id = c.ancestor THEN r.is_completed END) AS self_completed
+                        FROM closure c JOIN reminders r ON r.id = c.id
+                        GROUP BY c.ancestor
+                    ''', chunk)
+                    for ancestor, subtasks, completed, self_completed in cursor.fetchall():
+                        if subtasks:
+                            percent = 100.0 * completed / subtasks
+                        else:
+                            percent = 100.0 if self_completed else 0.0
+                        rollup[ancestor] = {"subtasks": subtasks, "completed": completed, "percent": percent}
+            return rollup
+        except Exception as e:
+            print(f"Error computing completion rollup: {e}")
+            return {}
+
+    def set_parent(self, reminder_id, parent_id):
+        """Move a reminder (with its subtasks) under parent_id, or to the top level for None
+
+        Returns False if parent_id is the reminder itself or one of its subtasks.
+        """
+        try:
+            with self._connect() as conn:
+                if parent_id is not None:
+                    cycle = conn.execute(f'SELECT ? IN ({SUBTREE_IDS_SQL})', (parent_id, reminder_id)).fetchone()[0]
+                    if cycle:
+                        return False
+                cursor = conn.execute('UPDATE reminders SET parent_id = ? WHERE id = ?', (parent_id, reminder_id))
+                return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error moving reminder: {e}")
+            return False
+
+    def complete_subtree(self, root_id, is_completed=True):
+        """Mark a reminder and every subtask below it completed (or pending); returns the number changed"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(f'''
+                    UPDATE reminders
+                    SET is_completed = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN ({SUBTREE_IDS_SQL}) AND is_completed IS NOT ?
+                ''', (int(is_completed), root_id, int(is_completed)))
+                return cursor.rowcount
+        except Exception as e:
+            print(f"Error completing subtree: {e}")
+            return 0
+
+    def delete_subtree(self, root_id):
+        """Delete a reminder together with every subtask below it; returns the number deleted"""
+        try:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO sync_meta VALUES ('deleting_subtree', '1')")
+                cursor = conn.execute(f'DELETE FROM reminders WHERE id IN ({SUBTREE_IDS_SQL})', (root_id,))
+                conn.execute("DELETE FROM sync_meta WHERE key = 'deleting_subtree'")
+                return cursor.rowcount
+        except Exception as e:
+            print(f"Error deleting subtree: {e}")
+            return 0
+
+    def get_busy_minutes(self, start_minute, end_minute):
+        """Get sorted (start, end) UTC epoch-minute spans of pending one-off reminders overlapping [start, end)"""
+        try:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM reminders 
-                    WHERE priority = ? 
-                    ORDER BY date DESC, time ASC
-                ''', (priority,))
+                cursor.row_factory = None
+                if self.has_interval_index:
+                    cursor.execute('''
+                        SELECT s.start_minute, s.end_minute + 1 FROM reminder_slots s
+                        CROSS JOIN reminders r ON r.id = s.id
+                        WHERE s.start_minute < ? AND s.end_minute >= ?
+                          AND r.is_completed = 0 AND r.is_recurring = 0
+                        ORDER BY s.start_minute
+                    ''', (end_minute, start_minute))
+                else:
+                    epoch = datetime(1970, 1, 1)
+                    start_sql = SLOT_START_SQL.format(row="reminders")
+                    end_sql = SLOT_END_SQL.format(row="reminders")
+                    # Local dates are within a day of UTC either way, hence the extra day on each side
+                    cursor.execute(f'''
+                        SELECT {start_sql} AS start_minute, {end_sql} + 1 FROM reminders
+                        WHERE date >= ? AND date <= ?
+                          AND is_completed = 0 AND is_recurring = 0
+                          AND {start_sql} < ? AND {end_sql} >= ?
+                        ORDER BY start_minute
+                    ''', ((epoch + timedelta(minutes=start_minute - 48 * 60)).strftime("%Y-%m-%d"),
+                          (epoch + timedelta(minutes=end_minute + 24 * 60)).strftime("%Y-%m-%d"),
+                          end_minute, start_minute))
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"Error fetching busy spans: {e}")
+            return []
+
+    def find_overlapping(self, start, end, exclude_id=None):
+        """Get pending reminders whose time span overlaps [start, end) (naive UTC datetimes)"""
+        epoch = datetime(1970, 1, 1)
+        start_minute = int((start - epoch).total_seconds() // 60)
+        end_minute = max(int((end - epoch).total_seconds() // 60) - 1, start_minute)
+        try:
+            with self._connect() as conn:
+                if self.has_interval_index:
+                    # CROSS JOIN pins the R*Tree as the outer loop; otherwise the planner
+                    # prefers scanning idx_reminders_completed and probing the tree per row
+                    cursor = conn.execute('''
+                        SELECT r.* FROM reminder_slots s
+                        CROSS JOIN reminders r ON r.id = s.id
+                        WHERE s.start_minute <= ? AND s.end_minute >= ?
+                          AND r.is_completed = 0 AND r.id IS NOT ?
+                        ORDER BY r.date ASC, r.time ASC
+                    ''', (end_minute, start_minute, exclude_id))
+                    return [dict(row) for row in cursor.fetchall()]
+
+                # Without R*Tree: narrow by the date index (widened for zone offsets), then test spans in SQL
+                start_sql = SLOT_START_SQL.format(row="reminders")
+                end_sql = SLOT_END_SQL.format(row="reminders")
+                cursor = conn.execute(f'''
+                    SELECT * FROM reminders
+                    WHERE date >= ? AND date <= ?
+                      AND {start_sql} <= ? AND {end_sql} >= ?
+                      AND is_completed = 0 AND id IS NOT ?
+                    ORDER BY date ASC, time ASC
+                ''', ((start - timedelta(days=2)).strftime("%Y-%m-%d"), (end + timedelta(days=1)).strftime("%Y-%m-%d"),
+                      end_minute, start_minute, exclude_id))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
-            print(f"Error fetching reminders by priority: {e}")
+            print(f"Error finding overlapping reminders: {e}")
             return []
-    
+
+    def query(self):
+        """Start a combined filter, e.g. db.query().category("Work").completed(False).fetch()"""
+        return ReminderQuery(self)
+
+    def get_reminders_by_category(self, category):
+        """Get reminders by category"""
+        return self.query().category(category).fetch()
+
+    def get_reminders_by_priority(self, priority):
+        """Get reminders by priority"""
+        return self.query().priority(priority).fetch()
+
     def search_reminders(self, query):
         """Search reminders by title or description"""
+        return self.query().text(query).fetch()
+
+    def get_due_reminders(self, since, until):
+        """Get pending reminders due after since and up to until (UTC 'YYYY-MM-DD HH:MM')
+
+        A recurring series is due when its next_due_at falls in the window; it comes back with the
+        occurrence's local time as 'occurrence' and its original date as 'occurrence_date'.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM reminders 
-                    WHERE title LIKE ? OR description LIKE ?
-                    ORDER BY date DESC, time ASC
-                ''', (f"%{query}%", f"%{query}%"))
+            with self._connect() as conn:
+                # Unary + keeps the planner on the due_utc range rather than every pending row's flags
+                cursor = conn.execute('''
+                    SELECT * FROM reminders
+                    WHERE due_utc > ? AND due_utc <= ?
+                      AND +is_completed = 0 AND +is_recurring = 0
+                    ORDER BY due_utc ASC
+                ''', (since, until))
+                reminders = [dict(row) for row in cursor.fetchall()]
+                cursor = conn.execute('''
+                    SELECT * FROM reminders
+                    WHERE next_due_at > ? AND next_due_at <= ?
+                      AND is_recurring = 1 AND is_completed = 0
+                    ORDER BY next_due_at ASC
+                ''', (since, until))
+                reminders.extend(self._with_occurrence(conn, dict(row)) for row in cursor.fetchall())
+                return reminders
+        except Exception as e:
+            print(f"Error fetching due reminders: {e}")
+            return []
+
+    def _with_occurrence(self, conn, reminder):
+        """Add the local 'occurrence' time and original 'occurrence_date' of a series' next_due_at"""
+        try:
+            local = utc_to_local(reminder['next_due_at'], reminder['timezone'])
+        except ValueError:
+            local = utc_to_local(reminder['next_due_at'])
+        reminder['occurrence'] = f"{local:%Y-%m-%d %H:%M}"
+        # A moved occurrence keeps the date it was generated for
+        row = conn.execute('''
+            SELECT occurrence_date FROM occurrence_exceptions
+            WHERE reminder_id = ? AND moved_to = ? AND state = 'moved'
+        ''', (reminder['id'], reminder['occurrence'])).fetchone()
+        reminder['occurrence_date'] = row[0] if row else reminder['occurrence'][:10]
+        return reminder
+
+    def get_next_due(self, limit=10, now=None):
+        """Get the next pending reminders after now (UTC), series at their next occurrence, soonest first"""
+        now = now or utc_now().strftime("%Y-%m-%d %H:%M")
+        try:
+            with self._connect() as conn:
+                # Both halves read their index in order and stop at limit; merging them is cheap
+                one_off = conn.execute('''
+                    SELECT * FROM reminders
+                    WHERE due_utc > ? AND +is_completed = 0 AND +is_recurring = 0
+                    ORDER BY due_utc LIMIT ?
+                ''', (now, limit)).fetchall()
+                series = conn.execute('''
+                    SELECT * FROM reminders
+                    WHERE next_due_at > ? AND next_due_at < ? AND is_recurring = 1 AND is_completed = 0
+                    ORDER BY next_due_at LIMIT ?
+                ''', (now, NO_NEXT_DUE, limit)).fetchall()
+                reminders = heapq.merge(
+                    (dict(row) for row in one_off),
+                    (self._with_occurrence(conn, dict(row)) for row in series),
+                    key=lambda reminder: reminder['next_due_at'] or reminder['due_utc'],
+                )
+                return list(itertools.islice(reminders, limit))
+        except Exception as e:
+            print(f"Error fetching next reminders: {e}")
+            return []
+
+    def set_occurrence_state(self, reminder_id, occurrence_date, state, moved_to=None):
+        """Mark one occurrence of a series (by its original local date) completed, skipped or moved
+
+        moved_to is a local 'YYYY-MM-DD HH:MM'; completing or skipping a moved occurrence keeps its new time.
+        """
+        try:
+            with self._connect() as conn:
+                conn.execute('''
+                    INSERT INTO occurrence_exceptions (reminder_id, occurrence_date, state, moved_to, updated_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT (reminder_id, occurrence_date) DO UPDATE
+                    SET state = excluded.state, moved_to = COALESCE(excluded.moved_to, moved_to),
+                        updated_at = excluded.updated_at
+                ''', (reminder_id, occurrence_date, state, moved_to))
+                self._fill_next_due(conn)
+                return True
+        except Exception as e:
+            print(f"Error updating occurrence: {e}")
+            return False
+
+    def clear_occurrence_state(self, reminder_id, occurrence_date):
+        """Return an occurrence to its generated schedule; returns True if it had an exception"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute('''
+                    DELETE FROM occurrence_exceptions WHERE reminder_id = ? AND occurrence_date = ?
+                ''', (reminder_id, occurrence_date))
+                self._fill_next_due(conn)
+                return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error reopening occurrence: {e}")
+            return False
+
+    def get_occurrence_exceptions(self, reminder_id, start_date=None, end_date=None):
+        """(occurrence_date, state, moved_to) rows of a series dated, or moved, within [start_date, end_date]"""
+        start_date, end_date = start_date or "0000-00-00", end_date or "9999-99-99"
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute('''
+                    SELECT occurrence_date, state, moved_to FROM occurrence_exceptions
+                    WHERE reminder_id = ?
+                      AND (occurrence_date BETWEEN ? AND ? OR substr(moved_to, 1, 10) BETWEEN ? AND ?)
+                    ORDER BY occurrence_date
+                ''', (reminder_id, start_date, end_date, start_date, end_date))
+                return [tuple(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error fetching occurrences: {e}")
+            return []
+
+    def claim_notification(self, reminder_id, occurrence_time):
+        """Claim the right to deliver one occurrence; returns the log id, or None if already claimed"""
+        return self.claim_notifications([(reminder_id, occurrence_time)])[0]
+
+    def claim_notifications(self, occurrences):
+        """Claim many (reminder_id, occurrence_time) pairs in one transaction; returns log ids, None where taken"""
+        now = utc_now().strftime("%Y-%m-%d %H:%M:%S.%f")
+        try:
+            with self._connect() as conn:
+                return [self._claim(conn, reminder_id, occurrence_time, now)
+                        for reminder_id, occurrence_time in occurrences]
+        except Exception as e:
+            print(f"Error claiming notification: {e}")
+            return [None] * len(occurrences)
+
+    def _claim(self, conn, reminder_id, occurrence_time, now):
+        cursor = conn.execute('''
+            INSERT OR IGNORE INTO notification_log (reminder_id, occurrence_time, claimed_at)
+            VALUES (?, ?, ?)
+        ''', (reminder_id, occurrence_time, now))
+        if cursor.rowcount == 1:
+            return cursor.lastrowid
+
+        # Take over claims abandoned by an instance that died before delivering
+        row = conn.execute('''
+            SELECT id FROM notification_log
+            WHERE reminder_id = ? AND occurrence_time = ?
+              AND delivered_at IS NULL
+              AND claimed_at < strftime('%Y-%m-%d %H:%M:%f', ?, ?)
+        ''', (reminder_id, occurrence_time, now, f"-{NOTIFICATION_CLAIM_LEASE} seconds")).fetchone()
+        if row is None:
+            return None
+        cursor = conn.execute('''
+            UPDATE notification_log SET claimed_at = ?
+            WHERE id = ? AND delivered_at IS NULL
+        ''', (now, row["id"]))
+        return row["id"] if cursor.rowcount == 1 else None
+
+    def record_delivery(self, log_id, backend, latency_ms):
+        """Record that a claimed occurrence was delivered"""
+        return self.record_deliveries([(log_id, latency_ms)], backend)
+
+    def record_deliveries(self, deliveries, backend):
+        """Record many (log_id, latency_ms) deliveries in one transaction"""
+        delivered_at = utc_now().strftime("%Y-%m-%d %H:%M:%S.%f")
+        try:
+            with self._connect() as conn:
+                conn.executemany('''
+                    UPDATE notification_log
+                    SET delivered_at = ?, backend = ?, latency_ms = ?
+                    WHERE id = ?
+                ''', [(delivered_at, backend, latency_ms, log_id) for log_id, latency_ms in deliveries])
+                return True
+        except Exception as e:
+            print(f"Error recording delivery: {e}")
+            return False
+
+    def release_notification(self, log_id):
+        """Drop an undelivered claim so the occurrence can be retried"""
+        return self.release_notifications([log_id])
+
+    def release_notifications(self, log_ids):
+        """Drop many undelivered claims in one transaction"""
+        try:
+            with self._connect() as conn:
+                conn.executemany('DELETE FROM notification_log WHERE id = ? AND delivered_at IS NULL',
+                                 [(log_id,) for log_id in log_ids])
+                return True
+        except Exception as e:
+            print(f"Error releasing notification: {e}")
+            return False
+
+    def get_notification_log(self, limit=100, reminder_id=None):
+        """Get the most recent delivery log entries, newest first"""
+        try:
+            with self._connect() as conn:
+                if reminder_id is None:
+                    cursor = conn.execute('''
+                        SELECT * FROM notification_log
+                        ORDER BY id DESC LIMIT ?
+                    ''', (limit,))
+                else:
+                    cursor = conn.execute('''
+                        SELECT * FROM notification_log
+                        WHERE reminder_id = ?
+                        ORDER BY id DESC LIMIT ?
+                    ''', (reminder_id, limit))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
-            print(f"Error searching reminders: {e}")
+            print(f"Error fetching notification log: {e}")
             return []
+
+    def get_delivery_latency_stats(self, since=None):
+        """Get delivery count and latency (ms) summary per backend for deliveries after since"""
+        since = since or "0000-00-00"
+        try:
+            with self._connect() as conn:
+                rows = conn.execute('''
+                    SELECT backend, COUNT(*) AS delivered, AVG(latency_ms) AS mean_ms,
+                           MIN(latency_ms) AS min_ms, MAX(latency_ms) AS max_ms
+                    FROM notification_log
+                    WHERE delivered_at > ?
+                    GROUP BY backend
+                ''', (since,)).fetchall()
+                stats = {}
+                for row in rows:
+                    entry = dict(row)
+                    # p95 via an ordered offset rather than pulling every latency into Python
+                    offset = max(int(entry["delivered"] * 0.95) - 1, 0)
+                    p95 = conn.execute('''
+                        SELECT latency_ms FROM notification_log
+                        WHERE delivered_at > ? AND backend IS ?
+                        ORDER BY latency_ms LIMIT 1 OFFSET ?
+                    ''', (since, entry["backend"], offset)).fetchone()
+                    entry["p95_ms"] = p95[0] if p95 else None
+                    stats[entry.pop("backend")] = entry
+                return stats
+        except Exception as e:
+            print(f"Error computing delivery latency: {e}")
+            return {}
+
+    def get_undelivered_count(self):
+        """Count claimed occurrences that were never delivered"""
+        try:
+            with self._connect() as conn:
+                return conn.execute(
+                    'SELECT COUNT(*) FROM notification_log WHERE delivered_at IS NULL'
+                ).fetchone()[0]
+        except Exception as e:
+            print(f"Error counting undelivered notifications: {e}")
+            return 0
+
+    def get_change_seq(self):
+        """Sequence number of the latest reminder change; any insert, edit or delete raises it"""
+        try:
+            with self._connect() as conn:
+                return self._change_seq(conn)
+        except Exception as e:
+            print(f"Error reading change sequence: {e}")
+            return None
+
+    def get_device_id(self):
+        """Random id identifying this database to sync peers"""
+        with self._connect() as conn:
+            return conn.execute("SELECT value FROM sync_meta WHERE key = 'device_id'").fetchone()[0]
+
+    def get_sync_state(self, peer):
+        """Get the sync watermarks recorded for a peer"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM sync_peers WHERE peer = ?', (peer,)).fetchone()
+            return dict(row) if row else {"peer": peer, "pushed_seq": 0, "pulled_seq": 0, "last_sync": None}
+
+    def _change_seq(self, conn):
+        return conn.execute('SELECT COALESCE(MAX(seq), 0) FROM sync_changes').fetchone()[0]
+
+    def _select_changes(self, conn, where, params):
+        """Current state of journaled rows: the live row, or the tombstone of a deleted one"""
+        columns = ", ".join(f"r.{column}" for column in SYNC_COLUMNS)
+        cursor = conn.execute(f'''
+            SELECT c.uuid, c.deleted, COALESCE(r.version, c.version) AS version,
+                   COALESCE(r.updated_at, c.updated_at) AS updated_at, r.created_at, {columns}
+            FROM sync_changes c LEFT JOIN reminders r ON r.uuid = c.uuid
+            WHERE {where}
+        ''', params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _apply_changes(self, conn, changes):
+        """Apply a peer's changes where they win sync_precedence; returns (applied, skipped)"""
+        current = {}
+        uuids = [change["uuid"] for change in changes]
+        for start in range(0, len(uuids), ID_CHUNK_SIZE):
+            chunk = uuids[start:start + ID_CHUNK_SIZE]
+            for row in self._select_changes(conn, f"c.uuid IN ({', '.join('?' * len(chunk))})", chunk):
+                current[row["uuid"]] = row
+
+        assignments = ", ".join(f"{column} = ?" for column in SYNC_COLUMNS)
+        placeholders = ", ".join("?" * len(SYNC_COLUMNS))
+        applied = skipped = 0
+        conn.execute("INSERT OR REPLACE INTO sync_meta VALUES ('applying', '1')")
+        for change in changes:
+            local = current.get(change["uuid"])
+            if local is not None and sync_precedence(local) >= sync_precedence(change):
+                skipped += 1
+                continue
+            values = [change.get(column) for column in SYNC_COLUMNS]
+            if change["deleted"]:
+                conn.execute('DELETE FROM reminders WHERE uuid = ?', (change["uuid"],))
+                conn.execute('''
+                    INSERT OR REPLACE INTO sync_changes (uuid, deleted, version, updated_at)
+                    VALUES (?, 1, ?, ?)
+                ''', (change["uuid"], change["version"], change["updated_at"]))
+            elif local is not None and not local["deleted"]:
+                conn.execute(f'''
+                    UPDATE reminders SET {assignments}, version = ?, updated_at = ?
+                    WHERE uuid = ?
+                ''', (*values, change["version"], change["updated_at"], change["uuid"]))
+            else:
+                conn.execute(f'''
+                    INSERT INTO reminders (uuid, version, created_at, updated_at, {", ".join(SYNC_COLUMNS)})
+                    VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, {placeholders})
+                ''', (change["uuid"], change["version"], change["created_at"], change["updated_at"], *values))
+            current[change["uuid"]] = change
+            applied += 1
+        conn.execute("DELETE FROM sync_meta WHERE key = 'applying'")
+        self._fill_due_utc(conn)
+        self._fill_next_due(conn)
+        return applied, skipped
+
+    def exchange_changes(self, changes, since):
+        """Peer side of a sync: apply incoming changes and return ours made after change seq since"""
+        with self.transaction() as conn:
+            device_id = conn.execute("SELECT value FROM sync_meta WHERE key = 'device_id'").fetchone()[0]
+            outgoing = self._select_changes(conn, "c.seq > ? ORDER BY c.seq", (since,))
+            applied, skipped = self._apply_changes(conn, changes)
+            # Reporting the seq after applying keeps the caller from pulling its own changes back
+            return {"device_id": device_id, "changes": outgoing, "seq": self._change_seq(conn),
+                    "applied": applied, "skipped": skipped}
+
+    def sync_with_peer(self, peer, exchange):
+        """Local side of a sync: send changes since the last sync through exchange(changes, since), apply the reply"""
+        state = self.get_sync_state(peer)
+        with self.transaction() as conn:
+            pushed_seq = state["pushed_seq"]
+            if pushed_seq > self._change_seq(conn):
+                # Our journal went backwards (restored from a backup): resend everything
+                pushed_seq = 0
+            outgoing = self._select_changes(conn, "c.seq > ? ORDER BY c.seq", (pushed_seq,))
+            result = exchange(outgoing, state["pulled_seq"])
+            if result["seq"] < state["pulled_seq"]:
+                # Same for the peer's journal: pull everything
+                result = exchange([], 0)
+            applied, skipped = self._apply_changes(conn, result["changes"])
+            conn.execute('''
+                INSERT OR REPLACE INTO sync_peers (peer, pushed_seq, pulled_seq, last_sync)
+                VALUES (?, ?, ?, ?)
+            ''', (peer, self._change_seq(conn), result["seq"], utc_now().strftime("%Y-%m-%d %H:%M:%S")))
+        return {"sent": len(outgoing), "received": len(result["changes"]), "applied": applied,
+                "skipped": skipped, "peer_applied": result["applied"], "peer_skipped": result["skipped"]}
@@ -0,0 +1,141 @@
+"""
+Snooze and escalation of unacknowledged reminders, driven by a hashed timer wheel
+"""
+
+from datetime import timedelta
+from config import ESCALATE_AFTER, MAX_REALERTS, REALERT_INTERVALS, TIMER_WHEEL_SLOTS
+from recurrence import to_minute
+from timezones import utc_now
+
+
+class TimerWheel:
+    """One-minute hashed timing wheel: schedule/cancel are O(1) and a tick only visits its own slot"""
+
+    def __init__(self, slots=TIMER_WHEEL_SLOTS):
+        self.slots = [{} for _ in range(slots)]
+        self.locations = {}
+        self.last_minute = None
+
+    def __len__(self):
+        return len(self.locations)
+
+    def schedule(self, key, due_at, payload=None):
+        """Schedule key to fire at due_at, replacing any earlier schedule for the same key"""
+        self.cancel(key)
+        due_minute = to_minute(due_at)
+        # Anything already in the past goes in the next slot to be visited
+        slot_minute = due_minute if self.last_minute is None else max(due_minute, self.last_minute + 1)
+        slot = slot_minute % len(self.slots)
+        self.slots[slot][key] = (due_minute, payload)
+        self.locations[key] = slot
+
+    def cancel(self, key):
+        """Remove key from the wheel; returns True if it was scheduled"""
+        slot = self.locations.pop(key, None)
+        if slot is None:
+            return False
+        del self.slots[slot][key]
+        return True
+
+    def advance(self, now):
+        """Pop and return (key, payload) for every entry due at or before now"""
+        now_minute = to_minute(now)
+        if self.last_minute is None:
+            # First advance: sweep every slot once so nothing scheduled earlier is skipped
+            self.last_minute = now_minute - len(self.slots)
+
+        # A stall longer than one revolution only needs each slot visited once
+        first = max(self.last_minute + 1, now_minute - len(self.slots) + 1)
+        expired = []
+        for minute in range(first, now_minute + 1):
+            bucket = self.slots[minute % len(self.slots)]
+            # Entries for later revolutions share the slot and are left in place
+            due_keys = [key for key, (due_minute, _) in bucket.items() if due_minute <= now_minute]
+            for key in due_keys:
+                _, payload = bucket.pop(key)
+                del self.locations[key]
+                expired.append((key, payload))
+        self.last_minute = max(self.last_minute, now_minute)
+        return expired
+
+
+class EscalationEngine:
+    def __init__(self, scheduler, wheel=None):
+        self.scheduler = scheduler
+        self.wheel = wheel or TimerWheel()
+        self.states = {}
+
+    def realert_interval(self, level):
+        """Minutes until the next re-alert at a given urgency level, or None to stop"""
+        return REALERT_INTERVALS.get(level)
+
+    def track(self, reminder, now=None):
+        """Start re-alerting a freshly fired reminder until it is acknowledged"""
+        now = now or utc_now()
+        state = {"count": 0, "level": reminder['priority'],
+                 "occurrence": reminder.get('occurrence') or f"{reminder['date']} {reminder['time']}",
+                 "occurrence_date": reminder.get('occurrence_date')}
+        interval = self.realert_interval(state["level"])
+        if interval is None:
+            return
+        self.states[reminder['id']] = state
+        self.wheel.schedule(reminder['id'], now + timedelta(minutes=interval))
+
+    def snooze(self, reminder_id, minutes, now=None):
+        """Re-alert after the chosen delay instead of the normal cadence"""
+        now = now or utc_now()
+        self.states.setdefault(reminder_id, {"count": 0, "level": None, "occurrence": None})
+        self.wheel.schedule(reminder_id, now + timedelta(minutes=minutes))
+
+    def acknowledge(self, reminder_id):
+        """Stop re-alerting a reminder (dismissed, completed or deleted)"""
+        self.states.pop(reminder_id, None)
+        self.wheel.cancel(reminder_id)
+
+    def pending_count(self):
+        """Number of reminders waiting for a re-alert"""
+        return len(self.wheel)
+
+    def tick(self, now=None):
+        """Re-deliver every reminder whose re-alert is due"""
+        now = now or utc_now()
+        expired = [key for key, _ in self.wheel.advance(now)]
+        if not expired:
+            return []
+
+        db = self.scheduler.reminder_manager.db
+        reminders = {r['id']: r for r in db.get_reminders_by_ids(expired)}
+        alerts = []
+        for reminder_id in expired:
+            state = self.states.get(reminder_id)
+            reminder = reminders.get(reminder_id)
+            if state is None or reminder is None or reminder['is_completed']:
+                self.acknowledge(reminder_id)
+                continue
+            occurrence_date = state.get("occurrence_date")
+            if occurrence_date and any(date == occurrence_date and status != "moved" for date, status, _ in
+                                       db.get_occurrence_exceptions(reminder_id, occurrence_date, occurrence_date)):
+                # This occurrence of the series was completed or skipped since it fired
+                self.acknowledge(reminder_id)
+                continue
+
+            state["count"] += 1
+            if state["level"] is None:
+                state["level"] = reminder['priority']
+            if state["level"] == "High" and state["count"] >= ESCALATE_AFTER:
+                state["level"] = "Urgent"
+
+            alert = dict(reminder, priority=state["level"], realert=state["count"])
+            if occurrence_date:
+                alert.update(occurrence=state["occurrence"], occurrence_date=occurrence_date)
+            occurrence = state["occurrence"] or f"{reminder['date']} {reminder['time']}"
+            # Each re-alert gets its own log key so other instances don't repeat it
+            alerts.append((alert, f"{occurrence} #{state['count']}", now))
+
+            interval = self.realert_interval(state["level"])
+            if interval is None or state["count"] >= MAX_REALERTS:
+                self.states.pop(reminder_id, None)
+            else:
+                self.wheel.schedule(reminder_id, now + timedelta(minutes=interval))
+        # Re-alerts falling due together are delivered (and digested) as one batch
+        return self.scheduler.deliver_many(alerts)
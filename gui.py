@@ -2,14 +2,31 @@
 GUI Interface for Calendar and Reminder App - Professional Modern UI
 """
 
+import json
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox, font
-from calendar import monthcalendar, month_name
-from datetime import datetime, timedelta
+from tkinter import ttk, messagebox, simpledialog, font
+from calendar import month_name
+from datetime import date, datetime, timedelta
 from reminders import ReminderManager
 from notifications import NotificationManager
+from scheduler import ReminderScheduler
+from backup import BackupManager
+from sync import SyncEngine
+from timezones import load_zone
+from month_cache import MonthViewCache
+from analytics import ReminderAnalytics
+from calendar_canvas import CALENDAR_VIEWS, CalendarCanvas, month_cells, week_cells, year_cells
+from instrumentation import instrumented, metrics, profile_session
+from watchdog import StallWatchdog
+from tags import parse_tags
 from config import *
 
+# Status shown for reminders read from a year partition; they cannot be edited, completed or deleted
+ARCHIVED_STATUS = "🗄 ARCHIVED"
+
+@instrumented("gui", methods=("refresh_*", "update_*", "show_*_reminders", "apply_filters", "check_reminders"))
 class CalendarReminderApp:
     def __init__(self, root):
         self.root = root
@@ -20,15 +37,37 @@ class CalendarReminderApp:
         
         self.reminder_manager = ReminderManager()
         self.notification_manager = NotificationManager()
+        self.scheduler = ReminderScheduler(self.reminder_manager, self.notification_manager,
+                                           on_fire=self.show_reminder_popup, on_digest=self.show_digest_popup)
+        self.backup_manager = BackupManager(self.reminder_manager.db.db_path)
+        self.sync_engine = SyncEngine(self.reminder_manager.db)
+        self.sync_thread = None
+        self.sync_results = queue.Queue()
+        self.month_cache = MonthViewCache(self.reminder_manager.db)
+        self.analytics = ReminderAnalytics(self.reminder_manager.db)
+        self.watchdog = StallWatchdog(self.root) if WATCHDOG_ENABLED else None
+        self.stall_window = None
         
         self.current_date = datetime.now()
         self.selected_date = None
         self.selected_reminder_id = None
+        self.selected_reminder_ids = []
+        self.selection_archived = False
+        self.row_action_buttons = []  # disabled while the selection includes archived reminders
+        self.alert_popups = {}
+        self.digest_popup = None
+        self.digest_reminders = {}
         
         self.setup_styles()
         self.create_widgets()
         self.update_calendar()
         self.check_reminders()
+        
+        if BACKUP_ENABLED:
+            self.backup_manager.start()
+        if self.watchdog:
+            self.watchdog.start()
+            self.root.after(LAG_REFRESH_INTERVAL, self.update_lag_indicator)
     
     def setup_styles(self):
         """Configure professional UI styles"""
@@ -92,6 +131,12 @@ class CalendarReminderApp:
         filters_tab = ttk.Frame(self.notebook)
         self.notebook.add(filters_tab, text="Smart Filters")
         self.create_filters_tab(filters_tab)
+        
+        # Tab 4: Analytics
+        self.analytics_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.analytics_tab, text="Analytics")
+        self.create_analytics_tab(self.analytics_tab)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
     
     def create_header_bar(self):
         """Create professional header bar"""
@@ -121,6 +166,15 @@ class CalendarReminderApp:
                                    font=FONT_LABEL)
         self.stats_label.pack(side=tk.RIGHT)
         
+        if self.watchdog:
+            self.lag_label = tk.Label(right_frame, text="● – ms", bg=COLORS["header_bg"],
+                                     fg=COLORS["text_tertiary"], font=FONT_SMALL, cursor="hand2")
+            self.lag_label.pack(side=tk.RIGHT, padx=10)
+            self.lag_label.bind("<Button-1>", lambda e: self.show_stall_log())
+        
+        if SYNC_PEER:
+            ttk.Button(right_frame, text="⇅ Sync", command=self.sync_now, width=8).pack(side=tk.RIGHT, padx=10)
+        
         self.update_statistics()
         
         # Bottom border
@@ -140,51 +194,26 @@ class CalendarReminderApp:
         ttk.Button(nav_buttons, text="Today", command=self.go_to_today, width=8).pack(side=tk.LEFT, padx=2)
         ttk.Button(nav_buttons, text="Next ►", command=self.next_month, width=8).pack(side=tk.LEFT, padx=2)
         
+        self.calendar_view_var = tk.StringVar(value=CALENDAR_VIEWS[0])
+        view_combo = ttk.Combobox(nav_buttons, textvariable=self.calendar_view_var, values=CALENDAR_VIEWS,
+                                  state='readonly', width=7)
+        view_combo.pack(side=tk.RIGHT, padx=2)
+        view_combo.bind("<<ComboboxSelected>>", lambda e: self.update_calendar())
+        
         self.month_label = tk.Label(nav_frame, text="", 
                                    bg=COLORS["background"],
                                    fg=COLORS["text_primary"],
                                    font=FONT_SUBHEADING)
         self.month_label.pack(fill=tk.X, pady=(10, 0))
         
-        # Calendar grid with proper spacing
+        # Calendar drawn on a single canvas; only cells whose state changed are redrawn
         calendar_container = tk.Frame(parent, bg=COLORS["surface"], relief=tk.FLAT, highlightthickness=1, 
                                      highlightbackground=COLORS["border"])
         calendar_container.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
         
-        # Day headers
-        days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        for i, day in enumerate(days):
-            is_weekend = i >= 5
-            day_label = tk.Label(calendar_container, text=day,
-                               bg=COLORS["weekend"] if is_weekend else COLORS["surface"],
-                               fg=COLORS["text_primary"],
-                               font=(FONT_LABEL[0], FONT_LABEL[1], "bold"),
-                               pady=8)
-            day_label.grid(row=0, column=i, sticky='nsew', padx=1, pady=1)
-        
-        # Date cells
-        self.date_buttons = {}
-        for row in range(1, 7):
-            for col in range(7):
-                btn = tk.Button(calendar_container, text="",
-                              command=lambda r=row, c=col: self.select_date(r, c),
-                              bg=COLORS["background"], 
-                              fg=COLORS["text_primary"],
-                              relief=tk.FLAT,
-                              font=FONT_LABEL,
-                              padx=0, pady=10,
-                              activebackground=COLORS["hover"],
-                              activeforeground=COLORS["text_primary"],
-                              highlightthickness=0,
-                              bd=0)
-                btn.grid(row=row, column=col, sticky='nsew', padx=1, pady=1)
-                self.date_buttons[(row, col)] = btn
-        
-        # Configure grid weights for equal sizing
-        for i in range(7):
-            calendar_container.grid_columnconfigure(i, weight=1)
-        for i in range(7):
-            calendar_container.grid_rowconfigure(i, weight=1)
+        self.calendar = CalendarCanvas(calendar_container, on_select=self.select_date,
+                                       on_resize=self.update_calendar, width=420, height=320)
+        self.calendar.canvas.pack(fill=tk.BOTH, expand=True)
         
         # Selected date info
         info_frame = tk.Frame(parent, bg=COLORS["surface"], relief=tk.FLAT, highlightthickness=1,
@@ -211,7 +240,7 @@ class CalendarReminderApp:
                                        bg=COLORS["surface"],
                                        fg=COLORS["text_primary"],
                                        font=FONT_SMALL,
-                                       selectmode=tk.SINGLE,
+                                       selectmode=tk.EXTENDED,
                                        relief=tk.FLAT,
                                        bd=0,
                                        highlightthickness=0)
@@ -226,7 +255,7 @@ class CalendarReminderApp:
                                                 bg=COLORS["surface"],
                                                 fg=COLORS["text_primary"],
                                                 font=FONT_SMALL,
-                                                selectmode=tk.SINGLE,
+                                                selectmode=tk.EXTENDED,
                                                 relief=tk.FLAT,
                                                 bd=0,
                                                 highlightthickness=0)
@@ -238,9 +267,43 @@ class CalendarReminderApp:
         actions.pack(fill=tk.X)
         
         ttk.Button(actions, text="+ Add Reminder", command=self.add_reminder).pack(side=tk.LEFT, padx=5)
-        ttk.Button(actions, text="✎ Edit", command=self.edit_reminder).pack(side=tk.LEFT, padx=5)
-        ttk.Button(actions, text="✓ Mark Done", command=self.mark_done).pack(side=tk.LEFT, padx=5)
-        ttk.Button(actions, text="✕ Delete", command=self.delete_reminder).pack(side=tk.LEFT, padx=5)
+        for text, command in (("✎ Edit", self.edit_reminder), ("✓ Mark Done", self.mark_done),
+                              ("⇆ Reschedule", self.reschedule_reminders), ("✕ Delete", self.delete_reminder)):
+            button = ttk.Button(actions, text=text, command=command)
+            button.pack(side=tk.LEFT, padx=5)
+            self.row_action_buttons.append(button)
+        
+        if PROFILING_ENABLED:
+            self.create_performance_card(main_frame)
+    
+    def create_performance_card(self, parent):
+        """Create the rolling timing summary shown when profiling is enabled"""
+        perf_section = self.create_card(parent, "Performance (slowest paths)")
+        perf_section.pack(fill=tk.X, pady=(15, 0))
+        
+        self.performance_label = tk.Label(perf_section, text="Collecting timings...",
+                                         bg=COLORS["surface"], fg=COLORS["text_secondary"],
+                                         font=("Consolas", 9), justify=tk.LEFT, anchor=tk.W)
+        self.performance_label.pack(fill=tk.X, padx=15, pady=(10, 5))
+        
+        ttk.Button(perf_section, text="Dump JSON",
+                  command=self.dump_performance_metrics).pack(anchor=tk.W, padx=15, pady=(0, 10))
+        
+        self.root.after(PROFILE_REFRESH_INTERVAL, self.refresh_performance_summary)
+    
+    def refresh_performance_summary(self):
+        """Refresh the rolling timing summary"""
+        lines = [f"{'metric':<36}{'calls':>7}{'mean ms':>10}{'p95 ms':>10}{'total ms':>11}"]
+        for name, stats in metrics.top(8):
+            lines.append(f"{name[:35]:<36}{stats['count']:>7}{stats['mean_ms']:>10.2f}"
+                         f"{stats['p95_ms']:>10.2f}{stats['total_ms']:>11.1f}")
+        self.performance_label.config(text="\n".join(lines))
+        self.root.after(PROFILE_REFRESH_INTERVAL, self.refresh_performance_summary)
+    
+    def dump_performance_metrics(self):
+        """Write the timing summary to a JSON file"""
+        path = metrics.dump_json()
+        messagebox.showinfo("Performance", f"Metrics written to\n{path}")
     
     def create_all_reminders_tab(self, parent):
         """Create tab showing all reminders"""
@@ -255,7 +318,7 @@ class CalendarReminderApp:
                                                bg=COLORS["surface"],
                                                fg=COLORS["text_primary"],
                                                font=FONT_SMALL,
-                                               selectmode=tk.SINGLE,
+                                               selectmode=tk.EXTENDED,
                                                relief=tk.FLAT,
                                                bd=0,
                                                highlightthickness=0)
@@ -268,9 +331,11 @@ class CalendarReminderApp:
         
         ttk.Button(controls, text="+ Add", command=self.add_reminder).pack(side=tk.LEFT, padx=5)
         ttk.Button(controls, text="Refresh", command=self.refresh_all_reminders).pack(side=tk.LEFT, padx=5)
-        ttk.Button(controls, text="✎ Edit", command=self.edit_reminder).pack(side=tk.LEFT, padx=5)
-        ttk.Button(controls, text="✓ Done", command=self.mark_done).pack(side=tk.LEFT, padx=5)
-        ttk.Button(controls, text="✕ Delete", command=self.delete_reminder).pack(side=tk.LEFT, padx=5)
+        for text, command in (("✎ Edit", self.edit_reminder), ("✓ Done", self.mark_done),
+                              ("⇆ Reschedule", self.reschedule_reminders), ("✕ Delete", self.delete_reminder)):
+            button = ttk.Button(controls, text=text, command=command)
+            button.pack(side=tk.LEFT, padx=5)
+            self.row_action_buttons.append(button)
     
     def create_filters_tab(self, parent):
         """Create smart filters tab"""
@@ -312,22 +377,50 @@ class CalendarReminderApp:
         
         tk.Label(filter_row, text="Category:", bg=COLORS["surface"],
                 fg=COLORS["text_secondary"], font=FONT_LABEL).pack(side=tk.LEFT, padx=(0, 5))
-        self.category_filter = ttk.Combobox(filter_row, values=self.reminder_manager.categories,
-                                           state='readonly', width=15)
+        self.category_filter = ttk.Combobox(filter_row, values=["Any"] + self.reminder_manager.categories,
+                                           state='readonly', width=12)
+        self.category_filter.configure(postcommand=lambda: self.category_filter.configure(
+            values=["Any"] + self.reminder_manager.categories))
+        self.category_filter.set("Any")
         self.category_filter.pack(side=tk.LEFT, padx=2)
-        ttk.Button(filter_row, text="Filter", 
-                  command=self.filter_by_category).pack(side=tk.LEFT, padx=5)
         
-        priority_row = tk.Frame(filter_content, bg=COLORS["surface"])
-        priority_row.pack(fill=tk.X, pady=(0, 10))
+        tk.Label(filter_row, text="Priority:", bg=COLORS["surface"],
+                fg=COLORS["text_secondary"], font=FONT_LABEL).pack(side=tk.LEFT, padx=(10, 5))
+        self.priority_filter = ttk.Combobox(filter_row, values=["Any"] + self.reminder_manager.priorities,
+                                           state='readonly', width=12)
+        self.priority_filter.set("Any")
+        self.priority_filter.pack(side=tk.LEFT, padx=2)
+        
+        tk.Label(filter_row, text="Status:", bg=COLORS["surface"],
+                fg=COLORS["text_secondary"], font=FONT_LABEL).pack(side=tk.LEFT, padx=(10, 5))
+        self.status_filter = ttk.Combobox(filter_row, values=["Any", "Pending", "Done"],
+                                         state='readonly', width=10)
+        self.status_filter.set("Any")
+        self.status_filter.pack(side=tk.LEFT, padx=2)
         
-        tk.Label(priority_row, text="Priority:", bg=COLORS["surface"],
+        date_row = tk.Frame(filter_content, bg=COLORS["surface"])
+        date_row.pack(fill=tk.X, pady=(0, 10))
+        
+        tk.Label(date_row, text="From (YYYY-MM-DD):", bg=COLORS["surface"],
                 fg=COLORS["text_secondary"], font=FONT_LABEL).pack(side=tk.LEFT, padx=(0, 5))
-        self.priority_filter = ttk.Combobox(priority_row, values=self.reminder_manager.priorities,
-                                           state='readonly', width=15)
-        self.priority_filter.pack(side=tk.LEFT, padx=2)
-        ttk.Button(priority_row, text="Filter", 
-                  command=self.filter_by_priority).pack(side=tk.LEFT, padx=5)
+        self.start_date_filter = ttk.Entry(date_row, width=12)
+        self.start_date_filter.pack(side=tk.LEFT, padx=2)
+        
+        tk.Label(date_row, text="To:", bg=COLORS["surface"],
+                fg=COLORS["text_secondary"], font=FONT_LABEL).pack(side=tk.LEFT, padx=(10, 5))
+        self.end_date_filter = ttk.Entry(date_row, width=12)
+        self.end_date_filter.pack(side=tk.LEFT, padx=2)
+        
+        tag_row = tk.Frame(filter_content, bg=COLORS["surface"])
+        tag_row.pack(fill=tk.X, pady=(0, 10))
+        
+        tk.Label(tag_row, text="Tags:", bg=COLORS["surface"],
+                fg=COLORS["text_secondary"], font=FONT_LABEL).pack(side=tk.LEFT, padx=(0, 5))
+        self.tag_filter = ttk.Combobox(tag_row, width=30)
+        self.tag_filter.pack(side=tk.LEFT, padx=2)
+        attach_tag_autocomplete(self.tag_filter, self.reminder_manager, expression=True)
+        tk.Label(tag_row, text="e.g. work AND urgent-client, home OR errands, work NOT done",
+                bg=COLORS["surface"], fg=COLORS["text_tertiary"], font=FONT_SMALL).pack(side=tk.LEFT, padx=5)
         
         search_row = tk.Frame(filter_content, bg=COLORS["surface"])
         search_row.pack(fill=tk.X)
@@ -336,8 +429,15 @@ class CalendarReminderApp:
                 fg=COLORS["text_secondary"], font=FONT_LABEL).pack(side=tk.LEFT, padx=(0, 5))
         self.search_entry = ttk.Entry(search_row, width=20)
         self.search_entry.pack(side=tk.LEFT, padx=2)
-        ttk.Button(search_row, text="Search", 
-                  command=self.search_reminders).pack(side=tk.LEFT, padx=5)
+        self.search_entry.bind("<Return>", lambda event: self.apply_filters())
+        ttk.Button(search_row, text="Apply Filters", 
+                  command=self.apply_filters).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_row, text="Clear", 
+                  command=self.clear_filters).pack(side=tk.LEFT, padx=5)
+        
+        self.filter_count_label = tk.Label(search_row, text="", bg=COLORS["surface"],
+                                          fg=COLORS["text_tertiary"], font=FONT_SMALL)
+        self.filter_count_label.pack(side=tk.RIGHT)
         
         # Results
         results_card = self.create_card(main_frame, "Filter Results")
@@ -347,13 +447,70 @@ class CalendarReminderApp:
                                                 bg=COLORS["surface"],
                                                 fg=COLORS["text_primary"],
                                                 font=FONT_SMALL,
-                                                selectmode=tk.SINGLE,
+                                                selectmode=tk.EXTENDED,
                                                 relief=tk.FLAT,
                                                 bd=0,
                                                 highlightthickness=0)
         self.filter_results_listbox.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
         self.filter_results_listbox.bind("<<ListboxSelect>>", self.on_reminder_select)
     
+    def create_analytics_tab(self, parent):
+        """Create the reminder history analytics tab"""
+        main_frame = tk.Frame(parent, bg=COLORS["background"])
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
+        
+        card = self.create_card(main_frame, "Reminder History")
+        card.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
+        
+        self.analytics_text = tk.Text(card, bg=COLORS["surface"], fg=COLORS["text_primary"],
+                                      font=("Consolas", 9), relief=tk.FLAT, bd=0,
+                                      highlightthickness=0, wrap=tk.NONE)
+        self.analytics_text.pack(fill=tk.BOTH, expand=True, padx=15, pady=(10, 15))
+        
+        controls = tk.Frame(main_frame, bg=COLORS["background"])
+        controls.pack(fill=tk.X)
+        ttk.Button(controls, text="Refresh", command=self.refresh_analytics).pack(side=tk.LEFT, padx=5)
+    
+    def on_tab_changed(self, event):
+        """Bring the analytics up to date when its tab is shown"""
+        if self.notebook.select() == str(self.analytics_tab):
+            self.refresh_analytics()
+    
+    def refresh_analytics(self):
+        """Render the cached analytics summary as text tables"""
+        if not ReminderAnalytics.available():
+            lines = ["Analytics needs NumPy.", "", "Install it with: pip install numpy"]
+        else:
+            try:
+                lines = self.format_analytics(self.analytics.summary())
+            except Exception as e:
+                lines = [f"Error computing analytics: {e}"]
+        self.analytics_text.config(state=tk.NORMAL)
+        self.analytics_text.delete("1.0", tk.END)
+        self.analytics_text.insert("1.0", "\n".join(lines))
+        self.analytics_text.config(state=tk.DISABLED)
+    
+    def format_analytics(self, stats):
+        """Lines of text for an analytics summary"""
+        lines = [f"Total: {stats['total']}  |  Completed: {stats['completed']}  |  "
+                 f"Completion rate: {stats['completion_rate']:.0%}", ""]
+        for title, key in (("Category", "by_category"), ("Priority", "by_priority")):
+            lines.append(f"{title:<20}{'total':>8}{'done':>8}{'rate':>8}")
+            for label, row in stats[key].items():
+                lines.append(f"{str(label or '-')[:19]:<20}{row['total']:>8}{row['completed']:>8}{row['rate']:>8.0%}")
+            lines.append("")
+        lines.append(f"{'Overdue for':<20}{'pending':>8}")
+        lines.extend(f"{label:<20}{count:>8}" for label, count in stats["overdue_aging"].items())
+        lines.append("")
+        lines.append(f"{'Weekday':<20}{'total':>8}{'pending':>8}")
+        lines.extend(f"{day:<20}{row['total']:>8}{row['pending']:>8}" for day, row in stats["weekday_load"].items())
+        lines.append("")
+        lines.append(f"{'Month':<20}{'due':>8}{'done':>8}")
+        lines.extend(f"{row['month']:<20}{row['due']:>8}{row['completed']:>8}" for row in stats["monthly_trend"])
+        lines.append("")
+        lines.append(f"Generated {stats['generated_at']}")
+        return lines
+    
     def create_card(self, parent, title):
         """Create a modern card component"""
         card = tk.Frame(parent, bg=COLORS["surface"], relief=tk.FLAT, highlightthickness=1,
@@ -373,62 +530,70 @@ class CalendarReminderApp:
         return card
     
     def update_calendar(self):
-        """Update calendar display with modern styling"""
-        year = self.current_date.year
-        month = self.current_date.month
-        
-        self.month_label.config(text=f"{month_name[month]} {year}")
-        
-        cal = monthcalendar(year, month)
+        """Redraw the calendar in the current view (Month, Week or Year)"""
+        view = self.calendar_view_var.get()
         today = datetime.now().date()
+        width, height = self.calendar.size()
+        current = self.current_date.date() if isinstance(self.current_date, datetime) else self.current_date
+        
+        if view == "Week":
+            week_start = current - timedelta(days=current.weekday())
+            week_end = week_start + timedelta(days=6)
+            rows = self.reminder_manager.db.query().date_range(str(week_start), str(week_end)) \
+                .order_by("date_asc").fetch_columns("date", "time", "title", "is_completed")
+            reminders = {}
+            for day, time, title, is_completed in rows:
+                reminders.setdefault(date.fromisoformat(day), []).append((time, title, is_completed))
+            self.month_label.config(text=f"Week of {week_start.strftime('%B %d, %Y')}")
+            cells = week_cells(week_start, reminders, today, self.selected_date, width, height)
+        elif view == "Year":
+            # Twelve cached months make up the heatmap; no neighbour prefetch needed
+            summaries = {}
+            for month in range(1, 13):
+                month_view = self.month_cache.get(current.year, month, prefetch=False)
+                for day, summary in month_view["days"].items():
+                    summaries[date(current.year, month, day)] = summary
+            self.month_label.config(text=str(current.year))
+            cells = year_cells(current.year, summaries, today, self.selected_date, width, height)
+        else:
+            # Layout and day summaries come from the cache; neighbouring months are prefetched
+            month_view = self.month_cache.get(current.year, current.month)
+            self.month_label.config(text=f"{month_name[current.month]} {current.year}")
+            cells = month_cells(current.year, current.month, month_view["days"], today, self.selected_date,
+                                width, height)
         
-        # Clear all buttons
-        for btn in self.date_buttons.values():
-            btn.config(text="", state=tk.DISABLED, bg=COLORS["background"])
-        
-        for week_num, week in enumerate(cal):
-            for day_num, day in enumerate(week):
-                if day > 0:
-                    btn = self.date_buttons[(week_num + 1, day_num)]
-                    btn.config(text=str(day), state=tk.NORMAL)
-                    
-                    date_obj = datetime(year, month, day).date()
-                    is_weekend = day_num >= 5
-                    
-                    # Color logic
-                    if date_obj == today:
-                        btn.config(bg=COLORS["today"], fg=COLORS["text_primary"])
-                    elif self.selected_date and self.selected_date == date_obj:
-                        btn.config(bg=COLORS["selected"], fg=COLORS["text_inverse"])
-                    elif is_weekend:
-                        btn.config(bg=COLORS["weekend"], fg=COLORS["text_secondary"])
-                    else:
-                        btn.config(bg=COLORS["background"], fg=COLORS["text_primary"])
-                    
-                    btn.config(command=lambda d=day: self.select_date_by_day(d))
-    
-    def select_date(self, row, col):
-        pass
-    
-    def select_date_by_day(self, day):
+        self.calendar.render(cells)
+    
+    def select_date(self, day):
         """Select a date and update reminders display"""
-        self.selected_date = datetime(self.current_date.year, self.current_date.month, day).date()
+        self.selected_date = day
         self.update_calendar()
         self.selected_date_label.config(text=f"Selected: {self.selected_date.strftime('%A, %B %d, %Y')}")
         self.refresh_date_reminders()
     
-    def prev_month(self):
-        """Previous month"""
-        first_day = self.current_date.replace(day=1)
-        self.current_date = first_day - timedelta(days=1)
+    def shift_calendar(self, direction):
+        """Move the calendar one month, week or year forwards (1) or backwards (-1)"""
+        view = self.calendar_view_var.get()
+        current = self.current_date
+        if view == "Week":
+            self.current_date = current + timedelta(weeks=direction)
+        elif view == "Year":
+            self.current_date = current.replace(year=current.year + direction, day=1)
+        else:
+            first_day = current.replace(day=1)
+            if direction < 0:
+                self.current_date = (first_day - timedelta(days=1)).replace(day=1)
+            else:
+                self.current_date = (first_day + timedelta(days=32)).replace(day=1)
         self.update_calendar()
     
+    def prev_month(self):
+        """Previous month (or week/year in those views)"""
+        self.shift_calendar(-1)
+    
     def next_month(self):
-        """Next month"""
-        first_day = self.current_date.replace(day=1)
-        self.current_date = first_day + timedelta(days=32)
-        self.current_date = self.current_date.replace(day=1)
-        self.update_calendar()
+        """Next month (or week/year in those views)"""
+        self.shift_calendar(1)
     
     def go_to_today(self):
         """Go to today"""
@@ -477,30 +642,74 @@ class CalendarReminderApp:
     
     def format_reminder_display(self, reminder):
         """Format reminder for display"""
-        status = "✓ DONE" if reminder['is_completed'] else "⏳ PENDING"
+        if reminder.get('archived'):
+            status = ARCHIVED_STATUS
+        else:
+            status = "✓ DONE" if reminder['is_completed'] else "⏳ PENDING"
         priority_icon = {"Low": "●", "Normal": "●●", "High": "●●●", "Urgent": "●●●●"}
         recurring = " (↻)" if reminder.get('is_recurring') else ""
+        shown_time = reminder['time']
+        if reminder.get('timezone') and reminder['timezone'] != DEFAULT_TIMEZONE:
+            # Show when it fires here, plus the wall time it was set for in its own zone
+            local = self.reminder_manager.display_time(reminder)
+            shown_time = f"{local:%H:%M} [{reminder['time']} {reminder['timezone']}]"
         
-        return f"{reminder['time']} | {reminder['title'][:35]} | {status} | {priority_icon.get(reminder['priority'], '')} {reminder['category']}{recurring} (ID:{reminder['id']})"
+        return f"{shown_time} | {reminder['title'][:35]} | {status} | {priority_icon.get(reminder['priority'], '')} {reminder['category']}{recurring} (ID:{reminder['id']})"
     
     def on_reminder_select(self, event):
-        """Handle reminder selection"""
+        """Handle reminder selection (Ctrl/Shift-click selects several)"""
         try:
             widget = event.widget
-            index = widget.curselection()[0]
-            selected_text = widget.get(index)
-            self.extract_id_from_text(selected_text)
+            ids = []
+            archived = False
+            for index in widget.curselection():
+                text = widget.get(index)
+                reminder_id = self.extract_id_from_text(text)
+                if reminder_id is not None:
+                    ids.append(reminder_id)
+                    archived = archived or ARCHIVED_STATUS in text
+            self.selected_reminder_ids = ids
+            self.selected_reminder_id = ids[0] if ids else None
+            self.set_selection_archived(archived)
         except:
             pass
     
+    def set_selection_archived(self, archived):
+        """Disable edit, done, reschedule and delete while archived reminders are selected"""
+        self.selection_archived = archived
+        for button in self.row_action_buttons:
+            button.state(["disabled"] if archived else ["!disabled"])
+    
+    def refuse_archived(self):
+        """Explain, and return True, when the selection includes archived reminders"""
+        if self.selection_archived:
+            messagebox.showinfo("Archived", "Archived reminders are read-only history.\n"
+                                            "Run partition.py --merge to make them editable again.")
+        return self.selection_archived
+    
     def extract_id_from_text(self, text):
         """Extract reminder ID from display text"""
         try:
             if "ID:" in text:
                 id_part = text.split("ID:")[1].strip(")")
-                self.selected_reminder_id = int(id_part)
+                return int(id_part)
         except:
             pass
+        return None
+    
+    def clear_selection(self):
+        """Forget the current reminder selection"""
+        self.selected_reminder_id = None
+        self.selected_reminder_ids = []
+        self.set_selection_archived(False)
+    
+    def refresh_views(self):
+        """Refresh every reminder list, the calendar and the statistics once after a change"""
+        self.refresh_date_reminders()
+        self.refresh_today_reminders()
+        self.refresh_all_reminders()
+        self.update_statistics()
+        self.update_calendar()
     
     def add_reminder(self):
         """Add new reminder"""
@@ -508,58 +717,83 @@ class CalendarReminderApp:
         self.root.wait_window(dialog.dialog)
         
         if dialog.result:
-            self.refresh_date_reminders()
-            self.refresh_today_reminders()
-            self.refresh_all_reminders()
-            self.update_statistics()
+            self.refresh_views()
     
     def edit_reminder(self):
         """Edit selected reminder"""
         if not self.selected_reminder_id:
             messagebox.showwarning("Warning", "Please select a reminder to edit")
             return
+        if self.refuse_archived():
+            return
         
-        all_reminders = self.reminder_manager.db.get_all_reminders()
-        reminder = next((r for r in all_reminders if r['id'] == self.selected_reminder_id), None)
+        matches = self.reminder_manager.db.get_reminders_by_ids([self.selected_reminder_id])
+        reminder = matches[0] if matches else None
         
         if reminder:
             dialog = ReminderDialog(self.root, self.reminder_manager, reminder)
             self.root.wait_window(dialog.dialog)
             
             if dialog.result:
-                self.refresh_date_reminders()
-                self.refresh_today_reminders()
-                self.refresh_all_reminders()
-                self.update_statistics()
+                self.refresh_views()
             
-            self.selected_reminder_id = None
+            self.clear_selection()
     
     def delete_reminder(self):
-        """Delete selected reminder"""
-        if not self.selected_reminder_id:
+        """Delete selected reminders"""
+        if not self.selected_reminder_ids:
             messagebox.showwarning("Warning", "Please select a reminder to delete")
             return
+        if self.refuse_archived():
+            return
         
-        if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this reminder?"):
-            self.reminder_manager.delete_reminder(self.selected_reminder_id)
-            self.refresh_date_reminders()
-            self.refresh_today_reminders()
-            self.refresh_all_reminders()
-            self.update_statistics()
-            self.selected_reminder_id = None
+        count = len(self.selected_reminder_ids)
+        prompt = ("Are you sure you want to delete this reminder?" if count == 1
+                  else f"Are you sure you want to delete these {count} reminders?")
+        if messagebox.askyesno("Confirm Delete", prompt):
+            self.reminder_manager.delete_many(self.selected_reminder_ids)
+            for reminder_id in self.selected_reminder_ids:
+                self.scheduler.acknowledge(reminder_id)
+            self.refresh_views()
+            self.clear_selection()
     
     def mark_done(self):
-        """Mark reminder as done"""
-        if not self.selected_reminder_id:
+        """Mark selected reminders as done"""
+        if not self.selected_reminder_ids:
             messagebox.showwarning("Warning", "Please select a reminder to mark as done")
             return
+        if self.refuse_archived():
+            return
         
-        self.reminder_manager.complete_reminder(self.selected_reminder_id)
-        self.refresh_date_reminders()
-        self.refresh_today_reminders()
-        self.refresh_all_reminders()
-        self.update_statistics()
-        self.selected_reminder_id = None
+        self.reminder_manager.complete_many(self.selected_reminder_ids)
+        for reminder_id in self.selected_reminder_ids:
+            self.scheduler.acknowledge(reminder_id)
+        self.refresh_views()
+        self.clear_selection()
+    
+    def reschedule_reminders(self):
+        """Shift selected reminders by a relative amount of time"""
+        if not self.selected_reminder_ids:
+            messagebox.showwarning("Warning", "Please select reminders to reschedule")
+            return
+        if self.refuse_archived():
+            return
+        
+        text = simpledialog.askstring("Reschedule",
+                                      "Shift selected reminders by (e.g. +1d, -2h, 1w 30m):",
+                                      parent=self.root)
+        if not text:
+            return
+        
+        try:
+            delta = self.reminder_manager.parse_delta(text)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
+        self.reminder_manager.reschedule_many(self.selected_reminder_ids, delta)
+        self.refresh_views()
+        self.clear_selection()
     
     def show_today_reminders(self):
         """Show today's reminders"""
@@ -594,53 +828,72 @@ class CalendarReminderApp:
         else:
             self.filter_results_listbox.insert(tk.END, "No upcoming reminders")
     
-    def filter_by_category(self):
-        """Filter by category"""
-        category = self.category_filter.get()
-        if not category:
-            messagebox.showwarning("Warning", "Please select a category")
-            return
+    def build_filter_query(self):
+        """Build a combined query from the advanced filter inputs"""
+        query = self.reminder_manager.db.query()
         
-        self.filter_results_listbox.delete(0, tk.END)
-        reminders = self.reminder_manager.db.get_reminders_by_category(category)
+        category = self.category_filter.get()
+        if category and category != "Any":
+            query.category(category)
         
-        if reminders:
-            for reminder in reminders:
-                self.filter_results_listbox.insert(tk.END, self.format_reminder_display(reminder))
-        else:
-            self.filter_results_listbox.insert(tk.END, f"No reminders in '{category}'")
-    
-    def filter_by_priority(self):
-        """Filter by priority"""
         priority = self.priority_filter.get()
-        if not priority:
-            messagebox.showwarning("Warning", "Please select a priority")
+        if priority and priority != "Any":
+            query.priority(priority)
+        
+        status = self.status_filter.get()
+        if status == "Pending":
+            query.completed(False)
+        elif status == "Done":
+            query.completed(True)
+        
+        start_date = self.start_date_filter.get().strip()
+        end_date = self.end_date_filter.get().strip()
+        for value in (start_date, end_date):
+            if value:
+                try:
+                    datetime.strptime(value, "%Y-%m-%d")
+                except ValueError:
+                    raise ValueError("Invalid date format\nUse YYYY-MM-DD") from None
+        query.date_range(start_date or None, end_date or None)
+        
+        query.text(self.search_entry.get().strip())
+        query.tags(self.tag_filter.get().strip())
+        return query
+    
+    def apply_filters(self):
+        """Apply all advanced filters as a single query"""
+        try:
+            query = self.build_filter_query()
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
             return
         
         self.filter_results_listbox.delete(0, tk.END)
-        reminders = self.reminder_manager.db.get_reminders_by_priority(priority)
+        total = query.count()
+        reminders = query.limit(FILTER_RESULT_LIMIT).fetch() if total else []
         
         if reminders:
             for reminder in reminders:
                 self.filter_results_listbox.insert(tk.END, self.format_reminder_display(reminder))
         else:
-            self.filter_results_listbox.insert(tk.END, f"No reminders with priority '{priority}'")
-    
-    def search_reminders(self):
-        """Search reminders"""
-        query = self.search_entry.get().strip()
-        if not query:
-            messagebox.showwarning("Warning", "Please enter a search term")
-            return
+            self.filter_results_listbox.insert(tk.END, "No reminders match these filters")
         
-        self.filter_results_listbox.delete(0, tk.END)
-        reminders = self.reminder_manager.db.search_reminders(query)
-        
-        if reminders:
-            for reminder in reminders:
-                self.filter_results_listbox.insert(tk.END, self.format_reminder_display(reminder))
+        if total > len(reminders):
+            self.filter_count_label.config(text=f"Showing {len(reminders)} of {total} matches")
         else:
-            self.filter_results_listbox.insert(tk.END, f"No reminders found matching '{query}'")
+            self.filter_count_label.config(text=f"{total} matches")
+    
+    def clear_filters(self):
+        """Reset advanced filter inputs"""
+        self.category_filter.set("Any")
+        self.priority_filter.set("Any")
+        self.status_filter.set("Any")
+        self.start_date_filter.delete(0, tk.END)
+        self.end_date_filter.delete(0, tk.END)
+        self.search_entry.delete(0, tk.END)
+        self.tag_filter.set("")
+        self.filter_results_listbox.delete(0, tk.END)
+        self.filter_count_label.config(text="")
     
     def update_statistics(self):
         """Update statistics display"""
@@ -648,6 +901,45 @@ class CalendarReminderApp:
         text = f"Total: {stats['total']}  |  Pending: {stats['pending']}  |  Done: {stats['completed']}  |  Overdue: {stats['overdue']}"
         self.stats_label.config(text=text)
     
+    def sync_now(self):
+        """Exchange changes with the configured sync peer on a worker thread, so a slow peer never blocks the UI"""
+        if self.sync_thread is not None and self.sync_thread.is_alive():
+            return
+        self.stats_label.config(text=f"Syncing with {SYNC_PEER}…")
+        self.sync_thread = threading.Thread(target=self._sync_worker, name="sync", daemon=True)
+        self.sync_thread.start()
+        self.root.after(SYNC_POLL_INTERVAL, self._poll_sync)
+    
+    def _sync_worker(self):
+        # Runs off the Tk thread and never touches Tk; the outcome goes through sync_results
+        result = error = None
+        try:
+            result = self.sync_engine.sync_with(SYNC_PEER)
+        except Exception as e:
+            error = e
+        finally:
+            self.reminder_manager.db.close()  # this thread's connection
+        self.sync_results.put((result, error))
+    
+    def _poll_sync(self):
+        """Pick up the outcome of sync_now on the Tk thread, checking again until the worker has posted it"""
+        try:
+            result, error = self.sync_results.get_nowait()
+        except queue.Empty:
+            self.root.after(SYNC_POLL_INTERVAL, self._poll_sync)
+            return
+        self._sync_finished(result, error)
+    
+    def _sync_finished(self, result, error):
+        """Show the outcome of sync_now on the Tk thread"""
+        if error is not None:
+            self.update_statistics()
+            messagebox.showerror("Sync Failed", f"Could not sync with {SYNC_PEER}:\n{error}")
+            return
+        self.refresh_views()
+        self.stats_label.config(text=f"Synced: sent {result['sent']}, received {result['applied']}")
+        self.root.after(5000, self.update_statistics)
+    
     def check_reminders(self):
         """Check for reminders that need to be notified"""
         try:
@@ -655,26 +947,190 @@ class CalendarReminderApp:
         except:
             pass
         
-        now = datetime.now()
-        today_reminders = self.reminder_manager.get_today_reminders()
-        
-        for reminder in today_reminders:
-            if not reminder['is_completed']:
-                try:
-                    reminder_time = datetime.strptime(reminder['time'], "%H:%M")
-                    current_time = now.replace(second=0, microsecond=0)
-                    reminder_datetime = reminder_time.replace(
-                        year=now.year, month=now.month, day=now.day
-                    )
-                    
-                    if reminder_datetime == current_time:
-                        self.notification_manager.alert_reminder(reminder)
-                        messagebox.showinfo("Reminder Alert!", f"{reminder['title']}\nTime: {reminder['time']}\nCategory: {reminder['category']}")
-                except Exception as e:
-                    print(f"Error checking reminder: {e}")
+        # The first tick also catches up on reminders missed while the app was closed
+        try:
+            self.scheduler.tick()
+        except Exception as e:
+            print(f"Error checking reminders: {e}")
         
         # Schedule next check
         self.root.after(REMINDER_CHECK_INTERVAL, self.check_reminders)
+    
+    def show_reminder_popup(self, reminder):
+        """Show a non-modal alert with snooze actions; re-alerts reuse the open popup"""
+        popup = self.alert_popups.get(reminder['id'])
+        if popup is not None and popup.winfo_exists():
+            popup.destroy()
+        
+        popup = tk.Toplevel(self.root)
+        popup.title("Reminder Alert!")
+        popup.configure(bg=COLORS["background"])
+        popup.resizable(False, False)
+        popup.attributes("-topmost", True)
+        self.alert_popups[reminder['id']] = popup
+        
+        color = PRIORITY_COLORS.get(reminder['priority'], COLORS["primary"])
+        tk.Frame(popup, bg=color, height=4).pack(fill=tk.X)
+        
+        realert = f"  (reminder #{reminder['realert'] + 1})" if reminder.get('realert') else ""
+        tk.Label(popup, text=reminder['title'] + realert, bg=COLORS["background"],
+                fg=COLORS["text_primary"], font=FONT_SUBHEADING).pack(anchor=tk.W, padx=20, pady=(15, 5))
+        due = reminder.get('occurrence') or f"{reminder['date']} {reminder['time']}"
+        tk.Label(popup, text=f"Due: {due}  |  {reminder['category']}  |  {reminder['priority']}",
+                bg=COLORS["background"], fg=COLORS["text_secondary"],
+                font=FONT_LABEL).pack(anchor=tk.W, padx=20, pady=(0, 15))
+        
+        actions = tk.Frame(popup, bg=COLORS["background"])
+        actions.pack(fill=tk.X, padx=20, pady=(0, 15))
+        
+        reminder_id = reminder['id']
+        occurrence_date = reminder.get('occurrence_date')
+        ttk.Button(actions, text="Dismiss",
+                  command=lambda: self.dismiss_alert(reminder_id)).pack(side=tk.LEFT, padx=2)
+        for minutes in SNOOZE_OPTIONS:
+            ttk.Button(actions, text=f"Snooze {minutes}m",
+                      command=lambda m=minutes: self.snooze_alert(reminder_id, m)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(actions, text="✓ Done",
+                  command=lambda: self.complete_alert(reminder_id, occurrence_date)).pack(side=tk.LEFT, padx=2)
+        
+        popup.protocol("WM_DELETE_WINDOW", lambda: self.dismiss_alert(reminder_id))
+    
+    def update_lag_indicator(self):
+        """Show the event-loop lag in the header, coloured by how sluggish the UI is"""
+        summary = self.watchdog.summary()
+        lag = summary["p95_ms"]
+        if lag >= STALL_THRESHOLD:
+            color = COLORS["danger"]
+        elif lag >= LAG_WARN_MS:
+            color = COLORS["warning"]
+        else:
+            color = COLORS["success"]
+        text = f"● {lag:.0f} ms"
+        if summary["stalls"]:
+            text += f"  ({summary['stalls']} stalls)"
+        self.lag_label.config(text=text, fg=color)
+        self.root.after(LAG_REFRESH_INTERVAL, self.update_lag_indicator)
+    
+    def show_stall_log(self):
+        """Show recorded UI stalls with the main-thread stack captured during each"""
+        if self.stall_window is not None and self.stall_window.winfo_exists():
+            self.stall_window.destroy()
+        
+        window = tk.Toplevel(self.root)
+        window.title("UI Stalls")
+        window.configure(bg=COLORS["background"])
+        self.stall_window = window
+        
+        summary = self.watchdog.summary()
+        tk.Label(window, text=f"Lag p95 {summary['p95_ms']:.0f} ms, max {summary['max_ms']:.0f} ms, "
+                              f"{summary['stalls']} stalls over {STALL_THRESHOLD} ms",
+                bg=COLORS["background"], fg=COLORS["text_primary"],
+                font=FONT_SUBHEADING).pack(anchor=tk.W, padx=20, pady=(15, 5))
+        
+        text = tk.Text(window, width=110, height=30, bg=COLORS["surface"], fg=COLORS["text_primary"],
+                      font=("Courier", 9), relief=tk.FLAT, wrap=tk.NONE)
+        text.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 15))
+        stalls = self.watchdog.recent_stalls()
+        for stall in stalls:
+            duration = "ongoing" if stall["duration_ms"] is None else f"{stall['duration_ms']:.0f} ms"
+            text.insert(tk.END, f"{stall['started_at']}  {duration}\n{stall['stack']}\n")
+        if not stalls:
+            text.insert(tk.END, "No stalls recorded.")
+        text.config(state=tk.DISABLED)
+    
+    def show_digest_popup(self, reminders):
+        """Show one non-modal popup for a burst of reminders; later bursts are merged into it"""
+        for reminder in reminders:
+            self.close_alert_popup(reminder['id'])
+            self.digest_reminders[reminder['id']] = reminder
+        if self.digest_popup is not None and self.digest_popup.winfo_exists():
+            self.digest_popup.destroy()
+        
+        popup = tk.Toplevel(self.root)
+        popup.title("Reminders Due")
+        popup.configure(bg=COLORS["background"])
+        popup.attributes("-topmost", True)
+        self.digest_popup = popup
+        
+        tk.Frame(popup, bg=COLORS["primary"], height=4).pack(fill=tk.X)
+        tk.Label(popup, text=f"{len(self.digest_reminders)} reminders due", bg=COLORS["background"],
+                fg=COLORS["text_primary"], font=FONT_SUBHEADING).pack(anchor=tk.W, padx=20, pady=(15, 5))
+        
+        listbox = tk.Listbox(popup, height=min(len(self.digest_reminders), 12), width=60,
+                            bg=COLORS["surface"], fg=COLORS["text_primary"], font=FONT_SMALL,
+                            relief=tk.FLAT, bd=0, highlightthickness=0)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 15))
+        for reminder in self.digest_reminders.values():
+            due = reminder.get('occurrence') or f"{reminder['date']} {reminder['time']}"
+            listbox.insert(tk.END, f"{due}  [{reminder['priority']}]  {reminder['title']}")
+        
+        actions = tk.Frame(popup, bg=COLORS["background"])
+        actions.pack(fill=tk.X, padx=20, pady=(0, 15))
+        ttk.Button(actions, text="Dismiss All", command=self.dismiss_digest).pack(side=tk.LEFT, padx=2)
+        for minutes in SNOOZE_OPTIONS:
+            ttk.Button(actions, text=f"Snooze All {minutes}m",
+                      command=lambda m=minutes: self.snooze_digest(m)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(actions, text="✓ All Done", command=self.complete_digest).pack(side=tk.LEFT, padx=2)
+        
+        popup.protocol("WM_DELETE_WINDOW", self.dismiss_digest)
+    
+    def close_digest_popup(self):
+        """Close the digest popup and forget its reminders"""
+        if self.digest_popup is not None and self.digest_popup.winfo_exists():
+            self.digest_popup.destroy()
+        self.digest_popup = None
+        self.digest_reminders = {}
+    
+    def dismiss_digest(self):
+        """Acknowledge every reminder in the digest"""
+        for reminder_id in self.digest_reminders:
+            self.scheduler.acknowledge(reminder_id)
+        self.close_digest_popup()
+    
+    def snooze_digest(self, minutes):
+        """Snooze every reminder in the digest"""
+        for reminder_id in self.digest_reminders:
+            self.scheduler.snooze(reminder_id, minutes)
+        self.close_digest_popup()
+    
+    def complete_digest(self):
+        """Mark every reminder in the digest done"""
+        reminder_ids = list(self.digest_reminders)
+        # Series occurrences are completed one by one; the series themselves stay pending
+        self.reminder_manager.complete_many([reminder_id for reminder_id, reminder in self.digest_reminders.items()
+                                             if not reminder.get('occurrence_date')])
+        for reminder in self.digest_reminders.values():
+            if reminder.get('occurrence_date'):
+                self.reminder_manager.complete_occurrence(reminder['id'], reminder['occurrence_date'])
+        for reminder_id in reminder_ids:
+            self.scheduler.acknowledge(reminder_id)
+        self.close_digest_popup()
+        self.refresh_views()
+    
+    def close_alert_popup(self, reminder_id):
+        """Close the alert popup for a reminder if it is open"""
+        popup = self.alert_popups.pop(reminder_id, None)
+        if popup is not None and popup.winfo_exists():
+            popup.destroy()
+    
+    def dismiss_alert(self, reminder_id):
+        """Acknowledge an alert so it is not re-alerted"""
+        self.scheduler.acknowledge(reminder_id)
+        self.close_alert_popup(reminder_id)
+    
+    def snooze_alert(self, reminder_id, minutes):
+        """Snooze an alert for the given number of minutes"""
+        self.scheduler.snooze(reminder_id, minutes)
+        self.close_alert_popup(reminder_id)
+    
+    def complete_alert(self, reminder_id, occurrence_date=None):
+        """Mark the alerted reminder (or just this occurrence of a series) done straight from the popup"""
+        if occurrence_date:
+            self.reminder_manager.complete_occurrence(reminder_id, occurrence_date)
+        else:
+            self.reminder_manager.complete_reminder(reminder_id)
+        self.dismiss_alert(reminder_id)
+        self.refresh_views()
 
 
 class ReminderDialog:
@@ -685,7 +1141,7 @@ class ReminderDialog:
         
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Add Reminder" if not reminder else "Edit Reminder")
-        self.dialog.geometry("650x600")
+        self.dialog.geometry("650x650")
         self.dialog.resizable(False, False)
         self.dialog.configure(bg=COLORS["background"])
         
@@ -728,44 +1184,66 @@ class ReminderDialog:
         
         # Time
         ttk.Label(main_frame, text="Time (HH:MM):", font=FONT_SUBHEADING).grid(row=3, column=0, sticky=tk.W, pady=(0, 5))
-        self.time_entry = ttk.Entry(main_frame, width=20, font=FONT_LABEL)
-        self.time_entry.grid(row=3, column=1, sticky=tk.W, pady=(0, 15))
+        time_row = tk.Frame(main_frame, bg=COLORS["background"])
+        time_row.grid(row=3, column=1, sticky=tk.W, pady=(0, 15))
+        self.time_entry = ttk.Entry(time_row, width=10, font=FONT_LABEL)
+        self.time_entry.pack(side=tk.LEFT)
         
         if reminder:
             self.time_entry.insert(0, reminder['time'])
         else:
             self.time_entry.insert(0, datetime.now().strftime("%H:%M"))
         
+        # Duration (optional, used for conflict detection)
+        ttk.Label(time_row, text="Duration (min):", font=FONT_LABEL).pack(side=tk.LEFT, padx=(15, 5))
+        self.duration_entry = ttk.Entry(time_row, width=8, font=FONT_LABEL)
+        self.duration_entry.pack(side=tk.LEFT)
+        self.duration_entry.insert(0, str(reminder.get('duration_minutes') or 0) if reminder else "0")
+        
+        # Timezone (blank = this machine's zone)
+        ttk.Label(time_row, text="Zone:", font=FONT_LABEL).pack(side=tk.LEFT, padx=(15, 5))
+        self.timezone_var = tk.StringVar(value=(reminder.get('timezone') or "") if reminder else "")
+        ttk.Combobox(time_row, textvariable=self.timezone_var, values=[""] + COMMON_TIMEZONES,
+                     width=18).pack(side=tk.LEFT)
+        
         # Category
         ttk.Label(main_frame, text="Category:", font=FONT_SUBHEADING).grid(row=4, column=0, sticky=tk.W, pady=(0, 5))
         self.category_var = tk.StringVar(value=reminder['category'] if reminder else "General")
+        # Free-form: any name typed here becomes a tag and joins the category choices
         category_combo = ttk.Combobox(main_frame, textvariable=self.category_var,
-                                     values=self.reminder_manager.categories, state='readonly', width=47)
+                                     values=self.reminder_manager.categories, width=47)
         category_combo.grid(row=4, column=1, sticky=tk.EW, pady=(0, 15))
         
+        # Tags (comma-separated)
+        ttk.Label(main_frame, text="Tags:", font=FONT_SUBHEADING).grid(row=5, column=0, sticky=tk.W, pady=(0, 5))
+        self.tags_var = tk.StringVar(value=", ".join(json.loads(reminder['tags'])) if reminder and reminder.get('tags') else "")
+        tags_combo = ttk.Combobox(main_frame, textvariable=self.tags_var, width=47)
+        tags_combo.grid(row=5, column=1, sticky=tk.EW, pady=(0, 15))
+        attach_tag_autocomplete(tags_combo, self.reminder_manager)
+        
         # Priority
-        ttk.Label(main_frame, text="Priority:", font=FONT_SUBHEADING).grid(row=5, column=0, sticky=tk.W, pady=(0, 5))
+        ttk.Label(main_frame, text="Priority:", font=FONT_SUBHEADING).grid(row=6, column=0, sticky=tk.W, pady=(0, 5))
         self.priority_var = tk.StringVar(value=reminder['priority'] if reminder else "Normal")
         priority_combo = ttk.Combobox(main_frame, textvariable=self.priority_var,
                                      values=self.reminder_manager.priorities, state='readonly', width=47)
-        priority_combo.grid(row=5, column=1, sticky=tk.EW, pady=(0, 15))
+        priority_combo.grid(row=6, column=1, sticky=tk.EW, pady=(0, 15))
         
         # Recurring
         self.recurring_var = tk.BooleanVar(value=reminder['is_recurring'] if reminder else False)
         recurring_check = ttk.Checkbutton(main_frame, text="This is a recurring reminder",
                                          variable=self.recurring_var)
-        recurring_check.grid(row=6, column=0, columnspan=2, sticky=tk.W, pady=(0, 15))
+        recurring_check.grid(row=7, column=0, columnspan=2, sticky=tk.W, pady=(0, 15))
         
         # Recurrence type
-        ttk.Label(main_frame, text="Recurrence Type:", font=FONT_SUBHEADING).grid(row=7, column=0, sticky=tk.W, pady=(0, 5))
+        ttk.Label(main_frame, text="Recurrence Type:", font=FONT_SUBHEADING).grid(row=8, column=0, sticky=tk.W, pady=(0, 5))
         self.recurrence_type_var = tk.StringVar(value=reminder['recurrence_type'] if reminder else "Daily")
         recurrence_combo = ttk.Combobox(main_frame, textvariable=self.recurrence_type_var,
                                        values=self.reminder_manager.recurrence_types, state='readonly', width=47)
-        recurrence_combo.grid(row=7, column=1, sticky=tk.EW, pady=(0, 20))
+        recurrence_combo.grid(row=8, column=1, sticky=tk.EW, pady=(0, 20))
         
         # Buttons
         button_frame = tk.Frame(main_frame, bg=COLORS["background"])
-        button_frame.grid(row=8, column=0, columnspan=2, sticky=tk.E, pady=(15, 0))
+        button_frame.grid(row=9, column=0, columnspan=2, sticky=tk.E, pady=(15, 0))
         
         ttk.Button(button_frame, text="Cancel", command=self.dialog.destroy).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Save", command=self.save_reminder).pack(side=tk.LEFT, padx=5)
@@ -776,10 +1254,13 @@ class ReminderDialog:
         description = self.description_text.get(1.0, tk.END).strip()
         date = self.date_entry.get().strip()
         time = self.time_entry.get().strip()
-        category = self.category_var.get()
+        category = " ".join(self.category_var.get().split()) or "General"
+        tags = parse_tags(self.tags_var.get())
         priority = self.priority_var.get()
         is_recurring = 1 if self.recurring_var.get() else 0
         recurrence_type = self.recurrence_type_var.get() if is_recurring else None
+        duration = self.duration_entry.get().strip() or "0"
+        timezone = self.timezone_var.get().strip() or None
         
         # Validation
         try:
@@ -789,27 +1270,80 @@ class ReminderDialog:
             messagebox.showerror("Error", "Invalid date or time format\nUse YYYY-MM-DD for date and HH:MM for time")
             return
         
+        if not duration.isdigit():
+            messagebox.showerror("Error", "Duration must be a whole number of minutes")
+            return
+        duration_minutes = int(duration)
+        
+        try:
+            load_zone(timezone)
+        except ValueError:
+            messagebox.showerror("Error", f"Unknown timezone: {timezone}\nUse a name such as Europe/London")
+            return
+        
         if not title:
             messagebox.showerror("Error", "Title is required")
             return
         
+        conflicts = self.reminder_manager.find_conflicts(date, time, duration_minutes, exclude_id=self.reminder_id,
+                                                         timezone=timezone)
+        if conflicts:
+            listing = "\n".join(f"• {r['time']} {r['title'][:40]}" for r in conflicts[:5])
+            more = f"\n…and {len(conflicts) - 5} more" if len(conflicts) > 5 else ""
+            if not messagebox.askyesno("Time Conflict",
+                                       f"This overlaps {len(conflicts)} pending reminder(s):\n{listing}{more}\n\nSave anyway?",
+                                       parent=self.dialog):
+                return
+        
         if self.reminder_id:
             self.reminder_manager.db.update_reminder(
-                self.reminder_id, title, description, date, time, category, priority, is_recurring, recurrence_type
+                self.reminder_id, title, description, date, time, category, priority, is_recurring, recurrence_type,
+                duration_minutes, timezone, tags
             )
         else:
             self.reminder_manager.create_reminder(
-                title, description, date, time, category, priority, is_recurring, recurrence_type
+                title, description, date, time, category, priority, is_recurring, recurrence_type,
+                duration_minutes, timezone, tags=tags
             )
         
         self.result = True
         self.dialog.destroy()
 
 
-def main():
+def attach_tag_autocomplete(combo, reminder_manager, expression=False):
+    """Offer completions of the tag being typed (after the last comma, or last word of an expression)"""
+    def complete(event):
+        if event.keysym in ("Up", "Down", "Left", "Right", "Return", "Escape", "Tab"):
+            return
+        if expression:
+            head, _, last = combo.get().rpartition(" ")
+            head = head + " " if head else ""
+        else:
+            head, _, last = combo.get().rpartition(",")
+            head = head + ", " if head else ""
+        combo.configure(values=[head + name for name in reminder_manager.suggest_tags(last)])
+    combo.bind("<KeyRelease>", complete)
+
+
+def run():
     root = tk.Tk()
     app = CalendarReminderApp(root)
     root.mainloop()
+    if app.watchdog:
+        app.watchdog.stop()
+    app.notification_manager.sound_player.close()
+    app.backup_manager.stop()
+    app.month_cache.stop()
+    if PROFILING_ENABLED:
+        print(f"Metrics written to {metrics.dump_json()}")
+
+
+def main():
+    if CPROFILE_SESSION:
+        with profile_session("gui"):
+            run()
+    else:
+        run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+"""
+Opt-in timing instrumentation and cProfile session support
+"""
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from config import PROFILE_OUTPUT_DIR, PROFILE_WINDOW, PROFILING_ENABLED
+
+
+class Metrics:
+    """Thread-safe registry of call counts and rolling timing windows"""
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.totals = {}
+
+    def record(self, name, seconds):
+        """Record one timed call"""
+        with self.lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+                self.totals[name] = [0, 0.0]
+            self.samples[name].append(seconds)
+            totals = self.totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def reset(self):
+        """Forget all recorded timings"""
+        with self.lock:
+            self.samples.clear()
+            self.totals.clear()
+
+    def summary(self):
+        """Per-metric lifetime count/total plus mean, p95 and max over the rolling window (ms)"""
+        with self.lock:
+            snapshot = {name: (list(window), list(self.totals[name])) for name, window in self.samples.items()}
+
+        summary = {}
+        for name, (window, (count, total)) in snapshot.items():
+            ordered = sorted(window)
+            summary[name] = {
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+                "p95_ms": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)] * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return summary
+
+    def top(self, limit=10, key="total_ms"):
+        """Return the (name, stats) pairs that cost the most"""
+        return sorted(self.summary().items(), key=lambda item: item[1][key], reverse=True)[:limit]
+
+    def dump_json(self, path=None):
+        """Write the summary to a JSON file and return its path"""
+        if path is None:
+            PROFILE_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+            path = PROFILE_OUTPUT_DIR / f"metrics-{datetime.now():%Y%m%d-%H%M%S}.json"
+        payload = {"generated_at": datetime.now().isoformat(timespec="seconds"), "metrics": self.summary()}
+        Path(path).write_text(json.dumps(payload, indent=2))
+        return Path(path)
+
+
+metrics = Metrics()
+
+
+def timed(name, enabled=None):
+    """Decorator recording each call under name; returns the function untouched when profiling is off"""
+    enabled = PROFILING_ENABLED if enabled is None else enabled
+
+    def decorator(func):
+        if not enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def instrumented(prefix, methods=None, enabled=None):
+    """Class decorator timing public methods (or only those named/prefixed in methods) as prefix.method"""
+    enabled = PROFILING_ENABLED if enabled is None else enabled
+
+    def decorator(cls):
+        if not enabled:
+            return cls
+        for attr, value in list(vars(cls).items()):
+            if not callable(value) or isinstance(value, (staticmethod, classmethod)) or attr.startswith("__"):
+                continue
+            if methods is None:
+                if attr.startswith("_"):
+                    continue
+            elif not any(attr == m or (m.endswith("*") and attr.startswith(m[:-1])) for m in methods):
+                continue
+            setattr(cls, attr, timed(f"{prefix}.{attr}", enabled=True)(value))
+        return cls
+    return decorator
+
+
+@contextmanager
+def profile_session(name="session", output_dir=None):
+    """Run the enclosed code under cProfile and write a .prof file plus a text report"""
+    # Imported here: pstats pulls in inspect and dataclasses, a noticeable share of CLI start-up
+    import cProfile
+    import io
+    import pstats
+
+    output_dir = Path(output_dir or PROFILE_OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = f"{name}-{datetime.now():%Y%m%d-%H%M%S}"
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(output_dir / f"{stamp}.prof"))
+        report = io.StringIO()
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats("cumulative").print_stats(40)
+        (output_dir / f"{stamp}.txt").write_text(report.getvalue())
+        print(f"Profile written to {output_dir / stamp}.prof")
@@ -4,6 +4,7 @@ Database migration script - Run this to update your existing database with new c
 
 import sqlite3
 from config import DATABASE_PATH
+from database import COLUMN_MIGRATIONS
 
 def migrate_database():
     """Add missing columns to existing reminders table"""
@@ -16,13 +17,10 @@ def migrate_database():
             columns = [column[1] for column in cursor.fetchall()]
             
             # Add missing columns
-            if 'is_recurring' not in columns:
-                cursor.execute('ALTER TABLE reminders ADD COLUMN is_recurring INTEGER DEFAULT 0')
-                print("✓ Added 'is_recurring' column")
-            
-            if 'recurrence_type' not in columns:
-                cursor.execute('ALTER TABLE reminders ADD COLUMN recurrence_type TEXT')
-                print("✓ Added 'recurrence_type' column")
+            for name, definition in COLUMN_MIGRATIONS:
+                if name not in columns:
+                    cursor.execute(f'ALTER TABLE reminders ADD COLUMN {name} {definition}')
+                    print(f"✓ Added '{name}' column")
             
             conn.commit()
             print("\n✓ Database migration completed successfully!")
@@ -0,0 +1,121 @@
+"""
+Month view cache with background prefetch of neighbouring months for calendar navigation
+"""
+
+import threading
+from calendar import monthcalendar, monthrange
+from collections import OrderedDict
+from config import MONTH_CACHE_SIZE, MONTH_PREFETCH_RADIUS
+from instrumentation import instrumented
+
+
+def shift_month(year, month, offset):
+    """(year, month) offset whole months away"""
+    index = year * 12 + month - 1 + offset
+    return index // 12, index % 12 + 1
+
+
+@instrumented("month_cache", methods=("get", "build"))
+class MonthViewCache:
+    """LRU cache of month layouts and per-day reminder summaries, invalidated by the db change sequence"""
+
+    def __init__(self, db, capacity=MONTH_CACHE_SIZE, radius=MONTH_PREFETCH_RADIUS):
+        self.db = db
+        self.capacity = capacity
+        self.radius = radius
+        self.views = OrderedDict()
+        self.lock = threading.Lock()
+        self.wanted = threading.Condition(self.lock)
+        self.pending = []
+        self.thread = None
+        self.running = False
+        self.hits = 0
+        self.misses = 0
+
+    def build(self, year, month):
+        """Compute one month: the week grid plus {day: summary} from a single grouped query"""
+        generation = self.db.get_change_seq()
+        start = f"{year:04d}-{month:02d}-01"
+        end = f"{year:04d}-{month:02d}-{monthrange(year, month)[1]:02d}"
+        days = {int(summary["date"][8:10]): summary for summary in self.db.get_day_summaries(start, end)}
+        return {"year": year, "month": month, "weeks": monthcalendar(year, month), "days": days,
+                "generation": generation}
+
+    def _store(self, view):
+        key = (view["year"], view["month"])
+        with self.lock:
+            self.views[key] = view
+            self.views.move_to_end(key)
+            while len(self.views) > self.capacity:
+                self.views.popitem(last=False)
+
+    def _fresh(self, key, generation):
+        with self.lock:
+            view = self.views.get(key)
+            if view is not None and view["generation"] == generation:
+                self.views.move_to_end(key)
+                return view
+        return None
+
+    def get(self, year, month, prefetch=True):
+        """Return the view for a month, building it on a miss, and queue its neighbours"""
+        key = (year, month)
+        view = self._fresh(key, self.db.get_change_seq())
+        if view is None:
+            self.misses += 1
+            view = self.build(year, month)
+            self._store(view)
+        else:
+            self.hits += 1
+        if prefetch:
+            self.prefetch(year, month)
+        return view
+
+    def prefetch(self, year, month):
+        """Queue the months within radius of (year, month) for background building"""
+        with self.lock:
+            # Nearest neighbours first; anything queued for an older position is dropped
+            self.pending = [shift_month(year, month, offset)
+                            for distance in range(1, self.radius + 1) for offset in (distance, -distance)]
+            self.wanted.notify()
+        if self.thread is None:
+            self.start()
+
+    def invalidate(self):
+        """Drop every cached month"""
+        with self.lock:
+            self.views.clear()
+
+    def start(self):
+        """Start the background prefetch thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="month-prefetch", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the prefetch thread"""
+        with self.lock:
+            self.running = False
+            self.wanted.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        try:
+            while True:
+                with self.lock:
+                    while self.running and not self.pending:
+                        self.wanted.wait()
+                    if not self.running:
+                        return
+                    key = self.pending.pop(0)
+                try:
+                    # Skip months that are fresh already; the check costs one indexed MAX() lookup
+                    if self._fresh(key, self.db.get_change_seq()) is None:
+                        self._store(self.build(*key))
+                except Exception as e:
+                    print(f"Error prefetching {key[0]}-{key[1]:02d}: {e}")
+        finally:
+            # The db keeps one connection per thread; release this thread's
+            self.db.close()
@@ -3,12 +3,69 @@ Notification and alert system with sound support
 """
 
 import platform
-import os
+import subprocess
+import time
 from datetime import datetime
+from config import DIGEST_MAX_TITLES, DIGEST_THRESHOLD, NOTIFICATION_RATE_LIMITS, REMINDER_SOUND_ENABLED
+from instrumentation import instrumented
+from sounds import SoundPlayer
 
+PRIORITY_ORDER = ["Urgent", "High", "Normal", "Low"]
+
+
+class TokenBucket:
+    """Allows rate events per minute on average, with bursts of up to capacity"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate / 60
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self, now=None):
+        """Spend one token if one is available"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + max(now - self.updated, 0) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class NotificationAggregator:
+    """Splits reminders due together into individual alerts and a single digest"""
+
+    def __init__(self, threshold=DIGEST_THRESHOLD, limits=NOTIFICATION_RATE_LIMITS):
+        self.threshold = threshold
+        self.buckets = {priority: TokenBucket(rate, burst) for priority, (rate, burst) in limits.items()}
+
+    def split(self, reminders, now=None):
+        """Return (individual, digest); a burst goes entirely to the digest, as do alerts over their rate limit"""
+        if len(reminders) >= self.threshold:
+            return [], list(reminders)
+        individual, digest = [], []
+        for reminder in reminders:
+            bucket = self.buckets.get(reminder['priority'])
+            if bucket is None or bucket.take(now):
+                individual.append(reminder)
+            else:
+                digest.append(reminder)
+        return individual, digest
+
+
+def priority_rank(reminder):
+    """Sort key putting the most urgent reminders first"""
+    priority = reminder['priority']
+    return PRIORITY_ORDER.index(priority) if priority in PRIORITY_ORDER else len(PRIORITY_ORDER)
+
+
+@instrumented("notify", methods=("show_notification", "_notify_*", "play_alert_sound", "alert_*"))
 class NotificationManager:
-    def __init__(self):
+    def __init__(self, sound_player=None, aggregator=None):
         self.system = platform.system()
+        self.sound_player = sound_player or SoundPlayer()
+        self.aggregator = aggregator or NotificationAggregator()
     
     def show_notification(self, title, message):
         """Show system notification"""
@@ -38,30 +95,27 @@ class NotificationManager:
         """macOS notification"""
         try:
             script = f'display notification "{message}" with title "{title}"'
-            os.system(f'osascript -e \'{script}\'')
+            self._spawn(["osascript", "-e", script])
         except Exception as e:
             print(f"NOTIFICATION: {title}\nMESSAGE: {message}")
     
     def _notify_linux(self, title, message):
         """Linux notification"""
         try:
-            import subprocess
-            subprocess.run(["notify-send", title, message], check=True)
+            self._spawn(["notify-send", title, message])
         except Exception:
             print(f"NOTIFICATION: {title}\nMESSAGE: {message}")
     
-    def play_alert_sound(self):
-        """Enhanced sound alerts for Windows with winsound module"""
+    def _spawn(self, command):
+        """Start a notifier without waiting for it, so a slow notification daemon never blocks the Tk thread"""
+        subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    def play_alert_sound(self, priority="Normal"):
+        """Queue the alert sound for a priority on the background sound player"""
+        if not REMINDER_SOUND_ENABLED:
+            return
         try:
-            if self.system == "Windows":
-                import winsound
-                # Play dual beep for alert
-                winsound.Beep(1500, 300)  # High frequency, 300ms
-                winsound.Beep(1000, 300)  # Lower frequency, 300ms
-            elif self.system == "Darwin":
-                os.system('afplay /System/Library/Sounds/Alarm.aiff')
-            elif self.system == "Linux":
-                os.system('paplay /usr/share/sounds/freedesktop/stereo/complete.oga 2>/dev/null || speaker-test -t sine -f 1000 -l 1')
+            self.sound_player.play(priority)
         except Exception as e:
             print(f"Sound playback: {e}")
     
@@ -74,7 +128,7 @@ class NotificationManager:
         self.show_notification(title, message)
         
         # Play sound alert
-        self.play_alert_sound()
+        self.play_alert_sound(reminder['priority'])
         
         # Also print to console for debugging
         print(f"\n{'='*50}")
@@ -86,6 +140,28 @@ class NotificationManager:
         print(f"Description: {reminder.get('description', 'N/A')}")
         print(f"{'='*50}\n")
     
+    def alert_many(self, reminders):
+        """Alert reminders that fell due together; returns (alerted individually, folded into the digest)"""
+        individual, digest = self.aggregator.split(reminders)
+        for reminder in individual:
+            self.alert_reminder(reminder)
+        if digest:
+            self.alert_digest(digest)
+        return individual, digest
+    
+    def alert_digest(self, reminders):
+        """One notification and one sound, at the highest priority, for many reminders"""
+        reminders = sorted(reminders, key=priority_rank)
+        title = f"{len(reminders)} reminders due"
+        lines = [f"{r['time']}  {r['title']}" for r in reminders[:DIGEST_MAX_TITLES]]
+        if len(reminders) > DIGEST_MAX_TITLES:
+            lines.append(f"and {len(reminders) - DIGEST_MAX_TITLES} more")
+        message = "\n".join(lines)
+        
+        self.show_notification(title, message)
+        self.play_alert_sound(reminders[0]['priority'])
+        print(f"\n{'='*50}\nREMINDER DIGEST: {title}\n{message}\n{'='*50}\n")
+    
     def format_time(self, time_str):
         """Format time string"""
         try:
@@ -0,0 +1,215 @@
+"""
+Move completed reminders of past years into per-year database files, attached read-only by the app
+
+    python partition.py                  (archive everything completed before last year)
+    python partition.py --keep-years 3   (keep three past years in the main file)
+    python partition.py --list
+    python partition.py --merge          (move every archived reminder back into the main file)
+
+Run it while the app is closed. Pending reminders, and any reminder tree with a pending or recent
+member, stay in the main file. Archived reminders are history: they show up in calendar views,
+searches and reports but are no longer tag-indexed, synced or editable.
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from config import DATABASE_PATH, PARTITION_KEEP_YEARS, PARTITION_MAX_FILES
+from database import ReminderDatabase
+
+# Whole reminder trees whose every member is completed and dated before the cutoff, with their root's year
+MOVABLE_SQL = '''
+    WITH RECURSIVE
+    blocked(id, parent_id) AS (
+        SELECT id, parent_id FROM main.reminders WHERE NOT (is_completed = 1 AND date < :cutoff)
+        UNION
+        SELECT r.id, r.parent_id FROM main.reminders r JOIN blocked b ON r.id = b.parent_id
+    ),
+    tree(id, root_date) AS (
+        SELECT id, date FROM main.reminders
+        WHERE parent_id IS NULL AND id NOT IN (SELECT id FROM blocked)
+        UNION ALL
+        SELECT r.id, t.root_date FROM main.reminders r JOIN tree t ON r.parent_id = t.id
+    )
+    SELECT t.id, r.uuid, CAST(substr(t.root_date, 1, 4) AS INTEGER)
+    FROM tree t JOIN main.reminders r ON r.id = t.id
+'''
+
+
+def _columns(conn, schema):
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA {schema}.table_info(reminders)")]
+
+
+def _partition_file(db_path, year):
+    return db_path.with_name(f"{db_path.stem}-{year}.db")
+
+
+def _attach(conn, db_path, year, columns):
+    """Attach (creating if needed) the file for year and bring its table up to the main table's columns"""
+    alias = f"part_{year}"
+    conn.execute(f"ATTACH DATABASE ? AS {alias}", (str(_partition_file(db_path, year)),))
+    present = {name for name, _ in _columns(conn, alias)}
+    if not present:
+        # No AUTOINCREMENT or defaults: rows arrive with their ids and values from the main table
+        definitions = ", ".join("id INTEGER PRIMARY KEY" if name == "id" else f"{name} {kind}"
+                                for name, kind in columns)
+        conn.execute(f"CREATE TABLE {alias}.reminders ({definitions})")
+    for name, kind in columns:
+        if present and name not in present:
+            conn.execute(f"ALTER TABLE {alias}.reminders ADD COLUMN {name} {kind}")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {alias}.idx_reminders_date ON reminders(date, time)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {alias}.idx_reminders_completed_at ON reminders(completed_at, due_utc)")
+    return alias
+
+
+def _register(conn, db_path, year, alias):
+    row = conn.execute(f"SELECT MIN(date), MAX(date), MAX(completed_at), COUNT(*) FROM {alias}.reminders").fetchone()
+    conn.execute('''
+        INSERT OR REPLACE INTO main.partitions (name, path, first_date, last_date, last_completed, rows)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (alias, _partition_file(db_path, year).name, *row))
+
+
+def _targets(years, existing, max_files):
+    """Map each year to the year of the file it goes to; the oldest file absorbs years beyond max_files"""
+    all_years = sorted(set(years) | set(existing))
+    overflow = all_years[:max(len(all_years) - max(max_files, 1) + 1, 1)]
+    return {year: overflow[0] if year in overflow else year for year in all_years}
+
+
+def archive(db_path, keep_years=PARTITION_KEEP_YEARS, max_files=PARTITION_MAX_FILES):
+    """Move completed reminder trees older than the kept years into year files; returns {year: rows moved}"""
+    cutoff = f"{date.today().year - keep_years:04d}-01-01"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    moved = {}
+    try:
+        columns = _columns(conn, "main")
+        names = ", ".join(name for name, _ in columns)
+        conn.execute("CREATE TEMP TABLE moving (id INTEGER PRIMARY KEY, uuid TEXT, year INTEGER)")
+        conn.execute(f"INSERT INTO moving {MOVABLE_SQL}", {"cutoff": cutoff})
+        years = [row[0] for row in conn.execute("SELECT DISTINCT year FROM moving")]
+        existing = [int(name[len("part_"):]) for name, in conn.execute("SELECT name FROM partitions")]
+        targets = _targets(years, existing, max_files)
+
+        # Existing files past the limit are folded into the oldest one first
+        for year in existing:
+            if targets[year] != year:
+                target = _attach(conn, db_path, targets[year], columns)
+                source = f"part_{year}"
+                conn.execute(f"ATTACH DATABASE ? AS {source}", (str(_partition_file(db_path, year)),))
+                common = ", ".join(name for name, _ in columns if name in {n for n, _ in _columns(conn, source)})
+                conn.execute("BEGIN")
+                conn.execute(f"INSERT INTO {target}.reminders ({common}) SELECT {common} FROM {source}.reminders")
+                conn.execute("DELETE FROM main.partitions WHERE name = ?", (source,))
+                _register(conn, db_path, targets[year], target)
+                conn.execute("COMMIT")
+                conn.execute(f"DETACH DATABASE {source}")
+                conn.execute(f"DETACH DATABASE {target}")
+                _partition_file(db_path, year).unlink()
+
+        for year in sorted(set(targets[year] for year in years)):
+            alias = _attach(conn, db_path, year, columns)
+            sources = [source for source in years if targets[source] == year]
+            in_year = f"SELECT id FROM moving WHERE year IN ({', '.join('?' * len(sources))})"
+            conn.execute("BEGIN")
+            # 'applying' keeps the delete triggers from writing sync tombstones and 'deleting_subtree'
+            # from re-parenting subtasks: the rows are moving, not going away
+            conn.execute("INSERT OR REPLACE INTO main.sync_meta VALUES ('applying', '1'), ('deleting_subtree', '1')")
+            conn.execute(f'''
+                INSERT INTO {alias}.reminders ({names})
+                SELECT {names} FROM main.reminders WHERE id IN ({in_year})
+            ''', sources)
+            conn.execute(f'''
+                DELETE FROM main.sync_changes WHERE uuid IN (SELECT uuid FROM moving WHERE id IN ({in_year}))
+            ''', sources)
+            moved[year] = conn.execute(f"DELETE FROM main.reminders WHERE id IN ({in_year})", sources).rowcount
+            conn.execute("DELETE FROM main.sync_meta WHERE key IN ('applying', 'deleting_subtree')")
+            _register(conn, db_path, year, alias)
+            conn.execute("COMMIT")
+            conn.execute(f"DETACH DATABASE {alias}")
+        return moved
+    finally:
+        conn.close()
+
+
+def merge(db_path):
+    """Move every archived reminder back into the main file and delete the year files; returns rows moved"""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    total = 0
+    try:
+        main_columns = {name for name, _ in _columns(conn, "main")}
+        for name, path in conn.execute("SELECT name, path FROM partitions").fetchall():
+            path = Path(db_path).parent / path
+            if not path.exists():
+                print(f"Error: partition file {path} is missing; dropping it from the registry")
+                conn.execute("DELETE FROM partitions WHERE name = ?", (name,))
+                continue
+            conn.execute(f"ATTACH DATABASE ? AS {name}", (str(path),))
+            common = ", ".join(column for column, _ in _columns(conn, name) if column in main_columns)
+            conn.execute("BEGIN")
+            # The insert triggers index the rows' tags and announce them to sync peers again
+            total += conn.execute(f"INSERT INTO main.reminders ({common}) SELECT {common} FROM {name}.reminders").rowcount
+            conn.execute("DELETE FROM main.partitions WHERE name = ?", (name,))
+            conn.execute("COMMIT")
+            conn.execute(f"DETACH DATABASE {name}")
+            path.unlink()
+        return total
+    finally:
+        conn.close()
+
+
+def list_partitions(db_path):
+    """Registry rows, oldest first"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute("SELECT * FROM partitions ORDER BY first_date")]
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive completed reminders of past years into per-year files")
+    parser.add_argument("--db", default=DATABASE_PATH, help="database file")
+    parser.add_argument("--keep-years", type=int, default=PARTITION_KEEP_YEARS,
+                        help="past years kept in the main file besides the current one")
+    parser.add_argument("--max-files", type=int, default=PARTITION_MAX_FILES, help="most year files to keep")
+    parser.add_argument("--merge", action="store_true", help="move archived reminders back into the main file")
+    parser.add_argument("--list", action="store_true", help="show the year files")
+    parser.add_argument("--vacuum", action="store_true", help="shrink the main file afterwards")
+    args = parser.parse_args(argv)
+    db_path = Path(args.db)
+    if args.max_files > PARTITION_MAX_FILES:
+        print(f"Error: at most {PARTITION_MAX_FILES} year files can be attached", file=sys.stderr)
+        return 1
+
+    # Opening it once brings the schema (and the partitions registry) up to date
+    ReminderDatabase(str(db_path), replica=False).close()
+    try:
+        start = time.perf_counter()
+        if args.merge:
+            print(f"Moved {merge(db_path)} reminders back into {db_path.name}")
+        elif not args.list:
+            moved = archive(db_path, args.keep_years, args.max_files)
+            for year, rows in sorted(moved.items()):
+                print(f"Moved {rows} reminders into {_partition_file(db_path, year).name}")
+            if not moved:
+                print("Nothing to archive")
+        if args.vacuum:
+            sqlite3.connect(db_path, isolation_level=None).execute("VACUUM").connection.close()
+        if not args.list:
+            print(f"Done in {time.perf_counter() - start:.1f} s")
+        for partition in list_partitions(db_path):
+            print(f"{partition['path']}: {partition['rows']} reminders, "
+                  f"{partition['first_date']} to {partition['last_date']}")
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Recurring reminder expansion, with per-occurrence exceptions merged in
+"""
+
+import heapq
+from datetime import datetime, timedelta
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+EPOCH = datetime(1970, 1, 1)
+# Month lengths in a common year; avoids importing calendar (and locale) on the CLI's startup path
+MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def to_minute(moment):
+    """Whole minutes since the epoch for a naive datetime"""
+    return int((moment - EPOCH).total_seconds() // 60)
+
+
+def from_minute(minute):
+    """Naive datetime for a count of minutes since the epoch"""
+    return EPOCH + timedelta(minutes=minute)
+
+
+def parse_datetime(date, time):
+    """Parse 'YYYY-MM-DD' and 'HH:MM' strings; slicing is much faster than strptime in bulk"""
+    return datetime(int(date[0:4]), int(date[5:7]), int(date[8:10]), int(time[0:2]), int(time[3:5]))
+
+
+def series_start(reminder):
+    """First occurrence of a reminder as a naive datetime"""
+    return parse_datetime(reminder['date'], reminder['time'])
+
+
+def days_in_month(year, month):
+    """Number of days in a month"""
+    leap = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    return MONTH_DAYS[month - 1] + leap
+
+
+def add_months(moment, months, day):
+    """Shift moment by whole months, clamping day to the length of the target month"""
+    month_index = moment.month - 1 + months
+    year = moment.year + month_index // 12
+    month = month_index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(day, days_in_month(year, month)))
+
+
+def first_occurrence_at_or_after(start, recurrence_type, moment):
+    """First occurrence of a series starting at start that is >= moment, computed arithmetically"""
+    if moment <= start:
+        return start
+
+    if recurrence_type == "Daily":
+        step = timedelta(days=1)
+    elif recurrence_type == "Weekly":
+        step = timedelta(weeks=1)
+    elif recurrence_type == "Monthly":
+        months = (moment.year - start.year) * 12 + moment.month - start.month
+        candidate = add_months(start, months, start.day)
+        if candidate < moment:
+            candidate = add_months(start, months + 1, start.day)
+        return candidate
+    else:
+        return None
+
+    periods = -(-(moment - start) // step)  # ceiling division
+    return start + periods * step
+
+
+def iter_occurrences(reminder, range_start, range_end):
+    """Yield occurrence start datetimes of a reminder within [range_start, range_end), in order"""
+    start = series_start(reminder)
+    recurrence_type = reminder.get('recurrence_type')
+    if not reminder.get('is_recurring') or not recurrence_type:
+        if range_start <= start < range_end:
+            yield start
+        return
+
+    occurrence = first_occurrence_at_or_after(start, recurrence_type, range_start)
+    if occurrence is None:
+        return
+
+    count = 0
+    if recurrence_type == "Monthly":
+        # Count months from the series start so a 31st never drifts to the 30th permanently
+        count = (occurrence.year - start.year) * 12 + occurrence.month - start.month
+    while occurrence < range_end:
+        yield occurrence
+        if recurrence_type == "Daily":
+            occurrence += timedelta(days=1)
+        elif recurrence_type == "Weekly":
+            occurrence += timedelta(weeks=1)
+        else:
+            count += 1
+            occurrence = add_months(start, count, start.day)
+
+
+def iter_busy_minutes(reminder, range_start, range_end, exceptions=()):
+    """Yield (start, end) epoch-minute spans for each occurrence of a reminder overlapping the range
+
+    exceptions are as for iter_series: completed and skipped occurrences leave their slot free,
+    moved ones occupy their new time instead of the old one.
+    """
+    length = max(reminder.get('duration_minutes') or 0, 1)
+    # Start one span earlier so an occurrence running into the range is included
+    for _, actual, state in iter_series(reminder, range_start - timedelta(minutes=length), range_end, exceptions):
+        if state in ("completed", "skipped"):
+            continue
+        start = to_minute(actual)
+        yield start, start + length
+
+
+def _apply_exceptions(occurrences, exceptions):
+    """Two-pointer merge of generated occurrences with exceptions sorted by occurrence date"""
+    index = 0
+    for occurrence in occurrences:
+        day = f"{occurrence:%Y-%m-%d}"
+        while index < len(exceptions) and exceptions[index][0] < day:
+            index += 1
+        if index < len(exceptions) and exceptions[index][0] == day:
+            _, state, moved_to = exceptions[index]
+            if moved_to:
+                continue  # comes out of the moved stream at its new time instead
+            yield occurrence, occurrence, state
+        else:
+            yield occurrence, occurrence, None
+
+
+def iter_series(reminder, range_start, range_end, exceptions=()):
+    """Yield (original, actual, state) for each occurrence within [range_start, range_end), ordered by actual time
+
+    exceptions are (occurrence_date, state, moved_to) rows sorted by occurrence_date, covering at
+    least the range and anything moved into it; state is None for an untouched occurrence and
+    "moved" for one moved but not yet completed or skipped.
+    """
+    exceptions = list(exceptions)
+    time = reminder['time']
+    moved = sorted(
+        (parse_datetime(moved_to[:10], moved_to[11:16]), parse_datetime(date, time), state)
+        for date, state, moved_to in exceptions if moved_to
+    )
+    moved_stream = ((original, actual, state) for actual, original, state in moved
+                    if range_start <= actual < range_end)
+    generated = _apply_exceptions(iter_occurrences(reminder, range_start, range_end), exceptions)
+    return heapq.merge(generated, moved_stream, key=lambda occurrence: occurrence[1])
+
+
+def next_occurrence(reminder, moment, exceptions=()):
+    """(original, actual) of the first occurrence at or after moment still to be done, or None"""
+    for original, actual, state in iter_series(reminder, moment, datetime.max, exceptions):
+        if state in (None, "moved"):
+            return original, actual
+    return None
@@ -2,25 +2,57 @@
 Reminder management logic
 """
 
-from datetime import datetime, timedelta
+import heapq
+from datetime import datetime, time, timedelta
+from config import WORKING_DAYS, WORKING_HOURS
 from database import ReminderDatabase
+from recurrence import from_minute, iter_busy_minutes, iter_occurrences, iter_series, to_minute
+from tags import TagIndex
+from timezones import get_zone_table, load_zone, utc_to_local
+from instrumentation import instrumented
 
+@instrumented("manager")
 class ReminderManager:
-    def __init__(self):
-        self.db = ReminderDatabase()
-        self.categories = ["Work", "Personal", "Health", "Shopping", "General"]
+    def __init__(self, db_path=None, replica=None, db=None):
+        """db wraps an already open ReminderDatabase instead of opening db_path"""
+        self.db = db if db is not None else ReminderDatabase(db_path, replica)
+        self.tag_index = TagIndex(self.db)
         self.priorities = ["Low", "Normal", "High", "Urgent"]
         self.recurrence_types = ["Daily", "Weekly", "Monthly"]
     
-    def create_reminder(self, title, description, date, time, category, priority, is_recurring=0, recurrence_type=None):
-        """Create a new reminder"""
-        if not self._validate_reminder(title, date, time):
-            return False
+    def create_reminder(self, title, description, date, time, category, priority, is_recurring=0, recurrence_type=None,
+                        duration_minutes=0, timezone=None, parent_id=None, tags=None):
+        """Create a new reminder and return its id, or None if invalid (timezone is an IANA name; None means the default zone)"""
+        if not self._validate_reminder(title, date, time, timezone):
+            return None
+        if parent_id is not None and not self.db.get_reminders_by_ids([parent_id]):
+            return None
         
-        reminder_id = self.db.add_reminder(title, description, date, time, category, priority, is_recurring, recurrence_type)
-        return reminder_id is not None
+        return self.db.add_reminder(title, description, date, time, category, priority, is_recurring, recurrence_type,
+                                    duration_minutes, timezone, parent_id, tags)
+    
+    @property
+    def categories(self):
+        """Category choices: the tags in use, most used first, then the default categories"""
+        return self.tag_index.vocabulary()
+    
+    def suggest_tags(self, prefix, limit=None):
+        """Autocomplete a partly typed tag name from the in-memory trie"""
+        return self.tag_index.suggest(prefix, limit)
+    
+    def get_tag_counts(self):
+        """(tag, reminder count) pairs, most used first"""
+        return self.tag_index.counts_by_tag()
     
-    def _validate_reminder(self, title, date, time):
+    def set_tags(self, reminder_id, tags):
+        """Replace a reminder's tags"""
+        return self.db.set_tags(reminder_id, tags)
+    
+    def find_by_tags(self, expression, limit=None):
+        """Get reminders matching a tag expression such as "work AND urgent-client" (tags are case-insensitive)"""
+        return self.db.query().tags(expression).limit(limit).fetch()
+    
+    def _validate_reminder(self, title, date, time, timezone=None):
         """Validate reminder inputs"""
         if not title or not title.strip():
             return False
@@ -28,44 +60,142 @@ class ReminderManager:
         try:
             datetime.strptime(date, "%Y-%m-%d")
             datetime.strptime(time, "%H:%M")
+            load_zone(timezone)
             return True
         except ValueError:
             return False
     
-    def get_upcoming_reminders(self, days=7):
-        """Get reminders for the next N days"""
-        reminders = self.db.get_all_reminders()
-        upcoming = []
+    def find_conflicts(self, date, time, duration_minutes=0, exclude_id=None, timezone=None):
+        """Get pending reminders overlapping a slot starting at date/time in timezone; a series conflicts through any occurrence
+
+        Spans are compared in UTC, so reminders in different zones conflict when they really overlap.
+        """
+        slot_start = get_zone_table(timezone).to_utc_minute(to_minute(
+            datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")))
+        slot_end = slot_start + max(duration_minutes, 1)
+        # The interval index only holds each row's first span, so series are expanded over the slot instead
+        conflicts = [r for r in self.db.find_overlapping(from_minute(slot_start), from_minute(slot_end), exclude_id)
+                     if not r['is_recurring']]
+        for reminder in self._pending_series(from_minute(slot_end)):
+            if reminder['id'] != exclude_id and next(self._series_spans(reminder, slot_start, slot_end), None):
+                conflicts.append(reminder)
+        return sorted(conflicts, key=lambda r: r['due_utc'] or f"{r['date']} {r['time']}")
+    
+    def _pending_series(self, end):
+        """Pending recurring reminders whose series starts before end (local dates are within a day of UTC)"""
+        return self.db.query().date_range(end_date=(end + timedelta(days=1)).strftime("%Y-%m-%d")) \
+            .completed(False).recurring(True).fetch()
+    
+    def _series_spans(self, reminder, utc_start, utc_end):
+        """Yield sorted (start, end) UTC epoch-minute spans of a series' occurrences overlapping [utc_start, utc_end)"""
+        try:
+            table = get_zone_table(reminder.get('timezone'))
+        except ValueError:
+            table = get_zone_table()
+        # Occurrences are generated in the series' own wall time, which is within a day of UTC
+        local_start, local_end = from_minute(utc_start - 24 * 60), from_minute(utc_end + 24 * 60)
+        first = local_start - timedelta(minutes=max(reminder.get('duration_minutes') or 0, 1))
+        exceptions = self.db.get_occurrence_exceptions(reminder['id'], f"{first:%Y-%m-%d}", f"{local_end:%Y-%m-%d}")
+        for busy_start, busy_end in iter_busy_minutes(reminder, local_start, local_end, exceptions):
+            start = table.to_utc_minute(busy_start)
+            end = start + busy_end - busy_start
+            if end > utc_start and start < utc_end:
+                yield start, end
+    
+    def display_time(self, reminder):
+        """Reminder due time as a naive datetime in the display zone (a lookup in the cached zone table)"""
+        if not reminder.get('timezone') or not reminder.get('due_utc'):
+            return datetime.strptime(f"{reminder['date']} {reminder['time']}", "%Y-%m-%d %H:%M")
+        return utc_to_local(reminder['due_utc'])
+    
+    def iter_busy_minutes(self, start, end):
+        """Yield (start, end) epoch-minute spans of pending reminders overlapping [start, end), sorted
+
+        start, end and the spans are wall time in the display zone; reminders in other zones are converted.
+        """
+        display = get_zone_table()
+        utc_start, utc_end = display.to_utc_minute(to_minute(start)), display.to_utc_minute(to_minute(end))
+        # One-off spans come pre-sorted from the interval index; each series is expanded lazily
+        one_off = self.db.get_busy_minutes(utc_start, utc_end)
         
-        today = datetime.now()
-        cutoff_date = today + timedelta(days=days)
+        streams = [iter(one_off)]
+        streams.extend(self._series_spans(r, utc_start, utc_end) for r in self._pending_series(end))
+        for busy_start, busy_end in heapq.merge(*streams):
+            local_start = display.to_local_minute(busy_start)
+            yield local_start, local_start + busy_end - busy_start
+    
+    def find_free_slots(self, start, end, duration, working_hours=WORKING_HOURS, working_days=WORKING_DAYS):
+        """Find free gaps of at least duration within working hours between start and end
+        
+        start/end are dates or datetimes, duration a timedelta or minutes, working_hours a
+        ("HH:MM", "HH:MM") pair (None for the whole day). Returns (start, end) datetime pairs.
+        """
+        if not isinstance(start, datetime):
+            start = datetime.combine(start, time.min)
+        if not isinstance(end, datetime):
+            end = datetime.combine(end, time.min) + timedelta(days=1)
+        if isinstance(duration, timedelta):
+            duration = int(duration.total_seconds() // 60)
+        
+        if working_hours:
+            day_open = datetime.strptime(working_hours[0], "%H:%M").time()
+            day_close = datetime.strptime(working_hours[1], "%H:%M").time()
+        else:
+            day_open, day_close = time.min, None
         
-        for reminder in reminders:
-            if not reminder['is_completed']:
-                reminder_date = datetime.strptime(reminder['date'], "%Y-%m-%d")
-                if today <= reminder_date <= cutoff_date:
-                    upcoming.append(reminder)
+        # Everything below works in whole epoch minutes; only the results become datetimes
+        range_start, range_end = to_minute(start), to_minute(end)
+        busy = self.iter_busy_minutes(start, end)
+        current = next(busy, None)
+        slots = []
         
-        return upcoming
+        day = start.date()
+        while day <= end.date():
+            if working_days is None or day.weekday() in working_days:
+                window_start = max(to_minute(datetime.combine(day, day_open)), range_start)
+                if day_close:
+                    window_end = to_minute(datetime.combine(day, day_close))
+                else:
+                    window_end = to_minute(datetime.combine(day + timedelta(days=1), time.min))
+                window_end = min(window_end, range_end)
+                
+                # Single linear sweep: busy spans are consumed in start order across all days
+                cursor = window_start
+                while current is not None and current[0] < window_end:
+                    busy_start, busy_end = current
+                    if busy_end <= cursor:
+                        current = next(busy, None)
+                        continue
+                    if busy_start - cursor >= duration:
+                        slots.append((from_minute(cursor), from_minute(busy_start)))
+                    cursor = max(cursor, busy_end)
+                    if busy_end > window_end:
+                        break
+                    current = next(busy, None)
+                if window_end - cursor >= duration:
+                    slots.append((from_minute(cursor), from_minute(window_end)))
+            day += timedelta(days=1)
+        
+        return slots
+    
+    def get_upcoming_reminders(self, days=7, limit=None):
+        """Get reminders for the next N days (at most limit)"""
+        # Pending reminders dated after today up to now + days, read through the date index
+        today = datetime.now()
+        start = (today + timedelta(days=1)).strftime("%Y-%m-%d")
+        end = (today + timedelta(days=days)).strftime("%Y-%m-%d")
+        return self.db.query().date_range(start, end).completed(False).limit(limit).fetch()
     
     def get_today_reminders(self):
         """Get today's reminders"""
         today = datetime.now().strftime("%Y-%m-%d")
         return self.db.get_reminders_by_date(today)
     
-    def get_overdue_reminders(self):
-        """Get overdue reminders"""
-        all_reminders = self.db.get_all_reminders()
-        overdue = []
-        today = datetime.now()
-        
-        for reminder in all_reminders:
-            if not reminder['is_completed']:
-                reminder_date = datetime.strptime(reminder['date'], "%Y-%m-%d")
-                if reminder_date < today:
-                    overdue.append(reminder)
-        
-        return overdue
+    def get_overdue_reminders(self, limit=None):
+        """Get overdue reminders (at most limit, most recent first)"""
+        # A date counts as overdue once its midnight has passed, so today's pending reminders are included
+        today = datetime.now().strftime("%Y-%m-%d")
+        return self.db.query().date_range(end_date=today).completed(False).limit(limit).fetch()
     
     def complete_reminder(self, reminder_id):
         """Mark reminder as completed"""
@@ -75,6 +205,107 @@ class ReminderManager:
         """Delete a reminder"""
         return self.db.delete_reminder(reminder_id)
     
+    def complete_many(self, reminder_ids):
+        """Mark many reminders as completed at once"""
+        return self.db.mark_completed_many(reminder_ids, True)
+    
+    def delete_many(self, reminder_ids):
+        """Delete many reminders at once"""
+        return self.db.delete_many(reminder_ids)
+    
+    def get_subtasks(self, reminder_id):
+        """Get the direct subtasks of a reminder"""
+        return self.db.get_children(reminder_id)
+    
+    def get_subtree(self, reminder_id):
+        """Get a reminder and all its subtasks depth-first, each with its depth below reminder_id"""
+        return self.db.get_subtree(reminder_id)
+    
+    def get_progress(self, reminder_ids):
+        """Map reminder ids to their subtask completion rollups"""
+        return self.db.get_completion_rollup(reminder_ids)
+    
+    def complete_with_subtasks(self, reminder_id):
+        """Mark a reminder and all of its subtasks completed"""
+        return self.db.complete_subtree(reminder_id, True)
+    
+    def delete_with_subtasks(self, reminder_id):
+        """Delete a reminder and all of its subtasks"""
+        return self.db.delete_subtree(reminder_id)
+    
+    def move_reminder(self, reminder_id, parent_id):
+        """Make a reminder a subtask of parent_id (None for top level); refuses to create cycles"""
+        return self.db.set_parent(reminder_id, parent_id)
+    
+    def _series_occurs_on(self, reminder_id, occurrence_date):
+        """True if reminder_id is a pending recurring series with an occurrence on that local date"""
+        found = self.db.get_reminders_by_ids([reminder_id])
+        if not found or not found[0]['is_recurring'] or found[0]['is_completed']:
+            return False
+        try:
+            day = datetime.strptime(occurrence_date, "%Y-%m-%d")
+        except ValueError:
+            return False
+        return next(iter_occurrences(found[0], day, day + timedelta(days=1)), None) is not None
+    
+    def complete_occurrence(self, reminder_id, occurrence_date):
+        """Mark one occurrence of a recurring series done; the series carries on"""
+        if not self._series_occurs_on(reminder_id, occurrence_date):
+            return False
+        return self.db.set_occurrence_state(reminder_id, occurrence_date, "completed")
+    
+    def skip_occurrence(self, reminder_id, occurrence_date):
+        """Skip one occurrence of a recurring series"""
+        if not self._series_occurs_on(reminder_id, occurrence_date):
+            return False
+        return self.db.set_occurrence_state(reminder_id, occurrence_date, "skipped")
+    
+    def move_occurrence(self, reminder_id, occurrence_date, date, time):
+        """Move one occurrence of a recurring series to another local date and time"""
+        if not self._series_occurs_on(reminder_id, occurrence_date) or not self._validate_reminder("-", date, time):
+            return False
+        return self.db.set_occurrence_state(reminder_id, occurrence_date, "moved", f"{date} {time}")
+    
+    def reopen_occurrence(self, reminder_id, occurrence_date):
+        """Undo completing, skipping or moving one occurrence"""
+        return self.db.clear_occurrence_state(reminder_id, occurrence_date)
+    
+    def get_occurrences(self, reminder_id, start, end):
+        """(original, actual, state) of a reminder's occurrences with actual time in [start, end), in order
+        
+        state is None, "completed", "skipped" or "moved"; start and end are naive local datetimes.
+        """
+        found = self.db.get_reminders_by_ids([reminder_id])
+        if not found:
+            return []
+        exceptions = self.db.get_occurrence_exceptions(reminder_id, f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}")
+        return list(iter_series(found[0], start, end, exceptions))
+    
+    def get_next_due(self, limit=10):
+        """What's next: the soonest pending reminders, series at their next open occurrence"""
+        return self.db.get_next_due(limit)
+    
+    def reschedule_many(self, reminder_ids, delta):
+        """Shift many reminders by a timedelta at once"""
+        return self.db.reschedule_many(reminder_ids, delta.total_seconds() // 60)
+    
+    def parse_delta(self, text):
+        """Parse a shift such as "+1d", "-2h 30m" or "90m" into a timedelta"""
+        text = text.strip().lower()
+        sign = -1 if text.startswith("-") else 1
+        units = {"d": "days", "h": "hours", "m": "minutes", "w": "weeks"}
+        parts = text.lstrip("+-").split()
+        if not parts:
+            raise ValueError("Empty time shift")
+        
+        kwargs = {}
+        for part in parts:
+            unit = units.get(part[-1])
+            if unit is None or not part[:-1].isdigit():
+                raise ValueError(f"Invalid time shift: {part}")
+            kwargs[unit] = kwargs.get(unit, 0) + int(part[:-1])
+        return sign * timedelta(**kwargs)
+    
     def get_statistics(self):
         """Get reminder statistics"""
         all_reminders = self.db.get_all_reminders()
@@ -87,3 +318,14 @@ class ReminderManager:
         }
         
         return stats
+    
+    def get_productivity_report(self, days=28):
+        """Completions per day and week plus lateness for the last days days, from completion timestamps"""
+        end = datetime.now().date()
+        start = (end - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        end = end.strftime("%Y-%m-%d")
+        return {
+            "per_day": self.db.get_completions_per_day(start, end),
+            "per_week": self.db.get_completions_per_week(start, end),
+            "lateness": self.db.get_completion_lateness(start, end),
+        }
@@ -0,0 +1,254 @@
+"""
+In-memory read replica of the reminder database: reads are served from memory, writes go to the file first
+
+The replica is a shared-cache in-memory database filled with the SQLite backup API. Each thread
+pairs its file connection with a reader and a writer on the replica; see ReplicatedConnection.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from itertools import count
+from config import REPLICA_CHECK_INTERVAL, STATEMENT_CACHE_SIZE
+
+# Statements starting with these only read (a WITH that writes is caught by the reader's query_only)
+READ_KEYWORDS = ("SELECT", "WITH", "VALUES", "EXPLAIN")
+
+# Per-connection setup (attached partitions, TEMP views) that the file, reader and writer all need
+SESSION_PREFIXES = ("ATTACH ", "DETACH ", "CREATE TEMP ", "DROP VIEW IF EXISTS TEMP.")
+
+_replica_names = count(1)
+
+
+def _is_read(sql):
+    return sql.lstrip().split(None, 1)[0].upper() in READ_KEYWORDS if sql.strip() else False
+
+
+def _is_session(sql):
+    return " ".join(sql.split()).upper().startswith(SESSION_PREFIXES)
+
+
+class ReadReplica:
+    """The in-memory copy of one database file, reloaded when it falls behind the file"""
+
+    def __init__(self, db_path, check_interval=REPLICA_CHECK_INTERVAL):
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self.uri = f"file:reminders-replica-{os.getpid()}-{next(_replica_names)}?mode=memory&cache=shared"
+        # Held by a thread from its first replicated write until commit/rollback, and while reloading
+        self.lock = threading.RLock()
+        # Keeps the in-memory database alive for as long as the replica is open
+        self.keeper = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        self.keeper.execute("PRAGMA read_uncommitted = 1")
+        self.stale = False
+        self.last_check = time.monotonic()
+        self.loads = 0
+        self.load_ms = 0.0
+        self.load()
+
+    def load(self):
+        """Copy the whole database file into memory"""
+        with self.lock:
+            start = time.perf_counter()
+            source = sqlite3.connect(self.db_path)
+            try:
+                source.backup(self.keeper)
+            finally:
+                source.close()
+            self.stale = False
+            self.loads += 1
+            self.load_ms = (time.perf_counter() - start) * 1000
+
+    def _marker(self, conn):
+        # Highest AUTOINCREMENT values: every reminder change re-sequences sync_changes, every alert
+        # adds to notification_log. Our own writes reach both copies, so a difference means another process
+        return conn.execute("SELECT COALESCE(SUM(seq), 0) FROM sqlite_sequence").fetchone()[0]
+
+    def check(self, disk):
+        """Reload if a write failed on the replica, or (at most every check_interval) if another process wrote"""
+        now = time.monotonic()
+        if not self.stale and now - self.last_check < self.check_interval:
+            return
+        # A thread in the middle of a write owns the lock; check again on a later read
+        if not self.lock.acquire(blocking=False):
+            return
+        try:
+            self.last_check = now
+            if self.stale or self._marker(disk) != self._marker(self.keeper):
+                self.load()
+        finally:
+            self.lock.release()
+
+    def connect(self, disk):
+        """A ReplicatedConnection for the calling thread around its file connection"""
+        reader = sqlite3.connect(self.uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE)
+        # Shared-cache readers would otherwise fail with "table is locked" while another thread writes
+        reader.execute("PRAGMA read_uncommitted = 1")
+        reader.execute("PRAGMA query_only = 1")
+        writer = sqlite3.connect(self.uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE)
+        return ReplicatedConnection(self, disk, reader, writer)
+
+    def close(self):
+        self.keeper.close()
+
+
+class ReplicatedConnection:
+    """A file connection paired with the replica, usable wherever ReminderDatabase uses a connection
+
+    Writes run on the file and then on the replica; the file is committed last, so it stays the
+    durable copy and a replica that failed to follow is reloaded from it. Reads outside a write
+    transaction come from the replica. Inside one they go to the file, so check-then-write logic
+    (notification claims, cycle checks) sees exactly what it commits against. Replica reads do not
+    wait for writers and can see another thread's uncommitted rows. SQLite 'now' timestamps may differ
+    by the few microseconds between the two runs; the file's are the ones kept.
+    """
+
+    def __init__(self, replica, disk, reader, writer):
+        self.replica = replica
+        self.disk = disk
+        self.reader = reader
+        self.writer = writer
+        self.writing = False
+        self.failed = False
+        # randomblob() (new uuids) must give the replica the same bytes the file got
+        self.blobs = deque()
+        disk.create_function("randomblob", 1, self._disk_randomblob)
+        writer.create_function("randomblob", 1, self._replica_randomblob)
+
+    def _disk_randomblob(self, length):
+        blob = os.urandom(max(length or 0, 1))
+        self.blobs.append(blob)
+        return blob
+
+    def _replica_randomblob(self, length):
+        return self.blobs.popleft() if self.blobs else os.urandom(max(length or 0, 1))
+
+    @property
+    def row_factory(self):
+        return self.disk.row_factory
+
+    @row_factory.setter
+    def row_factory(self, factory):
+        self.disk.row_factory = self.reader.row_factory = factory
+
+    @property
+    def in_transaction(self):
+        return self.disk.in_transaction
+
+    def _begin_write(self):
+        if not self.writing:
+            self.replica.lock.acquire()
+            self.writing = True
+
+    def _end_write(self):
+        if self.writing:
+            self.writing = False
+            self.replica.lock.release()
+
+    def _write(self, method, sql, parameters):
+        self._begin_write()
+        try:
+            cursor = getattr(self.disk, method)(sql, parameters)
+        except BaseException:
+            if not self.disk.in_transaction:
+                self._end_write()
+            raise
+        if not self.failed:
+            try:
+                getattr(self.writer, method)(sql, parameters)
+            except sqlite3.Error:
+                # Out of step: the file stays authoritative and the replica is reloaded after commit
+                self.failed = True
+        if not self.disk.in_transaction:
+            # Autocommit statements (PRAGMA, DDL outside a transaction) are finished already
+            self._finish(committed=True)
+        return cursor
+
+    def _read(self, method, sql, parameters):
+        if self.disk.in_transaction:
+            return getattr(self.disk, method)(sql, parameters)
+        self.replica.check(self.disk)
+        try:
+            return getattr(self.reader, method)(sql, parameters)
+        except sqlite3.OperationalError as e:
+            if "readonly" not in str(e):
+                raise
+            return self._write(method, sql, parameters)
+
+    def _session(self, sql, parameters):
+        self.writer.execute(sql, parameters)
+        self.reader.execute("PRAGMA query_only = 0")
+        try:
+            self.reader.execute(sql, parameters)
+        finally:
+            self.reader.execute("PRAGMA query_only = 1")
+        return self.disk.execute(sql, parameters)
+
+    def execute(self, sql, parameters=()):
+        if _is_session(sql):
+            return self._session(sql, parameters)
+        if _is_read(sql):
+            return self._read("execute", sql, parameters)
+        return self._write("execute", sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # Run twice, so generators are drained into a list first
+        return self._write("executemany", sql, list(seq_of_parameters))
+
+    def cursor(self):
+        """A cursor for reads: on the file inside a write transaction, otherwise on the replica"""
+        if self.disk.in_transaction:
+            return self.disk.cursor()
+        self.replica.check(self.disk)
+        return self.reader.cursor()
+
+    def _finish(self, committed):
+        if self.failed and committed:
+            self.writer.rollback()
+            self.replica.stale = True
+        self.failed = False
+        self.blobs.clear()
+        self._end_write()
+        if self.replica.stale:
+            self.replica.check(self.disk)
+
+    def commit(self):
+        # Replica first: once the file commits, the next writer may already be on its way
+        if not self.failed:
+            try:
+                self.writer.commit()
+            except sqlite3.Error:
+                self.failed = True
+        try:
+            self.disk.commit()
+        except BaseException:
+            # The replica may already hold rows the file is rolling back: reload it from the file
+            self.replica.stale = True
+            self.rollback()
+            raise
+        self._finish(committed=True)
+
+    def rollback(self):
+        self.reader.rollback()
+        self.writer.rollback()
+        self.disk.rollback()
+        self.failed = False
+        self._finish(committed=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def close(self):
+        self.rollback()
+        self.reader.close()
+        self.writer.close()
+        self.disk.close()
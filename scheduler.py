@@ -0,0 +1,118 @@
+"""
+Reminder scheduling with exactly-once delivery through the notification log
+
+All scheduler times are naive UTC datetimes, so DST changes and travelling never skip or repeat alerts.
+"""
+
+from datetime import datetime, timedelta
+from config import NOTIFICATION_CATCHUP_MINUTES
+from escalation import EscalationEngine
+from timezones import utc_now
+
+MINUTE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class ReminderScheduler:
+    def __init__(self, reminder_manager, notification_manager, on_fire=None, on_digest=None):
+        self.reminder_manager = reminder_manager
+        self.notification_manager = notification_manager
+        self.on_fire = on_fire
+        self.on_digest = on_digest
+        self.last_check = None
+        self.escalation = EscalationEngine(self)
+
+    def catch_up(self, now=None):
+        """Fire reminders missed while no instance was running"""
+        now = now or utc_now()
+        since = now - timedelta(minutes=NOTIFICATION_CATCHUP_MINUTES)
+        fired = self._fire_window(since, now)
+        fired.extend(self.escalation.tick(now))
+        self.last_check = now
+        return fired
+
+    def tick(self, now=None):
+        """Fire everything due since the previous tick, so stalled ticks lose nothing"""
+        now = now or utc_now()
+        # Pick up due times of rows written elsewhere (sync, other instances) before querying them
+        self.reminder_manager.db.fill_due_utc()
+        if self.last_check is None:
+            return self.catch_up(now)
+
+        fired = self._fire_window(self.last_check, now)
+        fired.extend(self.escalation.tick(now))
+        # Series whose occurrence has just fired move on to their next one
+        self.reminder_manager.db.fill_next_due(now.strftime(MINUTE_FORMAT), advance=True)
+        self.last_check = now
+        return fired
+
+    def _fire_window(self, since, until):
+        """Deliver each pending occurrence due in (since, until] (UTC)"""
+        due = self.reminder_manager.db.get_due_reminders(
+            since.strftime(MINUTE_FORMAT), until.strftime(MINUTE_FORMAT)
+        )
+        occurrences = []
+        for reminder in due:
+            if reminder.get('occurrence'):
+                # One occurrence of a series: claimed under its own local time, due at next_due_at
+                due_at = datetime.strptime(reminder['next_due_at'], MINUTE_FORMAT)
+                occurrences.append((reminder, reminder['occurrence'], due_at))
+            else:
+                occurrences.append((reminder, f"{reminder['date']} {reminder['time']}", None))
+        fired = self.deliver_many(occurrences)
+        for reminder in fired:
+            self.escalation.track(reminder, until)
+        return fired
+
+    def deliver(self, reminder, occurrence_time, due_at=None):
+        """Claim and deliver one occurrence; returns False if another instance already owns it"""
+        return bool(self.deliver_many([(reminder, occurrence_time, due_at)]))
+
+    def deliver_many(self, occurrences):
+        """Claim and deliver (reminder, occurrence_time, due_at) occurrences together; returns those delivered
+
+        Claims and delivery records are written in one transaction each, and a burst reaches the
+        user as one digest, so a hundred simultaneous reminders cost about as much as a few.
+        """
+        if not occurrences:
+            return []
+        db = self.reminder_manager.db
+        log_ids = db.claim_notifications([(reminder['id'], occurrence_time)
+                                          for reminder, occurrence_time, _ in occurrences])
+        claimed = [(occurrence, log_id) for occurrence, log_id in zip(occurrences, log_ids) if log_id is not None]
+        if not claimed:
+            return []
+
+        reminders = [reminder for (reminder, _, _), _ in claimed]
+        try:
+            individual, digest = self.notification_manager.alert_many(reminders)
+        except Exception as e:
+            print(f"Error delivering reminder: {e}")
+            db.release_notifications([log_id for _, log_id in claimed])
+            return []
+
+        now = utc_now()
+        deliveries = []
+        for (reminder, occurrence_time, due_at), log_id in claimed:
+            if due_at is None:
+                due_at = datetime.strptime(reminder.get('due_utc') or occurrence_time, MINUTE_FORMAT)
+            deliveries.append((log_id, max((now - due_at).total_seconds() * 1000, 0.0)))
+        db.record_deliveries(deliveries, self.notification_manager.system)
+
+        if self.on_fire:
+            for reminder in individual:
+                self.on_fire(reminder)
+        if digest:
+            if self.on_digest:
+                self.on_digest(digest)
+            elif self.on_fire:
+                for reminder in digest:
+                    self.on_fire(reminder)
+        return reminders
+
+    def snooze(self, reminder_id, minutes):
+        """Snooze a fired reminder; it is re-alerted after the given number of minutes"""
+        self.escalation.snooze(reminder_id, minutes)
+
+    def acknowledge(self, reminder_id):
+        """Stop re-alerting a fired reminder"""
+        self.escalation.acknowledge(reminder_id)
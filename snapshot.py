@@ -0,0 +1,166 @@
+"""
+Columnar snapshots of the reminder table: one .npy file per column, memory-mapped back with zero copy
+
+A snapshot directory holds meta.json (row count, column dtypes, category/priority dictionaries)
+and one array per column. Titles use an Arrow-style layout: title.offsets.npy (n + 1 byte offsets)
+into title.data, the concatenated UTF-8 bytes.
+"""
+
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from config import SNAPSHOT_CHUNK_ROWS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SNAPSHOT_FORMAT = 1
+NULL_MINUTE = -(2 ** 63)  # epoch-minute columns use this for NULL
+
+# name -> (dtype, SQL expression); minutes are epoch minutes (UTC), day is the epoch day of the local date
+SNAPSHOT_COLUMNS = {
+    "id": ("int64", "id"),
+    "day": ("int32", "COALESCE(CAST(julianday(date) - 2440587.5 AS INTEGER), 0)"),
+    "minute_of_day": ("int16",
+                      "COALESCE(CAST(substr(time, 1, 2) AS INTEGER) * 60 + CAST(substr(time, 4, 2) AS INTEGER), 0)"),
+    "due_minute": ("int64", f"COALESCE(CAST(strftime('%s', due_utc) AS INTEGER) / 60, {NULL_MINUTE})"),
+    "completed_minute": ("int64", f"COALESCE(CAST(strftime('%s', completed_at) AS INTEGER) / 60, {NULL_MINUTE})"),
+    "category": ("int16", "category"),
+    "priority": ("int16", "priority"),
+    "completed": ("bool", "COALESCE(is_completed, 0)"),
+    "recurring": ("bool", "COALESCE(is_recurring, 0)"),
+    "duration_minutes": ("int32", "COALESCE(duration_minutes, 0)"),
+}
+# Text columns stored as small integer codes plus a label list in meta.json
+DICTIONARY_COLUMNS = {"category": "categories", "priority": "priorities"}
+
+
+def available():
+    """True when NumPy is installed"""
+    return np is not None
+
+
+def export_snapshot(db, directory, chunk_rows=SNAPSHOT_CHUNK_ROWS):
+    """Write every reminder to a snapshot directory, streaming from SQLite in chunks; returns meta"""
+    if np is None:
+        raise RuntimeError("Snapshots need NumPy: pip install numpy")
+    directory = Path(directory)
+    if directory.exists() and not _is_replaceable(directory):
+        raise FileExistsError(f"{directory} exists and is not a snapshot; choose a new directory")
+    partial = directory.with_name(directory.name + ".partial")
+    shutil.rmtree(partial, ignore_errors=True)
+    partial.mkdir(parents=True)
+
+    conn = db._get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    # One read transaction: the count, the rows and the change seq all come from the same snapshot
+    cursor.execute("BEGIN")
+    source = db.partition_source(db.partitions)
+    try:
+        rows = cursor.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0]
+        change_seq = db._change_seq(conn)
+        arrays = {name: np.lib.format.open_memmap(partial / f"{name}.npy", mode="w+", dtype=dtype, shape=(rows,))
+                  for name, (dtype, _) in SNAPSHOT_COLUMNS.items()}
+        offsets = np.lib.format.open_memmap(partial / "title.offsets.npy", mode="w+", dtype="int64",
+                                            shape=(rows + 1,))
+        offsets[0] = 0
+        codes = {name: {} for name in DICTIONARY_COLUMNS}
+        names = list(SNAPSHOT_COLUMNS)
+
+        select = ", ".join(expression for _, expression in SNAPSHOT_COLUMNS.values())
+        cursor.execute(f"SELECT {select}, title FROM {source} ORDER BY id")
+        position = 0
+        with open(partial / "title.data", "wb") as titles:
+            while True:
+                chunk = cursor.fetchmany(chunk_rows)
+                if not chunk:
+                    break
+                end = position + len(chunk)
+                columns = list(zip(*chunk))
+                for index, name in enumerate(names):
+                    values = columns[index]
+                    if name in codes:
+                        mapping = codes[name]
+                        values = [mapping.setdefault(value, len(mapping)) for value in values]
+                    arrays[name][position:end] = values
+                encoded = [(title or "").encode("utf-8") for title in columns[-1]]
+                offsets[position + 1:end + 1] = offsets[position] + np.cumsum([len(title) for title in encoded])
+                titles.write(b"".join(encoded))
+                position = end
+    finally:
+        conn.rollback()
+
+    for array in (*arrays.values(), offsets):
+        array.flush()
+    del arrays, offsets
+
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "rows": rows,
+        "change_seq": change_seq,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "columns": {name: dtype for name, (dtype, _) in SNAPSHOT_COLUMNS.items()},
+        "null_minute": NULL_MINUTE,
+        "dictionaries": {label_key: list(codes[name]) for name, label_key in DICTIONARY_COLUMNS.items()},
+    }
+    (partial / "meta.json").write_text(json.dumps(meta, indent=2))
+    if directory.exists():
+        shutil.rmtree(directory)
+    partial.rename(directory)
+    return meta
+
+
+def _is_replaceable(directory):
+    """An existing target is only overwritten when it is an empty directory or an earlier snapshot"""
+    return directory.is_dir() and ((directory / "meta.json").exists() or not any(directory.iterdir()))
+
+
+class Snapshot:
+    """A snapshot opened read-only; columns are memory-mapped, so opening costs no copying"""
+
+    def __init__(self, directory, mmap=True):
+        if np is None:
+            raise RuntimeError("Snapshots need NumPy: pip install numpy")
+        self.directory = Path(directory)
+        self.meta = json.loads((self.directory / "meta.json").read_text())
+        if self.meta["format"] != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {self.meta['format']}")
+        mode = "r" if mmap else None
+        self.columns = {name: np.load(self.directory / f"{name}.npy", mmap_mode=mode)
+                        for name in self.meta["columns"]}
+        self.title_offsets = np.load(self.directory / "title.offsets.npy", mmap_mode=mode)
+        if mmap and self.title_offsets[-1]:
+            self.title_data = np.memmap(self.directory / "title.data", dtype="uint8", mode="r")
+        else:
+            # np.memmap refuses empty files
+            self.title_data = np.fromfile(self.directory / "title.data", dtype="uint8")
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def labels(self, name):
+        """Dictionary labels of a coded column, indexed by code"""
+        return self.meta["dictionaries"][DICTIONARY_COLUMNS[name]]
+
+    def title(self, index):
+        """Title of the row at index"""
+        start, end = self.title_offsets[index], self.title_offsets[index + 1]
+        return bytes(self.title_data[start:end]).decode("utf-8")
+
+    def analytics_columns(self):
+        """The column dict ReminderAnalytics.compute() expects, still backed by the mapped files"""
+        columns = {name: self.columns[name] for name in ("day", "category", "priority", "completed")}
+        columns.update(self.meta["dictionaries"])
+        return columns
+
+
+def load_snapshot(directory, mmap=True):
+    """Open a snapshot directory"""
+    return Snapshot(directory, mmap)
@@ -0,0 +1,261 @@
+"""
+Alert sound playback through a long-lived worker instead of a process per alert
+"""
+
+import array
+import io
+import math
+import platform
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from pathlib import Path
+from instrumentation import instrumented
+from config import PRIORITY_SOUNDS, SOUND_BACKEND, SOUND_OUTPUT_DIR, SOUND_SAMPLE_RATE
+
+
+def synthesize_tones(tones, sample_rate=SOUND_SAMPLE_RATE):
+    """Render (frequency Hz, duration ms) beeps to 16-bit mono PCM with short gaps between"""
+    samples = array.array("h")
+    gap = [0] * int(sample_rate * 0.05)
+    for frequency, duration_ms in tones:
+        count = int(sample_rate * duration_ms / 1000)
+        fade = max(min(count // 10, int(sample_rate * 0.01)), 1)
+        step = 2 * math.pi * frequency / sample_rate
+        for i in range(count):
+            # Short linear fade in/out avoids audible clicks at the edges
+            envelope = min(1.0, i / fade, (count - i) / fade)
+            samples.append(int(12000 * envelope * math.sin(step * i)))
+        samples.extend(gap)
+    return samples.tobytes()
+
+
+def decode_wav(path, sample_rate=SOUND_SAMPLE_RATE):
+    """Decode a 16-bit WAV file to mono PCM at sample_rate"""
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV files are supported")
+        channels = wav.getnchannels()
+        source_rate = wav.getframerate()
+        frames = array.array("h", wav.readframes(wav.getnframes()))
+
+    if channels > 1:
+        frames = array.array("h", (
+            sum(frames[i:i + channels]) // channels for i in range(0, len(frames), channels)
+        ))
+    if source_rate != sample_rate:
+        # Nearest-neighbour resampling is plenty for short alert chimes
+        ratio = source_rate / sample_rate
+        length = int(len(frames) / ratio)
+        frames = array.array("h", (frames[int(i * ratio)] for i in range(length)))
+    return frames.tobytes()
+
+
+def pcm_to_wav(pcm, sample_rate=SOUND_SAMPLE_RATE):
+    """Wrap raw 16-bit mono PCM in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+@instrumented("sound.null", methods=("play",))
+class NullBackend:
+    """Discards audio; keeps a record of what would have played"""
+    name = "null"
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, priority, pcm):
+        self.played.append(priority)
+
+    def close(self):
+        pass
+
+
+@instrumented("sound.wav", methods=("play",))
+class WavFileBackend(NullBackend):
+    """Writes each alert to a WAV file, for headless machines and inspection"""
+    name = "wav"
+
+    def __init__(self, output_dir=SOUND_OUTPUT_DIR):
+        super().__init__()
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def play(self, priority, pcm):
+        super().play(priority, pcm)
+        path = self.output_dir / f"alert-{len(self.played):05d}-{priority.lower()}.wav"
+        path.write_bytes(pcm_to_wav(pcm))
+
+
+@instrumented("sound.stream", methods=("play",))
+class StreamBackend:
+    """Feeds raw PCM into one persistent player process (pacat/aplay) kept warm between alerts"""
+    name = "stream"
+
+    def __init__(self, command):
+        self.command = command
+        self.process = None
+
+    def _ensure_process(self):
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE,
+                                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return self.process
+
+    def play(self, priority, pcm):
+        process = self._ensure_process()
+        try:
+            process.stdin.write(pcm)
+            process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            # Player died (e.g. audio server restarted); retry once with a fresh process
+            self.process = None
+            process = self._ensure_process()
+            process.stdin.write(pcm)
+            process.stdin.flush()
+
+    def close(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.terminate()
+        self.process = None
+
+
+@instrumented("sound.winsound", methods=("play",))
+class WinsoundBackend:
+    """Plays in-memory WAV data with winsound"""
+    name = "winsound"
+
+    def __init__(self):
+        import winsound
+        self.winsound = winsound
+        self.wav_cache = {}
+
+    def play(self, priority, pcm):
+        if priority not in self.wav_cache:
+            self.wav_cache[priority] = pcm_to_wav(pcm)
+        self.winsound.PlaySound(self.wav_cache[priority], self.winsound.SND_MEMORY)
+
+    def close(self):
+        pass
+
+
+@instrumented("sound.afplay", methods=("play",))
+class AfplayBackend:
+    """macOS has no raw-PCM player, so each sound is written to disk once and replayed with afplay"""
+    name = "afplay"
+
+    def __init__(self):
+        self.directory = Path(tempfile.mkdtemp(prefix="reminder-sounds-"))
+        self.paths = {}
+
+    def play(self, priority, pcm):
+        if priority not in self.paths:
+            path = self.directory / f"{priority.lower()}.wav"
+            path.write_bytes(pcm_to_wav(pcm))
+            self.paths[priority] = path
+        subprocess.run(["afplay", str(self.paths[priority])], check=False)
+
+    def close(self):
+        pass
+
+
+def create_backend(name=SOUND_BACKEND):
+    """Create a sound backend by name; "auto" picks the best one available on this system"""
+    system = platform.system()
+    if name == "auto":
+        if system == "Windows":
+            name = "winsound"
+        elif system == "Darwin" and shutil.which("afplay"):
+            name = "afplay"
+        elif shutil.which("pacat") or shutil.which("aplay"):
+            name = "stream"
+        else:
+            name = "null"
+
+    if name == "winsound":
+        return WinsoundBackend()
+    if name == "afplay":
+        return AfplayBackend()
+    if name == "stream":
+        rate = str(SOUND_SAMPLE_RATE)
+        if shutil.which("pacat"):
+            return StreamBackend(["pacat", "--raw", "--format=s16le", "--channels=1", f"--rate={rate}"])
+        return StreamBackend(["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r", rate])
+    if name == "wav":
+        return WavFileBackend()
+    return NullBackend()
+
+
+class SoundPlayer:
+    """Decodes alert sounds once and plays them from a background worker thread"""
+
+    def __init__(self, backend=None, sounds=None):
+        self.backend = backend or create_backend()
+        self.sounds = sounds or PRIORITY_SOUNDS
+        self.cache = {}
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.worker = None
+
+    def get_pcm(self, priority):
+        """Return decoded PCM for a priority, decoding it on first use only"""
+        if priority not in self.cache:
+            spec = self.sounds.get(priority) or self.sounds["Normal"]
+            if isinstance(spec, (str, Path)):
+                self.cache[priority] = decode_wav(spec)
+            else:
+                self.cache[priority] = synthesize_tones(spec)
+        return self.cache[priority]
+
+    def preload(self):
+        """Decode every configured sound up front"""
+        for priority in self.sounds:
+            self.get_pcm(priority)
+
+    def play(self, priority="Normal"):
+        """Queue a sound without blocking; repeats of an already-queued priority are coalesced"""
+        with self.lock:
+            if priority in self.pending:
+                return False
+            self.pending.add(priority)
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, name="sound-player", daemon=True)
+                self.worker.start()
+        self.queue.put(priority)
+        return True
+
+    def _run(self):
+        while True:
+            priority = self.queue.get()
+            try:
+                if priority is None:
+                    return
+                with self.lock:
+                    self.pending.discard(priority)
+                self.backend.play(priority, self.get_pcm(priority))
+            except Exception as e:
+                print(f"Sound playback: {e}")
+            finally:
+                self.queue.task_done()
+
+    def wait(self):
+        """Block until every queued sound has played"""
+        self.queue.join()
+
+    def close(self):
+        """Stop the worker and release the backend"""
+        if self.worker is not None and self.worker.is_alive():
+            self.queue.put(None)
+            self.worker.join(timeout=5)
+        self.backend.close()
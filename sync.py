@@ -0,0 +1,161 @@
+"""
+Delta sync between two reminder databases, directly against a file or through a local sync server
+
+Run a stand-in server:   python sync.py serve [--db PATH] [--port PORT]
+Sync with a peer:        python sync.py sync PEER   (a database file or http://host:port)
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from urllib.request import Request, urlopen
+from config import SYNC_PEER, SYNC_SERVER_HOST, SYNC_SERVER_PORT, SYNC_TIMEOUT
+from database import ReminderDatabase
+
+
+class FilePeer:
+    """Another reminder database file, e.g. on a shared folder or USB stick"""
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        self.name = str(self.path)
+        self.db = ReminderDatabase(self.path, replica=False)
+
+    def exchange(self, changes, since):
+        return self.db.exchange_changes(changes, since)
+
+    def close(self):
+        self.db.close()
+
+
+class HttpPeer:
+    """A SyncServer reached over HTTP"""
+
+    def __init__(self, url, timeout=SYNC_TIMEOUT):
+        self.name = url.rstrip("/")
+        self.timeout = timeout
+
+    def exchange(self, changes, since):
+        body = json.dumps({"changes": changes, "since": since}).encode()
+        request = Request(f"{self.name}/exchange", data=body, headers={"Content-Type": "application/json"})
+        with urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def close(self):
+        pass
+
+
+def open_peer(target):
+    """Return a peer for a database path or an http(s) URL"""
+    target = str(target)
+    if target.startswith(("http://", "https://")):
+        return HttpPeer(target)
+    return FilePeer(target)
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/exchange":
+            self.send_error(404)
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            result = self.server.sync_db.exchange_changes(payload["changes"], payload["since"])
+        except Exception as e:
+            self.send_error(400, f"Error exchanging changes: {e}")
+            return
+        body = json.dumps(result).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SyncServer:
+    """Local stand-in for a sync server, serving one database to HttpPeer clients"""
+
+    def __init__(self, db_path=None, host=SYNC_SERVER_HOST, port=SYNC_SERVER_PORT):
+        self.db = ReminderDatabase(db_path, replica=False)
+        self.httpd = HTTPServer((host, port), SyncRequestHandler)
+        self.httpd.sync_db = self.db
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.db.close()
+
+    def start(self):
+        """Serve on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, name="sync-server", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+
+class SyncEngine:
+    def __init__(self, db):
+        self.db = db
+
+    def sync(self, peer):
+        """Exchange changes made since the last sync with peer; returns counts and duration"""
+        start = time.perf_counter()
+        result = self.db.sync_with_peer(peer.name, peer.exchange)
+        result["duration_ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    def sync_with(self, target=SYNC_PEER):
+        """Open target (path or URL), sync with it and close it"""
+        peer = open_peer(target)
+        try:
+            return self.sync(peer)
+        finally:
+            peer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync reminder databases")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="serve a database to other machines")
+    serve.add_argument("--db", help="database to serve (default: this app's database)")
+    serve.add_argument("--host", default=SYNC_SERVER_HOST)
+    serve.add_argument("--port", type=int, default=SYNC_SERVER_PORT)
+    sync = commands.add_parser("sync", help="sync this app's database with a peer")
+    sync.add_argument("peer", nargs="?", default=SYNC_PEER, help="database file or server URL")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = SyncServer(args.db, args.host, args.port)
+        print(f"Serving {server.db.db_path} at {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if not args.peer:
+        parser.error("no peer given and REMINDER_SYNC_PEER is not set")
+    result = SyncEngine(ReminderDatabase()).sync_with(args.peer)
+    print(f"Sent {result['sent']}, received {result['received']}, applied {result['applied']} "
+          f"in {result['duration_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
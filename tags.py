@@ -0,0 +1,137 @@
+"""
+Free-form reminder tags: name normalization, tag expressions and prefix autocomplete
+"""
+
+import shlex
+import threading
+from config import DEFAULT_CATEGORIES, TAG_SUGGESTION_LIMIT
+
+
+def normalize_tag(name):
+    """Collapse whitespace in a tag name; returns None for blank names"""
+    name = " ".join(str(name).split())
+    return name or None
+
+
+def parse_tags(text):
+    """Split a comma-separated tag list, dropping blanks and case-insensitive duplicates"""
+    return unique_tags(text.split(",")) if text else []
+
+
+def unique_tags(names):
+    """Normalized tag names in order, without blanks or case-insensitive duplicates"""
+    tags, seen = [], set()
+    for name in names:
+        name = normalize_tag(name)
+        if name and name.casefold() not in seen:
+            seen.add(name.casefold())
+            tags.append(name)
+    return tags
+
+
+def parse_tag_expression(text):
+    """Parse "work AND urgent-client", "home OR errands", "work NOT done" into OR-ed groups of AND-ed terms
+
+    Returns a tuple of groups, each a tuple of (negated, name) terms. AND binds tighter than OR and
+    adjacent names mean AND; names with spaces can be quoted. Operators are upper case only, so
+    "not" and "or" still work as tag names. "NOT done" alone matches everything
+    not tagged done.
+    """
+    try:
+        tokens = shlex.split(text)
+    except ValueError as e:
+        raise ValueError(f"Invalid tag expression: {e}") from None
+    groups, group = [], []
+    negated = expect_term = False
+    for token in tokens:
+        if token in ("AND", "OR"):
+            if not group or expect_term:
+                raise ValueError(f"Invalid tag expression: misplaced {token}")
+            if token == "OR":
+                groups.append(tuple(group))
+                group = []
+            expect_term = True
+        elif token == "NOT":
+            if negated:
+                raise ValueError("Invalid tag expression: NOT NOT")
+            negated = expect_term = True
+        else:
+            group.append((negated, normalize_tag(token)))
+            negated = expect_term = False
+    if expect_term or not group:
+        raise ValueError("Invalid tag expression: expected a tag name")
+    groups.append(tuple(group))
+    return tuple(groups)
+
+
+class TagTrie:
+    """Prefix trie of tag names; every node keeps its most-used completions, so a lookup walks only the prefix"""
+
+    def __init__(self, counts=(), limit=TAG_SUGGESTION_LIMIT):
+        self.limit = limit
+        self.root = {}
+        # Most-used first, then alphabetical: each node's list is filled in final order and never re-sorted
+        for name, count in sorted(counts, key=lambda item: (-item[1], item[0].casefold())):
+            self._insert(name)
+
+    def _insert(self, name):
+        node = self.root
+        for char in name.casefold():
+            node = node.setdefault(char, {})
+            best = node.setdefault("", [])
+            if len(best) < self.limit:
+                best.append(name)
+
+    def complete(self, prefix, limit=None):
+        """Tag names starting with prefix (case-insensitive), most used first"""
+        prefix = normalize_tag(prefix)
+        if not prefix:
+            return []
+        node = self.root
+        for char in prefix.casefold():
+            node = node.get(char)
+            if node is None:
+                return []
+        return node[""][:limit or self.limit]
+
+
+class TagIndex:
+    """Tag vocabulary and autocomplete trie, rebuilt only after the database has changed"""
+
+    def __init__(self, db):
+        self.db = db
+        self.lock = threading.Lock()
+        self.change_seq = None
+        self.counts = []
+        self.trie = TagTrie()
+
+    def _refresh(self):
+        change_seq = self.db.get_change_seq()
+        with self.lock:
+            if change_seq == self.change_seq:
+                return
+        counts = self.db.get_tag_counts()
+        trie = TagTrie(counts)
+        with self.lock:
+            self.counts, self.trie, self.change_seq = counts, trie, change_seq
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup"""
+        with self.lock:
+            self.change_seq = None
+
+    def suggest(self, prefix, limit=None):
+        """Autocomplete a partly typed tag"""
+        self._refresh()
+        return self.trie.complete(prefix, limit)
+
+    def counts_by_tag(self):
+        """(name, reminder count) pairs, most used first"""
+        self._refresh()
+        return list(self.counts)
+
+    def vocabulary(self):
+        """Tag names in use, most used first, followed by any default categories not yet used"""
+        names = [name for name, _ in self.counts_by_tag()]
+        used = {name.casefold() for name in names}
+        return names + [name for name in DEFAULT_CATEGORIES if name.casefold() not in used]
@@ -0,0 +1,197 @@
+"""
+Timezone conversion through cached per-zone tables of UTC offset transitions
+"""
+
+import threading
+from bisect import bisect_right
+from datetime import datetime, timezone
+from functools import lru_cache
+from config import DEFAULT_TIMEZONE, TIMEZONE_TABLE_YEARS
+from recurrence import from_minute, to_minute
+
+# Years the tables can cover; conversions outside clamp to the nearest loaded offset
+MIN_YEAR, MAX_YEAR = 1970, 2199
+
+
+def load_zone(name):
+    """Return a tzinfo for an IANA zone name, or None for the system local zone"""
+    if not name or name == "local":
+        return None
+    # Imported on first use: runs that only see local-time reminders (most CLI commands) never pay for them
+    try:
+        from zoneinfo import ZoneInfo
+    except ImportError:
+        ZoneInfo = None
+    try:
+        import pytz
+    except ImportError:
+        pytz = None
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo(name)
+        except Exception:
+            pass  # e.g. Windows without the tzdata package; pytz ships its own database
+    if pytz is not None:
+        try:
+            return pytz.timezone(name)
+        except pytz.UnknownTimeZoneError:
+            pass
+    raise ValueError(f"Unknown timezone: {name}")
+
+
+def offset_minutes(tz, utc_minute):
+    """UTC offset in minutes of zone tz (None = system local) at an epoch minute, resolved the slow way"""
+    moment = datetime.fromtimestamp(utc_minute * 60, timezone.utc)
+    moment = moment.astimezone() if tz is None else moment.astimezone(tz)
+    return int(moment.utcoffset().total_seconds() // 60)
+
+
+class ZoneTable:
+    """UTC offset transitions of one zone, computed a block of years at a time on first use"""
+
+    def __init__(self, name):
+        self.name = name
+        self.tz = load_zone(name)
+        self.lock = threading.Lock()
+        self.starts = []  # epoch minute (UTC) at which each offset takes effect
+        self.offsets = []
+        self.first_year = self.end_year = None
+        self.low = self.high = 0
+
+    def _sample(self, first_year, end_year):
+        """Transitions within [first_year, end_year): weekly samples, bisected to the minute where they change"""
+        minute = to_minute(datetime(first_year, 1, 1))
+        end = to_minute(datetime(end_year, 1, 1))
+        starts, offsets = [minute], [offset_minutes(self.tz, minute)]
+        # Weekly keeps a cold start (e.g. one CLI call) cheap; scanning on from each transition found
+        # still catches a second change inside the same week, as long as it does not undo the first
+        while minute < end:
+            following = min(minute + 7 * 24 * 60, end)
+            if offset_minutes(self.tz, following) == offsets[-1]:
+                minute = following
+                continue
+            low, high = minute, following
+            while high - low > 1:
+                middle = (low + high) // 2
+                if offset_minutes(self.tz, middle) == offsets[-1]:
+                    low = middle
+                else:
+                    high = middle
+            starts.append(high)
+            offsets.append(offset_minutes(self.tz, high))
+            minute = high
+        return starts, offsets
+
+    def _load(self, utc_minute):
+        """Extend the table so it covers the year containing utc_minute"""
+        year = min(max(from_minute(utc_minute).year, MIN_YEAR), MAX_YEAR)
+        with self.lock:
+            block = year - year % TIMEZONE_TABLE_YEARS
+            if self.first_year is None:
+                first_year, end_year = block, block + TIMEZONE_TABLE_YEARS
+                starts, offsets = self._sample(first_year, end_year)
+            elif year < self.first_year:
+                first_year, end_year = block, self.end_year
+                starts, offsets = self._sample(block, self.first_year)
+                starts, offsets = starts + self.starts, offsets + self.offsets
+            elif year >= self.end_year:
+                first_year, end_year = self.first_year, block + TIMEZONE_TABLE_YEARS
+                starts, offsets = self._sample(self.end_year, end_year)
+                starts, offsets = self.starts + starts, self.offsets + offsets
+            else:
+                return
+
+            # Drop entries that do not change the offset (block boundaries)
+            merged_starts, merged_offsets = starts[:1], offsets[:1]
+            for start, offset in zip(starts[1:], offsets[1:]):
+                if offset != merged_offsets[-1]:
+                    merged_starts.append(start)
+                    merged_offsets.append(offset)
+            # Readers never see half-built lists: both are swapped in before the bounds move
+            self.starts, self.offsets = merged_starts, merged_offsets
+            self.first_year, self.end_year = first_year, end_year
+            self.low = to_minute(datetime(first_year, 1, 1))
+            self.high = to_minute(datetime(end_year, 1, 1))
+
+    def _index(self, utc_minute):
+        if not self.low <= utc_minute < self.high:
+            self._load(utc_minute)
+        return max(bisect_right(self.starts, utc_minute) - 1, 0)
+
+    def offset_at(self, utc_minute):
+        """UTC offset in minutes at an epoch minute"""
+        index = self._index(utc_minute)  # may load more years and swap the lists
+        return self.offsets[index]
+
+    def to_local_minute(self, utc_minute):
+        """Wall-clock epoch minute in this zone for a UTC epoch minute"""
+        return utc_minute + self.offset_at(utc_minute)
+
+    def to_utc_minute(self, local_minute):
+        """UTC epoch minute for a wall-clock epoch minute in this zone
+
+        Ambiguous times (clocks going back) resolve to the first occurrence; times skipped
+        by clocks going forward use the offset before the change, landing just after it.
+        """
+        # No zone moves its clocks twice within two days, so one offset across them means no transition
+        first = self._index(local_minute - 24 * 60)
+        last = self._index(local_minute + 24 * 60)
+        before = self.offsets[first]
+        if first == last:
+            return local_minute - before
+        after = self.offsets[last]
+        for offset in (before, after) if before != after else (before,):
+            if self.offset_at(local_minute - offset) == offset:
+                return local_minute - offset
+        return local_minute - before
+
+
+_tables = {}
+
+
+def get_zone_table(name=None):
+    """Cached ZoneTable for a zone name (None = DEFAULT_TIMEZONE, or the system local zone)"""
+    name = name or DEFAULT_TIMEZONE or "local"
+    table = _tables.get(name)
+    if table is None:
+        table = _tables[name] = ZoneTable(name)
+    return table
+
+
+def utc_now():
+    """Current time as a naive UTC datetime"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@lru_cache(maxsize=4096)
+def _date_minute(date):
+    """Epoch minute of midnight on a 'YYYY-MM-DD' date; reminders share few distinct dates"""
+    return to_minute(datetime(int(date[0:4]), int(date[5:7]), int(date[8:10])))
+
+
+@lru_cache(maxsize=4096)
+def _day_date(day):
+    """'YYYY-MM-DD' of a day number counted from the epoch"""
+    return from_minute(day * 24 * 60).strftime("%Y-%m-%d")
+
+
+def to_epoch_minute(date, time):
+    """Epoch minute of 'YYYY-MM-DD' and 'HH:MM' strings"""
+    return _date_minute(date) + int(time[0:2]) * 60 + int(time[3:5])
+
+
+def format_minute(minute):
+    """'YYYY-MM-DD HH:MM' for an epoch minute"""
+    day, minute = divmod(minute, 24 * 60)
+    return f"{_day_date(day)} {minute // 60:02d}:{minute % 60:02d}"
+
+
+def local_to_utc(date, time, zone=None):
+    """UTC 'YYYY-MM-DD HH:MM' for a 'YYYY-MM-DD' and 'HH:MM' wall time in zone"""
+    return format_minute(get_zone_table(zone).to_utc_minute(to_epoch_minute(date, time)))
+
+
+def utc_to_local(due_utc, zone=None):
+    """Naive wall-clock datetime in zone for a UTC 'YYYY-MM-DD HH:MM' string"""
+    utc_minute = to_epoch_minute(due_utc[:10], due_utc[11:16])
+    return from_minute(get_zone_table(zone).to_local_minute(utc_minute))
@@ -0,0 +1,114 @@
+"""
+Event-loop stall watchdog: measures root.after lag and captures the main thread's stack during stalls
+"""
+
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from config import PROFILING_ENABLED, STALL_LOG_SIZE, STALL_THRESHOLD, WATCHDOG_INTERVAL
+from instrumentation import metrics
+
+
+class StallWatchdog:
+    """Heartbeats on the Tk thread; a helper thread notices missed beats and samples the blocked stack
+
+    Must be created on the Tk (main) thread.
+    """
+
+    def __init__(self, root, interval=WATCHDOG_INTERVAL, threshold=STALL_THRESHOLD, on_update=None):
+        self.root = root
+        self.interval = interval / 1000
+        self.threshold = threshold / 1000
+        self.on_update = on_update
+        self.main_thread_id = threading.get_ident()
+        self.lock = threading.Lock()
+        self.lags = deque(maxlen=max(int(10 / self.interval), 1))  # about the last ten seconds
+        self.stalls = deque(maxlen=STALL_LOG_SIZE)
+        self.current_stall = None
+        self.expected = None
+        self.last_beat = time.perf_counter()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.after_id = None
+
+    def start(self):
+        """Start heartbeats and the monitor thread"""
+        self.stop_event.clear()
+        self.last_beat = time.perf_counter()
+        self.expected = self.last_beat + self.interval
+        self.after_id = self.root.after(int(self.interval * 1000), self._beat)
+        self.thread = threading.Thread(target=self._monitor, name="stall-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop monitoring"""
+        self.stop_event.set()
+        if self.after_id is not None:
+            try:
+                self.root.after_cancel(self.after_id)
+            except Exception:
+                pass
+            self.after_id = None
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+
+    def _beat(self):
+        # Runs on the Tk thread: how late this callback ran is the event-loop lag
+        now = time.perf_counter()
+        lag = max(now - self.expected, 0.0)
+        with self.lock:
+            self.lags.append(lag)
+            self.last_beat = now
+            stall, self.current_stall = self.current_stall, None
+        if stall is not None:
+            stall["duration_ms"] = round(lag * 1000 + self.interval * 1000, 1)
+        if PROFILING_ENABLED:
+            metrics.record("tk.lag", lag)
+            if stall is not None:
+                metrics.record("tk.stall", lag + self.interval)
+        if self.on_update:
+            self.on_update(lag * 1000)
+        if self.stop_event.is_set():
+            return
+        self.expected = now + self.interval
+        self.after_id = self.root.after(int(self.interval * 1000), self._beat)
+
+    def _monitor(self):
+        # Runs on the helper thread: a beat overdue by more than the threshold means the Tk thread is stuck
+        while not self.stop_event.wait(self.interval / 2):
+            with self.lock:
+                overdue = time.perf_counter() - self.last_beat - self.interval
+                if overdue < self.threshold or self.current_stall is not None:
+                    continue
+                frame = sys._current_frames().get(self.main_thread_id)
+                stack = traceback.format_stack(frame) if frame is not None else []
+                self.current_stall = {
+                    "started_at": datetime.now().isoformat(timespec="milliseconds"),
+                    "duration_ms": None,  # filled in by the next heartbeat
+                    "where": stack[-1].strip().splitlines()[0] if stack else "unknown",
+                    "stack": "".join(stack),
+                }
+                self.stalls.append(self.current_stall)
+
+    def summary(self):
+        """Recent lag statistics (ms) and the stall count"""
+        with self.lock:
+            current = self.lags[-1] if self.lags else 0.0
+            lags = sorted(self.lags)
+            stall_count = len(self.stalls)
+        if not lags:
+            return {"current_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "stalls": stall_count}
+        return {
+            "current_ms": current * 1000,
+            "p95_ms": lags[max(int(len(lags) * 0.95) - 1, 0)] * 1000,
+            "max_ms": lags[-1] * 1000,
+            "stalls": stall_count,
+        }
+
+    def recent_stalls(self):
+        """Recorded stalls, newest first"""
+        with self.lock:
+            return list(reversed(self.stalls))